@@ -3,10 +3,12 @@
 
 # In this example, the websocket connection is opened with a text
 # passed in the request. When the service responds with the synthesized
-# audio, the pyaudio would play it in a blocking mode
+# audio, it is written to a jitter buffer that a playback thread reads from,
+# so gaps in the network stream do not interrupt the playback
 
+import threading
 from ibm_watson import TextToSpeechV1
-from ibm_watson.websocket import SynthesizeCallback
+from ibm_watson.websocket import SynthesizeCallback, AudioJitterBuffer
 import pyaudio
 from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
 
@@ -16,7 +18,7 @@ service.set_service_url('https://api.us-south.speech-to-text.watson.cloud.ibm.co
 
 class Play(object):
     """
-    Wrapper to play the audio in a blocking mode
+    Wrapper to play the audio from a jitter buffer in a playback thread
     """
     def __init__(self):
         self.format = pyaudio.paInt16
@@ -25,11 +27,18 @@ class Play(object):
         self.chunk = 1024
         self.pyaudio = None
         self.stream = None
+        # Buffer 0.2 seconds of 16-bit audio before the playback starts
+        self.buffer = AudioJitterBuffer(capacity=self.rate * 2 * 5,
+                                        pre_roll=self.rate * 2 // 5,
+                                        frame_size=2)
+        self.thread = None
 
     def start_streaming(self):
         self.pyaudio = pyaudio.PyAudio()
         self.stream = self._open_stream()
         self._start_stream()
+        self.thread = threading.Thread(target=self._play)
+        self.thread.start()
 
     def _open_stream(self):
         stream = self.pyaudio.open(
@@ -45,10 +54,23 @@ class Play(object):
     def _start_stream(self):
         self.stream.start_stream()
 
+    def _play(self):
+        while True:
+            views = self.buffer.read_views(self.chunk * 2)
+            if not views:
+                break
+            for view in views:
+                # PyAudio only accepts read-only buffers
+                self.stream.write(bytes(view))
+            self.buffer.consume(sum(len(view) for view in views))
+
     def write_stream(self, audio_stream):
-        self.stream.write(audio_stream)
+        self.buffer.write(audio_stream)
 
     def complete_playing(self):
+        self.buffer.finish()
+        self.thread.join()
+        print('Buffer underruns: {}'.format(self.buffer.underruns))
         self.stream.stop_stream()
         self.stream.close()
         self.pyaudio.terminate()
@@ -102,6 +124,6 @@ SSML_text = """
 
 service.synthesize_using_websocket(SSML_text,
                                    test_callback,
-                                   accept='audio/wav',
+                                   accept='audio/l16;rate=22050',
                                    voice="en-US_AllisonVoice"
                                   )
@@ -15,8 +15,6 @@
 
 from ibm_cloud_sdk_core import IAMTokenManager, DetailedResponse, BaseService, ApiException
 
-from .assistant_v1 import AssistantV1
-from .assistant_v2 import AssistantV2
 from .natural_language_understanding_v1 import NaturalLanguageUnderstandingV1
 from .text_to_speech_v1 import TextToSpeechV1
 from .discovery_v2 import DiscoveryV2
@@ -24,3 +22,5 @@ from .version import __version__
 from .common import get_sdk_headers
 from .speech_to_text_v1_adapter import SpeechToTextV1Adapter as SpeechToTextV1
 from .text_to_speech_adapter_v1 import TextToSpeechV1Adapter as TextToSpeechV1
+from .assistant_v1_adapter import AssistantV1Adapter as AssistantV1
+from .assistant_v2_adapter import AssistantV2Adapter as AssistantV2
@@ -0,0 +1,222 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Chunked, concurrent bulk classification of any number of utterances.
+"""
+
+from array import array
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List
+import time
+
+from ibm_cloud_sdk_core import ApiException
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from .common import (RateLimiter, get_status_code, iter_ordered,
+                     require_numpy)
+
+# The maximum number of utterances in one bulk_classify request.
+MAX_UTTERANCES = 50
+# Status codes of failed requests that are retried.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class BulkClassifier:
+    """
+    Classifies an iterable of utterances of any length with `bulk_classify`.
+
+    The utterances are taken lazily in chunks of `chunk_size`, which are sent
+    concurrently, and the outputs are yielded in the order of the utterances.
+    Chunks that fail with a rate limit, server or connection error are retried
+    with exponential backoff, honoring the `Retry-After` header.
+
+    :param classify: A function that classifies a list of utterance dicts,
+           such as `bulk_classify` with the workspace or skill ID bound.
+    :param int chunk_size: (optional) The number of utterances per request.
+    :param int max_concurrency: (optional) The maximum number of concurrent
+           requests.
+    :param float requests_per_second: (optional) The maximum rate of requests,
+           including retries.
+    :param int max_retries: (optional) The number of retries of a chunk.
+    :param float retry_delay: (optional) The seconds before the first retry,
+           doubled for each further retry.
+    """
+
+    def __init__(self,
+                 classify: Callable,
+                 chunk_size: int = MAX_UTTERANCES,
+                 max_concurrency: int = 4,
+                 requests_per_second: float = None,
+                 max_retries: int = 3,
+                 retry_delay: float = 1.0) -> None:
+        if not 0 < chunk_size <= MAX_UTTERANCES:
+            raise ValueError(
+                'chunk_size must be between 1 and {0}'.format(MAX_UTTERANCES))
+        self.classify = classify
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = (RateLimiter(requests_per_second)
+                             if requests_per_second else None)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def iter_outputs(self, utterances: Iterable) -> Iterator[Dict]:
+        """
+        Yield the `BulkClassifyOutput` dict of each utterance in order.
+
+        :param utterances: Strings or `{'text': ...}` dicts.
+        """
+        for outputs in iter_ordered(self._classify_chunk,
+                                    self._chunks(utterances),
+                                    self.max_concurrency):
+            yield from outputs
+
+    def classify_all(self,
+                     utterances: Iterable,
+                     intents: List[str] = None) -> 'BulkClassifyResults':
+        """
+        Classify the utterances and keep only the top intent of each.
+
+        :param utterances: Strings or `{'text': ...}` dicts.
+        :param list intents: (optional) The intent names in the order of
+               their indices. Intents that are not in the list are appended.
+        :rtype: BulkClassifyResults
+        """
+        results = BulkClassifyResults(intents)
+        for output in self.iter_outputs(utterances):
+            results.append(output)
+        return results
+
+    def _chunks(self, utterances):
+        utterances = iter(utterances)
+        while True:
+            chunk = [
+                {'text': utterance} if isinstance(utterance, str) else utterance
+                for utterance in islice(utterances, self.chunk_size)
+            ]
+            if not chunk:
+                return
+            yield chunk
+
+    def _classify_chunk(self, chunk):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                result = self.classify(chunk).get_result()
+                break
+            except (ApiException, RequestsConnectionError) as error:
+                status_code = get_status_code(error)
+                if (attempt >= self.max_retries or
+                    (status_code is not None and
+                     status_code not in RETRY_STATUS_CODES)):
+                    raise
+                time.sleep(self._delay(error, attempt))
+                attempt += 1
+        outputs = result.get('output') or []
+        if len(outputs) != len(chunk):
+            raise ValueError(
+                'bulk_classify returned {0} outputs for {1} utterances'.format(
+                    len(outputs), len(chunk)))
+        return outputs
+
+    def _delay(self, error, attempt):
+        response = getattr(error, 'http_response', None)
+        retry_after = response is not None and response.headers.get(
+            'Retry-After')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.retry_delay * 2**attempt
+
+
+class BulkClassifyResults:
+    """
+    The top intent of each classified utterance as compact NumPy arrays.
+
+    :param list intents: The intent names; `top_intent` holds indices into it.
+    """
+
+    def __init__(self, intents: List[str] = None) -> None:
+        self.intents = list(intents or [])
+        self._indices = {name: index for index, name in enumerate(self.intents)}
+        self._top_intent = array('i')
+        self._confidence = array('f')
+
+    def append(self, output: Dict) -> None:
+        """Add the `BulkClassifyOutput` dict of the next utterance."""
+        intents = output.get('intents') or []
+        if not intents:
+            self._top_intent.append(-1)
+            self._confidence.append(0.0)
+            return
+        top = max(intents, key=lambda intent: intent.get('confidence', 0))
+        self._top_intent.append(self.intent_index(top['intent']))
+        self._confidence.append(top.get('confidence', 0))
+
+    def intent_index(self, name: str) -> int:
+        """Return the index of the intent `name`, adding it if it is new."""
+        index = self._indices.get(name)
+        if index is None:
+            index = self._indices[name] = len(self.intents)
+            self.intents.append(name)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._top_intent)
+
+    @property
+    def top_intent(self):
+        """The index of the top intent of each utterance, or -1 for none."""
+        np = require_numpy('BulkClassifyResults')
+        return np.frombuffer(self._top_intent, dtype=np.intc).copy()
+
+    @property
+    def confidence(self):
+        """The confidence of the top intent of each utterance."""
+        np = require_numpy('BulkClassifyResults')
+        return np.frombuffer(self._confidence, dtype=np.float32).copy()
+
+    def accuracy(self, expected: Iterable[str],
+                 threshold: float = 0.0) -> float:
+        """
+        Return the fraction of utterances whose top intent is the expected one
+        with at least `threshold` confidence.
+
+        :param expected: The expected intent name of each utterance, or `None`
+               for no intent, which is correct whatever the threshold.
+        :raises ValueError: If the number of expected intents differs from the
+                number of results.
+        """
+        np = require_numpy('BulkClassifyResults')
+        # -1 is no intent, as in `top_intent`, and -2 an unknown intent.
+        expected = [
+            -1 if name is None else self._indices.get(name, -2)
+            for name in expected
+        ]
+        if len(expected) != len(self):
+            raise ValueError(
+                'Got {0} expected intents for {1} results'.format(
+                    len(expected), len(self)))
+        expected = np.array(expected, dtype=np.intc)
+        if not len(expected):
+            return 0.0
+        correct = (self.top_intent == expected) & (
+            (self.confidence >= threshold) | (expected == -1))
+        return float(correct.mean())
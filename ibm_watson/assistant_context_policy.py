@@ -0,0 +1,154 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Policies that limit the context sent back with each AssistantV1 message.
+"""
+
+from collections import deque, namedtuple
+from typing import Dict, Iterable
+import json
+
+# The context fields that the service manages and that are never pruned.
+PROTECTED_KEYS = ('conversation_id', 'system', 'metadata')
+
+ContextTurn = namedtuple(
+    'ContextTurn',
+    ['turn', 'context_bytes', 'system_bytes', 'dropped', 'truncated'])
+ContextTurn.__doc__ = """
+The size of the context of one message. `context_bytes` is the serialized size
+of the context without `system`, and `system_bytes` the size of `system`, or
+`None` if it is not measured. `dropped` and `truncated` are the pruned keys.
+"""
+
+
+class ContextPolicy:
+    """
+    Prunes the context variables of a conversation before each message.
+
+    With AssistantV1 the complete context is sent with every message, so
+    context variables that accumulate make each request larger and slower to
+    serialize. A policy keeps only the variables in `keep`, drops the ones in
+    `drop`, keeps the last `max_list_items` items of lists, drops variables
+    larger than `max_value_bytes` and then drops the largest variables until
+    the rest fit in `max_bytes`. The `conversation_id`, `system` and
+    `metadata` fields are always sent unchanged; `system` holds the dialog
+    state and is passed through without being copied or serialized by the
+    policy.
+
+    Use one policy per conversation. The sizes of the latest turns are kept
+    in `turns`.
+
+    :param keep: (optional) The names of the variables to send, or `None` to
+           send all variables.
+    :param drop: (optional) The names of the variables to remove.
+    :param int max_list_items: (optional) The maximum number of items of a list
+           variable. Older items, at the start of the list, are removed.
+    :param int max_value_bytes: (optional) The maximum serialized size of a
+           variable.
+    :param int max_bytes: (optional) The maximum serialized size of all
+           variables.
+    :param bool measure_system: (optional) Whether to record the size of
+           `system`, which serializes it once more per turn.
+    :param int history: (optional) The number of turns kept in `turns`.
+    """
+
+    def __init__(self,
+                 keep: Iterable[str] = None,
+                 drop: Iterable[str] = (),
+                 max_list_items: int = None,
+                 max_value_bytes: int = None,
+                 max_bytes: int = None,
+                 measure_system: bool = False,
+                 history: int = 100) -> None:
+        self.keep = frozenset(keep) if keep is not None else None
+        self.drop = frozenset(drop)
+        self.max_list_items = max_list_items
+        self.max_value_bytes = max_value_bytes
+        self.max_bytes = max_bytes
+        self.measure_system = measure_system
+        self.turns = deque(maxlen=history)
+        self._turn = 0
+
+    def apply(self, context: Dict) -> Dict:
+        """
+        Return the pruned context. The context itself is not changed.
+
+        :param dict context: The context of the last response.
+        :rtype: dict
+        """
+        pruned = {}
+        sizes = {}
+        dropped = []
+        truncated = []
+        for key, value in context.items():
+            if key in PROTECTED_KEYS:
+                pruned[key] = value
+                continue
+            if key in self.drop or (self.keep is not None and
+                                    key not in self.keep):
+                dropped.append(key)
+                continue
+            if (self.max_list_items is not None and isinstance(value, list) and
+                    len(value) > self.max_list_items):
+                value = value[len(value) - self.max_list_items:]
+                truncated.append(key)
+            size = _size(value)
+            if self.max_value_bytes is not None and size > self.max_value_bytes:
+                dropped.append(key)
+                continue
+            pruned[key] = value
+            sizes[key] = size
+        if self.max_bytes is not None:
+            total = sum(sizes.values())
+            for key in sorted(sizes, key=sizes.get, reverse=True):
+                if total <= self.max_bytes:
+                    break
+                total -= sizes.pop(key)
+                del pruned[key]
+                dropped.append(key)
+        self._record(pruned, sizes, dropped, truncated)
+        return pruned
+
+    @property
+    def last_turn(self) -> ContextTurn:
+        """The sizes of the latest turn, or `None` before the first one."""
+        return self.turns[-1] if self.turns else None
+
+    def _record(self, pruned, sizes, dropped, truncated):
+        self._turn += 1
+        for key in ('conversation_id', 'metadata'):
+            if key in pruned:
+                sizes[key] = _size(pruned[key])
+        system_bytes = None
+        if self.measure_system and 'system' in pruned:
+            system_bytes = _size(pruned['system'])
+        self.turns.append(
+            ContextTurn(self._turn, _dict_size(sizes), system_bytes, dropped,
+                        truncated))
+
+
+def _size(value):
+    """Return the length of the JSON of a value, as sent by `message`."""
+    return len(json.dumps(value))
+
+
+def _dict_size(sizes):
+    """Return the length of the JSON of a dict from the sizes of its values."""
+    if not sizes:
+        return 2
+    # Braces, ', ' between the items and ': ' after each key.
+    return 2 * len(sizes) + sum(
+        len(json.dumps(key)) + 2 + size for key, size in sizes.items())
@@ -0,0 +1,417 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+An index of the tree of dialog nodes of a workspace.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Union
+
+from .assistant_workspace_sync import Operation, WorkspacePlan
+
+# The index of an absent node in the arrays of a graph.
+NO_NODE = -1
+
+
+class DialogGraph:
+    """
+    The dialog nodes of a workspace, indexed by their `parent`,
+    `previous_sibling` and `next_step` references.
+
+    The graph is built in linear time. Each node is identified by its index in
+    `nodes`, and the tree is stored in arrays of indices, with `NO_NODE` for
+    absent references: `parent`, `previous_sibling`, `next_sibling` and
+    `first_child`, whose last element is the first node at the root level.
+    Traversals follow these arrays, so they take time proportional to the
+    nodes visited instead of scanning the list.
+
+    Broken references do not prevent building the graph; `validate` reports
+    them.
+
+    :param dialog_nodes: The dialog nodes as dicts, in the format of
+           `list_dialog_nodes`.
+    """
+
+    def __init__(self, dialog_nodes: Iterable[Dict]) -> None:
+        self.nodes = list(dialog_nodes)
+        self.index = {}
+        for position, node in enumerate(self.nodes):
+            if node['dialog_node'] in self.index:
+                raise ValueError('Duplicate dialog node {0}'.format(
+                    node['dialog_node']))
+            self.index[node['dialog_node']] = position
+        size = len(self.nodes)
+        self.parent = array('i', [NO_NODE]) * size
+        self.previous_sibling = array('i', [NO_NODE]) * size
+        self.next_sibling = array('i', [NO_NODE]) * size
+        self.first_child = array('i', [NO_NODE]) * (size + 1)
+        self._problems = []
+        for position, node in enumerate(self.nodes):
+            self.parent[position] = self._reference(node, 'parent')
+            self.previous_sibling[position] = self._reference(
+                node, 'previous_sibling')
+            self._reference(node, 'next_step')
+        for position in range(size):
+            self._link(position)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, dialog_node: str) -> bool:
+        return dialog_node in self.index
+
+    def node(self, dialog_node: str) -> Dict:
+        """Return the dict of a dialog node."""
+        return self.nodes[self.index[dialog_node]]
+
+    def children(self, dialog_node: str = None) -> List[str]:
+        """
+        Return the IDs of the children of a node in order, or of the nodes at
+        the root level.
+        """
+        children = []
+        position = self.first_child[self._position(dialog_node)]
+        # A node has at most one next sibling, so the links from a first
+        # child cannot loop.
+        while position != NO_NODE:
+            children.append(self.nodes[position]['dialog_node'])
+            position = self.next_sibling[position]
+        return children
+
+    def ancestors(self, dialog_node: str) -> List[str]:
+        """Return the IDs of the ancestors of a node, starting at its parent."""
+        ancestors = []
+        position = self.parent[self.index[dialog_node]]
+        while position != NO_NODE and len(ancestors) < len(self.nodes):
+            ancestors.append(self.nodes[position]['dialog_node'])
+            position = self.parent[position]
+        return ancestors
+
+    def walk(self, dialog_node: str = None) -> Iterator[str]:
+        """
+        Yield the IDs of the descendants of a node, or of all nodes reachable
+        from the root level, depth first in the order in which the dialog
+        evaluates them.
+        """
+        position = self._position(dialog_node)
+        visited = bytearray(len(self.nodes) + 1)
+        visited[position] = 1
+        for position in self._walk(position, visited):
+            yield self.nodes[position]['dialog_node']
+
+    def subtree(self, dialog_node: str) -> List[Dict]:
+        """Return the dicts of a node and its descendants, depth first."""
+        position = self.index[dialog_node]
+        visited = bytearray(len(self.nodes))
+        visited[position] = 1
+        return [self.nodes[position]] + [
+            self.nodes[descendant]
+            for descendant in self._walk(position, visited)
+        ]
+
+    def cycles(self) -> List[List[str]]:
+        """
+        Return the cycles of `parent` references, where a node is its own
+        ancestor, and of `previous_sibling` references, where a node is its
+        own sibling. Each cycle is a list of node IDs.
+        """
+        return [[self.nodes[position]['dialog_node']
+                 for position in cycle]
+                for links in (self.parent, self.previous_sibling)
+                for cycle in _cycles(links)]
+
+    def orphans(self) -> List[str]:
+        """
+        Return the IDs of the nodes that are not reachable from the root level,
+        because of a cycle or a broken reference.
+        """
+        visited = bytearray(len(self.nodes))
+        for _ in self._walk(len(self.nodes), visited):
+            pass
+        return [
+            node['dialog_node']
+            for position, node in enumerate(self.nodes)
+            if not visited[position]
+        ]
+
+    def validate(self) -> List[str]:
+        """
+        Return the problems of the tree: references to missing nodes, siblings
+        with different parents, nodes with the same previous sibling, cycles
+        and orphans. The tree is valid if the list is empty.
+        """
+        problems = list(self._problems)
+        for cycle in self.cycles():
+            problems.append('dialog nodes {0}: cycle'.format(' -> '.join(
+                cycle + cycle[:1])))
+        problems.extend('dialog node {0}: not reachable from the root'.format(
+            name) for name in self.orphans())
+        return problems
+
+    def move_plan(self, target: Union['DialogGraph', Iterable[Dict]]
+                 ) -> WorkspacePlan:
+        """
+        Compute the `update_dialog_node` calls that move the nodes into the
+        tree of `target`, with the fewest calls.
+
+        One call moves one node after a previous sibling, so the nodes of each
+        parent that keep their relative order, the longest increasing
+        subsequence of their current positions, stay in place and only the
+        others are moved. The calls run in order, with each parent moved before
+        its children, so no intermediate tree has a cycle.
+
+        Only nodes that exist in both trees are moved. Moves that cannot be
+        made with `update_dialog_node`, because they would remove the parent of
+        a node, are listed in the `unsupported` field of the plan.
+
+        :param target: The target tree, as a graph or as dialog node dicts.
+        :rtype: WorkspacePlan
+        :raises ValueError: If the current or the target tree is not valid.
+        """
+        if not isinstance(target, DialogGraph):
+            target = DialogGraph(target)
+        for description, graph in (('current', self), ('target', target)):
+            problems = graph.validate()
+            if problems:
+                raise ValueError('The {0} dialog tree is not valid: {1}'.format(
+                    description, '; '.join(problems)))
+        return _MovePlanner(self, target).plan()
+
+    def _reference(self, node, field):
+        name = node.get(field)
+        if isinstance(name, dict):
+            # next_step refers to its node in a field, unless it is a return.
+            if name.get('behavior') != 'jump_to':
+                return NO_NODE
+            name = name.get('dialog_node')
+        if name is None:
+            return NO_NODE
+        position = self.index.get(name)
+        if position is None:
+            self._problems.append(
+                'dialog node {0}: {1} {2} does not exist'.format(
+                    node['dialog_node'], field, name))
+            return NO_NODE
+        return position
+
+    def _link(self, position):
+        previous = self.previous_sibling[position]
+        parent = self.parent[position]
+        node = self.nodes[position]
+        name = node['dialog_node']
+        if ((parent == NO_NODE and node.get('parent') is not None) or
+            (previous == NO_NODE and node.get('previous_sibling') is not None)):
+            # The node is an orphan because of a broken reference.
+            return
+        if previous == NO_NODE:
+            slot = len(self.nodes) if parent == NO_NODE else parent
+            if self.first_child[slot] != NO_NODE:
+                self._problems.append(
+                    'dialog nodes {0} and {1}: both are the first child'.format(
+                        self.nodes[self.first_child[slot]]['dialog_node'],
+                        name))
+                return
+            self.first_child[slot] = position
+            return
+        if self.parent[previous] != parent:
+            self._problems.append(
+                'dialog node {0}: previous sibling {1} has another parent'.
+                format(name, self.nodes[previous]['dialog_node']))
+        if self.next_sibling[previous] != NO_NODE:
+            self._problems.append(
+                'dialog nodes {0} and {1}: both follow {2}'.format(
+                    self.nodes[self.next_sibling[previous]]['dialog_node'],
+                    name, self.nodes[previous]['dialog_node']))
+            return
+        self.next_sibling[previous] = position
+
+    def _position(self, dialog_node):
+        """Return the index of a node, or the root slot of `first_child`."""
+        if dialog_node is None:
+            return len(self.nodes)
+        return self.index[dialog_node]
+
+    def _siblings(self, position, visited):
+        while position != NO_NODE and not visited[position]:
+            visited[position] = 1
+            yield position
+            position = self.next_sibling[position]
+
+    def _walk(self, position, visited):
+        """Yield the descendants of `position` depth first, once each."""
+        stack = [self._siblings(self.first_child[position], visited)]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                stack.append(self._siblings(self.first_child[child], visited))
+                break
+            else:
+                stack.pop()
+
+
+class _MovePlanner:
+    """
+    Simulates the moves of a plan on linked lists of siblings, so that each
+    move takes constant time.
+    """
+
+    def __init__(self, current, target):
+        self.current = current
+        self.target = target
+        self.parents = {}
+        self.first = {}
+        self.previous = {}
+        self.next = {}
+        for parent in [None] + list(current.walk()):
+            previous = None
+            for child in current.children(parent):
+                self.parents[child] = parent
+                self.link(child, parent, previous)
+                previous = child
+        self.operations = []
+        self.unsupported = []
+
+    def plan(self):
+        # Breadth first, so the ancestors of a node are in place before it.
+        queue = deque([None])
+        while queue:
+            parent = queue.popleft()
+            children = self.target.children(parent)
+            queue.extend(children)
+            self.arrange(parent,
+                         [name for name in children if name in self.current])
+        return WorkspacePlan([(self.operations, False)] if self.operations else
+                             [],
+                             unsupported=self.unsupported)
+
+    def arrange(self, parent, names):
+        if not names:
+            return
+        if parent is not None and parent not in self.current:
+            self.unsupported.extend(
+                'dialog node {0}: move to new parent {1}'.format(name, parent)
+                for name in names)
+            return
+        if parent is None:
+            # Nodes cannot be moved to the root level, as a parent cannot be
+            # removed.
+            self.unsupported.extend(
+                'dialog node {0}: move to the root level'.format(name)
+                for name in names
+                if self.parents[name] is not None)
+            names = [name for name in names if self.parents[name] is None]
+            if not names:
+                return
+        first = names[0]
+        if self.parents[first] != parent:
+            # A node can only be moved after a sibling, so a new first child
+            # is moved after the current one, which is then moved after it.
+            self.move(first, parent, self.first.get(parent))
+        positions = {
+            name: position
+            for position, name in enumerate(self.siblings(parent))
+        }
+        kept = _increasing(
+            [name for name in names[1:]
+             if positions.get(name, -1) > positions[first]], positions)
+        kept.add(first)
+        for previous, name in zip(names, names[1:]):
+            if name not in kept:
+                self.move(name, parent, previous)
+
+    def move(self, name, parent, previous):
+        old_parent = self.parents[name]
+        kwargs = {'dialog_node': name}
+        if parent != old_parent:
+            kwargs['new_parent'] = parent
+        if previous is not None:
+            kwargs['new_previous_sibling'] = previous
+        self.operations.append(Operation('update_dialog_node', kwargs))
+        self.unlink(name, old_parent)
+        self.link(name, parent, previous)
+        self.parents[name] = parent
+
+    def siblings(self, parent):
+        name = self.first.get(parent)
+        while name is not None:
+            yield name
+            name = self.next[name]
+
+    def link(self, name, parent, previous):
+        """Insert a node after `previous`, or first if it is `None`."""
+        if previous is None:
+            following = self.first.get(parent)
+            self.first[parent] = name
+        else:
+            following = self.next[previous]
+            self.next[previous] = name
+        self.previous[name] = previous
+        self.next[name] = following
+        if following is not None:
+            self.previous[following] = name
+
+    def unlink(self, name, parent):
+        previous = self.previous[name]
+        following = self.next[name]
+        if previous is None:
+            self.first[parent] = following
+        else:
+            self.next[previous] = following
+        if following is not None:
+            self.previous[following] = previous
+
+
+def _increasing(names, positions):
+    """Return a longest subsequence of `names` with increasing positions."""
+    tails = []
+    tail_names = []
+    predecessors = {}
+    for name in names:
+        position = positions[name]
+        length = bisect_left(tails, position)
+        if length == len(tails):
+            tails.append(position)
+            tail_names.append(name)
+        else:
+            tails[length] = position
+            tail_names[length] = name
+        predecessors[name] = tail_names[length - 1] if length else None
+    kept = set()
+    name = tail_names[-1] if tail_names else None
+    while name is not None:
+        kept.add(name)
+        name = predecessors[name]
+    return kept
+
+
+def _cycles(links):
+    """Return the cycles of an array of references, as lists of indices."""
+    state = bytearray(len(links))  # 0 unvisited, 1 on the path, 2 done
+    cycles = []
+    for start in range(len(links)):
+        path = []
+        position = start
+        while position != NO_NODE and not state[position]:
+            state[position] = 1
+            path.append(position)
+            position = links[position]
+        if position != NO_NODE and state[position] == 1:
+            cycles.append(path[path.index(position):])
+        for visited in path:
+            state[visited] = 2
+    return cycles
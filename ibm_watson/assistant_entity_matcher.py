@@ -0,0 +1,216 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Local matching of the dictionary and pattern entities of a workspace.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List
+import re
+
+
+class EntityMatcher:
+    """
+    Finds the entities of a workspace in text without calling `message`.
+
+    The values and synonyms of all entities are compiled into one Aho-Corasick
+    automaton, which finds every occurrence in a single pass over the text,
+    and each pattern is compiled once. Matches are returned like the
+    `RuntimeEntity` results of `message`.
+
+    Matches of values and synonyms must start and end at word boundaries,
+    unless `whole_words` is `False`, and overlapping matches are resolved
+    in favour of the leftmost, then longest one. Fuzzy matching and system
+    entities are not supported.
+
+    :param entities: The entities in the format of `list_entities` with
+           `export=True`.
+    :param bool case_sensitive: (optional) Whether values and synonyms match
+           only with the same case. Patterns match as written, so inline flags
+           such as `(?i)` apply.
+    :param bool whole_words: (optional) Whether values and synonyms match
+           only whole words.
+    :raises ValueError: If a pattern is not a valid regular expression.
+    """
+
+    def __init__(self,
+                 entities: Iterable[Dict],
+                 case_sensitive: bool = False,
+                 whole_words: bool = True) -> None:
+        self.case_sensitive = case_sensitive
+        self.whole_words = whole_words
+        self.values = []
+        keywords = {}
+        patterns = []
+        for entity in entities:
+            for value in entity.get('values') or []:
+                index = len(self.values)
+                self.values.append((entity['entity'], value['value']))
+                if value.get('type') == 'patterns':
+                    patterns.extend(
+                        (pattern, index) for pattern in value.get('patterns') or [])
+                    continue
+                for keyword in [value['value']] + (value.get('synonyms') or []):
+                    if not case_sensitive:
+                        keyword = keyword.lower()
+                    if keyword:
+                        keywords.setdefault(keyword, []).append(index)
+        self._automaton = _Automaton(keywords)
+        self._patterns = [(_compile(pattern, self.values[index]), index)
+                          for pattern, index in patterns]
+
+    def match(self, text: str) -> List[Dict]:
+        """
+        Return the entities in `text` as `RuntimeEntity` dicts, ordered by
+        their location.
+        """
+        matches = []
+        search_text = text if self.case_sensitive else _lower(text)
+        for start, end, indices in self._automaton.search(search_text):
+            if self.whole_words and not _at_boundaries(text, start, end):
+                continue
+            for index in indices:
+                matches.append((start, end, index, None))
+        for pattern, index in self._patterns:
+            for match in pattern.finditer(text):
+                if match.end() == match.start():
+                    continue
+                groups = [{
+                    'group': 'group_{0}'.format(number),
+                    'location': list(match.span(group))
+                } for number, group in enumerate(range(1, pattern.groups + 1))
+                          if match.start(group) >= 0]
+                matches.append(
+                    (match.start(), match.end(), index, groups or None))
+        return [
+            self._entity(*match) for match in _resolve_overlaps(matches)
+        ]
+
+    def match_many(self, texts: Iterable[str]) -> Iterator[List[Dict]]:
+        """Yield the entities of each of `texts`."""
+        for text in texts:
+            yield self.match(text)
+
+    def _entity(self, start, end, index, groups):
+        entity, value = self.values[index]
+        result = {
+            'entity': entity,
+            'location': [start, end],
+            'value': value,
+            'confidence': 1.0
+        }
+        if groups is not None:
+            result['groups'] = groups
+        return result
+
+
+class _Automaton:
+    """An Aho-Corasick automaton over the characters of keywords."""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        # The (length, payload) outputs of each state, including those of its
+        # suffix states.
+        self.outputs = [()]
+        for keyword, payload in keywords.items():
+            state = 0
+            for character in keyword:
+                following = self.goto[state].get(character)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto[state][character] = following
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                state = following
+            self.outputs[state] = ((len(keyword), tuple(payload)),)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(character, 0)
+                self.fail[following] = target if target != following else 0
+                self.outputs[following] += self.outputs[self.fail[following]]
+        self.alphabet = frozenset(
+            character for transitions in self.goto for character in transitions)
+
+    def search(self, text):
+        """Yield `(start, end, payload)` for every keyword occurrence."""
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        alphabet = self.alphabet
+        state = 0
+        for position, character in enumerate(text):
+            if character not in alphabet:
+                state = 0
+                continue
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            if outputs[state]:
+                end = position + 1
+                for length, payload in outputs[state]:
+                    yield end - length, end, payload
+
+
+def _compile(pattern, value):
+    entity, name = value
+    try:
+        return re.compile(pattern)
+    except re.error as error:
+        raise ValueError('Invalid pattern {0!r} of entity {1}, value {2}: {3}'.
+                         format(pattern, entity, name, error)) from error
+
+
+def _lower(text):
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # Some characters lowercase to several, which would shift the locations.
+    return ''.join(character.lower() if len(character.lower()) == 1 else
+                   character for character in text)
+
+
+def _at_boundaries(text, start, end):
+    return ((start == 0 or not _is_word(text[start - 1]) or
+             not _is_word(text[start])) and
+            (end == len(text) or not _is_word(text[end]) or
+             not _is_word(text[end - 1])))
+
+
+def _is_word(character):
+    return character.isalnum() or character == '_'
+
+
+def _resolve_overlaps(matches):
+    """Keep the leftmost longest matches, and all matches of the same span."""
+    matches.sort(key=lambda match: (match[0], match[0] - match[1], match[2]))
+    kept = []
+    end = 0
+    for match in matches:
+        if match[0] >= end:
+            kept.append(match)
+            end = match[1]
+        elif kept and match[:2] == kept[-1][:2] and match[2] != kept[-1][2]:
+            # Several values in the same span, but each value once.
+            kept.append(match)
+    return kept
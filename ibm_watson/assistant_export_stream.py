@@ -0,0 +1,267 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Streaming downloads of workspace, release and skill exports, and an
+incremental JSON parser for reading sections of them.
+"""
+
+from typing import Iterable, Iterator, Tuple
+import codecs
+import json
+import os
+import re
+import zlib
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# A token with leading whitespace: punctuation, a string, a number or a literal.
+_TOKEN = re.compile(r'\s*(?:([{}\[\],:])|("(?:[^"\\]|\\.)*")|'
+                    r'(-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)|'
+                    r'(true|false|null))')
+# Characters after a number that may continue it, or the end of the buffer.
+_NUMBER_CONTINUATIONS = ('', '.', 'e', 'E', '+', '-') + tuple('0123456789')
+_LITERALS = {'true': True, 'false': False, 'null': None}
+# The tokens that the parser expects next.
+_VALUE = 'a value'
+_KEY = 'a map key'
+_COLON = "':'"
+_COMMA = "',' or the end of the container"
+_END = 'the end of the document'
+
+
+class ExportStream:
+    """
+    An iterable over the body of a streamed export response.
+
+    Iterating yields the body in chunks as it is read from the socket, so an
+    export of any size is handled in constant memory. The connection is
+    released when the iteration ends or `close` is called. A stream can be
+    read only once.
+
+    :param int bytes_received: The number of bytes yielded so far.
+    """
+
+    def __init__(self, response, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        :param requests.Response response: The streamed response.
+        :param int chunk_size: The maximum size of the yielded chunks.
+        """
+        self.response = response
+        self.chunk_size = chunk_size
+        self.content_type = response.headers.get('Content-Type')
+        self.bytes_received = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                if chunk:
+                    self.bytes_received += len(chunk)
+                    yield chunk
+        finally:
+            self.close()
+
+    def save(self, file, compress: bool = False, level: int = 6) -> int:
+        """
+        Write the body to a file.
+
+        :param file: A path, or a writable binary stream.
+        :param bool compress: (optional) Whether to compress the body with gzip
+               while it is written.
+        :param int level: (optional) The gzip compression level.
+        :return: The number of bytes written.
+        :rtype: int
+        """
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'wb') as stream:
+                return self.save(stream, compress=compress, level=level)
+        compressor = None
+        if compress:
+            # A window size above MAX_WBITS writes a gzip header and trailer.
+            compressor = zlib.compressobj(level, zlib.DEFLATED,
+                                          16 + zlib.MAX_WBITS)
+        written = 0
+        for chunk in self:
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            file.write(chunk)
+            written += len(chunk)
+        if compressor is not None:
+            chunk = compressor.flush()
+            file.write(chunk)
+            written += len(chunk)
+        return written
+
+    def iter_events(self) -> Iterator[Tuple[str, str, object]]:
+        """Parse the JSON body incrementally. See `iter_json_events`."""
+        return iter_json_events(self)
+
+    def iter_items(self, prefix: str) -> Iterator:
+        """
+        Yield the JSON values at `prefix` of the body. See `iter_json_items`.
+        """
+        return iter_json_items(self, prefix)
+
+    def close(self) -> None:
+        """Release the connection of the response."""
+        self.response.close()
+
+    def __enter__(self) -> 'ExportStream':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def iter_json_events(
+        chunks: Iterable[bytes]) -> Iterator[Tuple[str, str, object]]:
+    """
+    Parse a JSON document from chunks of UTF-8 bytes, yielding events as
+    soon as their tokens are complete.
+
+    The events are `(prefix, event, value)` tuples, where `prefix` is the path
+    of the value with map keys and `item` for array elements joined by dots,
+    and `event` is one of `start_map`, `map_key`, `end_map`, `start_array`,
+    `end_array`, `string`, `number`, `boolean` and `null`.
+
+    :raises ValueError: If the document is not valid JSON.
+    """
+    path = []
+    containers = []
+    expect = _VALUE
+    # Whether the expected key or value may instead close an empty container.
+    closable = False
+    for punctuation, value, event in _values(_tokens(chunks)):
+        if expect == _KEY and event == 'string':
+            path[-1] = value
+            yield '.'.join(path[:-1]), 'map_key', value
+            expect = _COLON
+            continue
+        if expect == _COLON and punctuation == ':':
+            expect = _VALUE
+            closable = False
+            continue
+        if expect == _VALUE and punctuation is None:
+            yield '.'.join(path), event, value
+            expect = _COMMA if containers else _END
+            continue
+        if expect == _VALUE and punctuation in ('{', '['):
+            yield ('.'.join(path), 'start_map' if punctuation == '{' else
+                   'start_array', None)
+            containers.append(punctuation)
+            path.append(None if punctuation == '{' else 'item')
+            expect = _KEY if punctuation == '{' else _VALUE
+            closable = True
+            continue
+        if expect == _COMMA and punctuation == ',':
+            expect = _KEY if containers[-1] == '{' else _VALUE
+            closable = False
+            continue
+        if ((expect == _COMMA or (closable and expect in (_KEY, _VALUE))) and
+                punctuation in ('}', ']') and
+                containers[-1] == '{['[punctuation == ']']):
+            containers.pop()
+            path.pop()
+            yield ('.'.join(path), 'end_map' if punctuation == '}' else
+                   'end_array', None)
+            expect = _COMMA if containers else _END
+            continue
+        raise ValueError('Expected {0}, got {1!r}'.format(
+            expect, value if punctuation is None else punctuation))
+    if expect != _END:
+        raise ValueError('The JSON document is incomplete')
+
+
+def iter_json_items(chunks: Iterable[bytes], prefix: str) -> Iterator:
+    """
+    Yield the values at `prefix` of a JSON document, building only those
+    values. For example, `intents.item` yields the intents of a workspace
+    export one at a time, and `dialog_nodes.item.dialog_node` the IDs of its
+    dialog nodes.
+    """
+    stack = None
+    for path, event, value in iter_json_events(chunks):
+        if stack is None:
+            if path != prefix or event in ('map_key', 'end_map', 'end_array'):
+                continue
+            if event not in ('start_map', 'start_array'):
+                yield value
+                continue
+            stack = []
+            key = None
+        if event in ('start_map', 'start_array'):
+            container = {} if event == 'start_map' else []
+            if stack:
+                _add(stack[-1], key, container)
+            stack.append(container)
+        elif event in ('end_map', 'end_array'):
+            container = stack.pop()
+            if not stack:
+                stack = None
+                yield container
+        elif event == 'map_key':
+            key = value
+        else:
+            _add(stack[-1], key, value)
+
+
+def _add(container, key, value):
+    if isinstance(container, list):
+        container.append(value)
+    else:
+        container[key] = value
+
+
+def _tokens(chunks):
+    """Yield the tokens of a JSON document split across chunks."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = 0
+    for chunk, final in _with_final(chunks):
+        buffer = buffer[position:] + decoder.decode(chunk, final)
+        position = 0
+        while True:
+            match = _TOKEN.match(buffer, position)
+            # A number at the end of the buffer may continue in the next chunk.
+            if match is None or (match.group(3) and not final and
+                                 buffer[match.end():match.end() + 1] in
+                                 _NUMBER_CONTINUATIONS):
+                break
+            position = match.end()
+            yield match
+        if final and buffer[position:].strip():
+            raise ValueError('Invalid JSON at {0!r}'.format(
+                buffer[position:position + 20]))
+
+
+def _values(tokens):
+    for match in tokens:
+        punctuation, string, number, literal = match.groups()
+        if punctuation is not None:
+            yield punctuation, None, None
+        elif string is not None:
+            yield None, json.loads(string), 'string'
+        elif number is not None:
+            yield None, json.loads(number), 'number'
+        else:
+            value = _LITERALS[literal]
+            yield None, value, 'null' if value is None else 'boolean'
+
+
+def _with_final(chunks):
+    """Yield `(chunk, final)` pairs, ending with an empty final chunk."""
+    for chunk in chunks:
+        yield chunk, False
+    yield b'', True
@@ -0,0 +1,237 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Vectorized accuracy analytics of intent classification results.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+from .assistant_bulk_classify import BulkClassifyResults
+from .common import require_numpy
+
+
+class IntentAnalytics:
+    """
+    Confusion, precision, recall and confidence statistics of classified
+    utterances.
+
+    Intents are encoded as integer codes, the indices of `intents`, and `-1`
+    stands for no intent. All metrics are computed with NumPy over the code
+    arrays, so millions of utterances take seconds.
+
+    :param expected: The expected intent code of each utterance.
+    :param predicted: The predicted intent code of each utterance.
+    :param confidence: The confidence of each prediction.
+    :param list intents: The intent names of the codes.
+    """
+
+    def __init__(self, expected, predicted, confidence,
+                 intents: List[str]) -> None:
+        np = require_numpy('IntentAnalytics')
+        self.expected = np.asarray(expected, dtype=np.intc)
+        self.predicted = np.asarray(predicted, dtype=np.intc)
+        self.confidence = np.asarray(confidence, dtype=np.float32)
+        if not (self.expected.shape == self.predicted.shape ==
+                self.confidence.shape):
+            raise ValueError(
+                'expected, predicted and confidence must have the same length')
+        self.intents = list(intents)
+
+    @classmethod
+    def from_results(cls, results: BulkClassifyResults,
+                     expected: Iterable[str]) -> 'IntentAnalytics':
+        """
+        Create the analytics of `bulk_classify_all` results.
+
+        :param BulkClassifyResults results: The classification results.
+        :param expected: The expected intent name of each utterance, or `None`
+               for utterances that should not match an intent.
+        """
+        intents = list(results.intents)
+        codes = encode_intents(expected, intents)
+        return cls(codes, results.top_intent, results.confidence, intents)
+
+    @classmethod
+    def from_outputs(cls,
+                     outputs: Iterable[Dict],
+                     expected: Iterable[str],
+                     intents: List[str] = None) -> 'IntentAnalytics':
+        """
+        Create the analytics of classification outputs: the `BulkClassifyOutput`
+        dicts of `bulk_classify`, or the results of `message` of AssistantV1
+        (`intents`) or AssistantV2 (`output.intents`).
+
+        :param outputs: The output of each utterance.
+        :param expected: The expected intent name of each utterance.
+        :param list intents: (optional) The intent names in the order of
+               their codes.
+        """
+        results = BulkClassifyResults(intents)
+        for output in outputs:
+            if 'intents' not in output and 'output' in output:
+                output = output['output']
+            results.append(output)
+        return cls.from_results(results, expected)
+
+    def __len__(self) -> int:
+        return len(self.expected)
+
+    def predictions(self, threshold: float = 0.0):
+        """
+        Return the predicted codes, with `-1` for predictions below
+        `threshold` confidence.
+        """
+        np = require_numpy('IntentAnalytics')
+        return np.where(self.confidence >= threshold, self.predicted, -1)
+
+    def accuracy(self, threshold: float = 0.0) -> float:
+        """Return the fraction of utterances with the expected prediction."""
+        if not len(self):
+            return 0.0
+        return float((self.predictions(threshold) == self.expected).mean())
+
+    def confusion_matrix(self, threshold: float = 0.0):
+        """
+        Return the confusion matrix, with expected intents in rows and
+        predicted intents in columns. The last row and column count the
+        utterances without an intent.
+
+        :param float threshold: (optional) The minimum confidence of a
+               prediction.
+        :rtype: numpy.ndarray
+        """
+        np = require_numpy('IntentAnalytics')
+        size = len(self.intents) + 1
+        # Code -1 becomes the last index.
+        expected = np.where(self.expected < 0, size - 1, self.expected)
+        predicted = self.predictions(threshold)
+        predicted = np.where(predicted < 0, size - 1, predicted)
+        counts = np.bincount(expected.astype(np.int64) * size + predicted,
+                             minlength=size * size)
+        return counts.reshape(size, size)
+
+    def precision_recall(self, threshold: float = 0.0):
+        """
+        Return the precision, recall and F1 score of each intent, in the order
+        of `intents`. Intents without predictions or expected utterances have
+        a score of 0.
+
+        :rtype: tuple of numpy.ndarray
+        """
+        np = require_numpy('IntentAnalytics')
+        matrix = self.confusion_matrix(threshold)
+        true_positives = np.diag(matrix)[:-1].astype(float)
+        predicted = matrix[:, :-1].sum(axis=0)
+        expected = matrix[:-1, :].sum(axis=1)
+        precision = _divide(true_positives, predicted)
+        recall = _divide(true_positives, expected)
+        f1 = _divide(2 * precision * recall, precision + recall)
+        return precision, recall, f1
+
+    def confidence_histogram(self, bins: int = 10) -> Tuple:
+        """
+        Return histograms of the confidence of correct and incorrect
+        predictions, for choosing a confidence threshold.
+
+        :return: The counts of correct predictions, the counts of incorrect
+                 predictions, and the `bins + 1` bin edges from 0 to 1.
+        :rtype: tuple of numpy.ndarray
+        """
+        np = require_numpy('IntentAnalytics')
+        edges = np.linspace(0.0, 1.0, bins + 1)
+        predicted = self.predicted >= 0
+        correct = self.predicted == self.expected
+        return (np.histogram(self.confidence[predicted & correct], edges)[0],
+                np.histogram(self.confidence[predicted & ~correct], edges)[0],
+                edges)
+
+    def confusable_pairs(self,
+                         min_rate: float = 0.05,
+                         threshold: float = 0.0) -> List[Tuple]:
+        """
+        Return the pairs of intents that are confused with each other.
+
+        The rate of a pair is the number of utterances of either intent that
+        were predicted as the other one, divided by the number of utterances of
+        both intents.
+
+        :param float min_rate: (optional) The minimum rate of a pair.
+        :return: `(intent, other_intent, count, rate)` tuples, with the highest
+                 rate first.
+        :rtype: list
+        """
+        np = require_numpy('IntentAnalytics')
+        matrix = self.confusion_matrix(threshold)
+        totals = matrix[:-1, :].sum(axis=1)
+        matrix = matrix[:-1, :-1]
+        confused = matrix + matrix.T
+        pair_totals = totals[:, None] + totals[None, :]
+        rates = _divide(confused.astype(float), pair_totals)
+        # Each pair once, without the diagonal.
+        rows, columns = np.nonzero(np.triu(rates >= min_rate, k=1) &
+                                   (confused > 0))
+        order = np.argsort(-rates[rows, columns], kind='stable')
+        return [(self.intents[rows[index]], self.intents[columns[index]],
+                 int(confused[rows[index], columns[index]]),
+                 float(rates[rows[index], columns[index]]))
+                for index in order]
+
+    def report(self, threshold: float = 0.0) -> Dict[str, Dict]:
+        """
+        Return the `precision`, `recall`, `f1` and `support` (the number of
+        expected utterances) of each intent by name.
+        """
+        precision, recall, f1 = self.precision_recall(threshold)
+        support = self.confusion_matrix(threshold)[:-1, :].sum(axis=1)
+        return {
+            intent: {
+                'precision': float(precision[index]),
+                'recall': float(recall[index]),
+                'f1': float(f1[index]),
+                'support': int(support[index])
+            } for index, intent in enumerate(self.intents)
+        }
+
+
+def encode_intents(names: Iterable[str], intents: List[str]):
+    """
+    Encode intent names as their indices in `intents`, appending new names to
+    it. `None` and empty names are encoded as `-1`.
+
+    :rtype: numpy.ndarray
+    """
+    np = require_numpy('encode_intents')
+    names = np.asarray([name or '' for name in names], dtype=str)
+    unique, inverse = np.unique(names, return_inverse=True)
+    indices = {name: index for index, name in enumerate(intents)}
+    codes = np.empty(len(unique), dtype=np.intc)
+    for position, name in enumerate(unique.tolist()):
+        if not name:
+            codes[position] = -1
+            continue
+        if name not in indices:
+            indices[name] = len(intents)
+            intents.append(name)
+        codes[position] = indices[name]
+    return codes[inverse.reshape(-1)]
+
+
+def _divide(numerator, denominator):
+    np = require_numpy('IntentAnalytics')
+    return np.divide(numerator,
+                     denominator,
+                     out=np.zeros(np.shape(numerator), dtype=float),
+                     where=denominator > 0)
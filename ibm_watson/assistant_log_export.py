@@ -0,0 +1,392 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Resumable export of Assistant log events to JSONL or Parquet files.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Tuple
+import json
+import os
+import tempfile
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+
+from .common import get_status_code, require_pyarrow
+from .pager import DEFAULT_CURSOR_TTL
+
+# The string columns of Parquet files. `request` and `response` are JSON.
+PARQUET_COLUMNS = ('log_id', 'request_timestamp', 'response_timestamp',
+                   'workspace_id', 'assistant_id', 'session_id', 'skill_id',
+                   'snapshot', 'language', 'customer_id', 'request',
+                   'response')
+
+
+class ExportStats:
+    """
+    The progress of a log export.
+
+    :param int events: The number of exported log events.
+    :param int pages: The number of pages that were received.
+    :param int restarts: The number of times an expired cursor was replaced
+          by resuming from the timestamp watermark.
+    :param float seconds: The seconds since the export started.
+    """
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.pages = 0
+        self.restarts = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def seconds(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def events_per_second(self) -> float:
+        """The export throughput."""
+        seconds = self.seconds
+        return self.events / seconds if seconds > 0 else 0.0
+
+    def _add(self, events=0, pages=0, restarts=0):
+        with self._lock:
+            self.events += events
+            self.pages += pages
+            self.restarts += restarts
+
+    def __repr__(self) -> str:
+        return ('ExportStats(events={0}, pages={1}, restarts={2}, '
+                'events_per_second={3:.1f})'.format(self.events, self.pages,
+                                                    self.restarts,
+                                                    self.events_per_second))
+
+
+def time_ranges(start: datetime, end: datetime,
+                step: timedelta) -> List[Tuple[datetime, datetime]]:
+    """Split the time window from `start` to `end` into ranges of `step`."""
+    if step <= timedelta(0):
+        raise ValueError('step must be positive')
+    ranges = []
+    while start < end:
+        ranges.append((start, min(start + step, end)))
+        start += step
+    return ranges
+
+
+class LogExporter:
+    """
+    Exports the log events of a list operation to files in a directory.
+
+    Pages are written as they arrive, from the JSON of the responses, either as
+    JSON Lines or as Parquet files with one string column per field. The time
+    window can be split into ranges that are exported in parallel, each into
+    its own files.
+
+    The export is resumable. A checkpoint file records for each range the
+    last cursor and a watermark: the `request_timestamp` of the last exported
+    event and the IDs of the events with that timestamp. The checkpoint only
+    advances when the data before it is on disk. An export resumes from the
+    cursor while it is fresh and otherwise, like after an expired cursor
+    during the export, from the watermark. Ranges that ended are skipped once
+    they are complete, and a range without an end exports only the new events
+    on the next run.
+
+    :param operation: The list operation, such as `AssistantV1.list_all_logs`.
+    :param str directory: The directory for the files and the checkpoint.
+    :param str format: (optional) `jsonl` or `parquet`.
+    :param str filter: (optional) The filter of the operation. The time range
+           is added to it.
+    :param int page_limit: (optional) The number of events per page.
+    :param int max_workers: (optional) The number of ranges that are exported
+           in parallel.
+    :param int rows_per_file: (optional) The number of events in each Parquet
+           file, which are written as one row group.
+    :param float cursor_ttl: (optional) The seconds after which a cursor is
+           considered expired.
+    :param progress: (optional) A function that is called with the
+           `ExportStats` after each page.
+    :param kwargs: The other parameters of the operation.
+    """
+
+    def __init__(self,
+                 operation: Callable,
+                 directory: str,
+                 format: str = 'jsonl',
+                 filter: str = None,
+                 page_limit: int = 1000,
+                 max_workers: int = 4,
+                 rows_per_file: int = 100000,
+                 cursor_ttl: float = DEFAULT_CURSOR_TTL,
+                 progress: Callable = None,
+                 **kwargs) -> None:
+        if format not in ('jsonl', 'parquet'):
+            raise ValueError('format must be jsonl or parquet')
+        if format == 'parquet':
+            require_pyarrow('Parquet log export')
+        self.operation = operation
+        self.directory = directory
+        self.format = format
+        self.filter = filter
+        self.page_limit = page_limit
+        self.max_workers = max_workers
+        self.rows_per_file = rows_per_file
+        self.cursor_ttl = cursor_ttl
+        self.progress = progress
+        self.kwargs = kwargs
+        self.checkpoint_path = os.path.join(directory, 'checkpoint.json')
+        self._lock = threading.Lock()
+
+    def run(self,
+            start: datetime = None,
+            end: datetime = None,
+            step: timedelta = None) -> ExportStats:
+        """
+        Export the events from `start` until before `end`.
+
+        :param datetime start: (optional) The start of the time window. Naive
+               datetimes are in UTC.
+        :param datetime end: (optional) The end of the time window.
+        :param timedelta step: (optional) Split the time window into ranges of
+               this length that are exported in parallel. Requires `start` and
+               `end`.
+        :return: The statistics of the export.
+        :rtype: ExportStats
+        """
+        if step is not None:
+            if start is None or end is None:
+                raise ValueError('step requires start and end')
+            ranges = time_ranges(start, end, step)
+        else:
+            ranges = [(start, end)]
+        os.makedirs(self.directory, exist_ok=True)
+        self._checkpoint = self._load_checkpoint()
+        stats = ExportStats()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._export_range, time_range, stats)
+                for time_range in ranges
+            ]
+            for future in futures:
+                future.result()
+        return stats
+
+    def files(self) -> List[str]:
+        """Return the paths of the exported files."""
+        suffix = '.' + self.format
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(suffix))
+
+    def _export_range(self, time_range, stats):
+        key = _range_key(time_range)
+        with self._lock:
+            state = dict(self._checkpoint.get(key) or {})
+        if state.get('done'):
+            return
+        if self.format == 'jsonl':
+            writer = _JsonlWriter(self.directory, key, state)
+        else:
+            writer = _ParquetWriter(self.directory, key, state,
+                                    self.rows_per_file)
+        try:
+            cursor = state.get('cursor')
+            if cursor is not None and (time.time() - state.get('cursor_time', 0)
+                                       > self.cursor_ttl):
+                cursor = None
+            while True:
+                try:
+                    result = self._list(time_range, state, cursor)
+                except ApiException as error:
+                    if cursor is None or get_status_code(error) != 400:
+                        raise
+                    # The cursor expired; continue from the watermark.
+                    cursor = None
+                    stats._add(restarts=1)
+                    continue
+                logs = _after_watermark(result.get('logs') or [], state)
+                cursor = (result.get('pagination') or {}).get('next_cursor')
+                state['cursor'] = cursor
+                state['cursor_time'] = time.time()
+                if cursor is None and time_range[1] is not None:
+                    state['done'] = True
+                if writer.write(logs, state):
+                    self._save(key, state)
+                stats._add(events=len(logs), pages=1)
+                if self.progress is not None:
+                    self.progress(stats)
+                if cursor is None:
+                    break
+            writer.close(state)
+            self._save(key, state)
+        finally:
+            writer.abort()
+
+    def _list(self, time_range, state, cursor):
+        start, end = time_range
+        if cursor is None:
+            # A cursor continues the filter that it was returned for.
+            state['since'] = state.get('watermark')
+        if state.get('since') is not None:
+            start = state['since']
+        clauses = [self.filter] if self.filter else []
+        if start is not None:
+            clauses.append('request_timestamp>=' + _format_time(start))
+        if end is not None:
+            clauses.append('request_timestamp<' + _format_time(end))
+        return self.operation(filter=','.join(clauses) or None,
+                              sort='request_timestamp',
+                              page_limit=self.page_limit,
+                              cursor=cursor,
+                              **self.kwargs).get_result()
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, key, state):
+        with self._lock:
+            self._checkpoint[key] = dict(state)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory,
+                                                     suffix='.tmp')
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump(self._checkpoint, file, indent=2, sort_keys=True)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.checkpoint_path)
+
+
+class _JsonlWriter:
+    """Appends events to one file per range, truncated to the checkpoint."""
+
+    def __init__(self, directory, key, state):
+        self.file = open(os.path.join(directory, 'logs-' + key + '.jsonl'),
+                         'ab+')
+        # Drop events that were written after the last checkpoint.
+        self.file.truncate(state.get('bytes', 0))
+        self.file.seek(0, os.SEEK_END)
+
+    def write(self, logs, state):
+        self.file.write(b''.join(
+            json.dumps(log, separators=(',', ':')).encode('utf-8') + b'\n'
+            for log in logs))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        state['bytes'] = self.file.tell()
+        return True
+
+    def close(self, state):
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    """
+    Buffers events into Parquet files of `rows_per_file` rows. A file is only
+    complete once it is closed, so the checkpoint advances per file.
+    """
+
+    def __init__(self, directory, key, state, rows_per_file):
+        self.pyarrow = require_pyarrow('Parquet log export')
+        self.directory = directory
+        self.key = key
+        self.rows_per_file = rows_per_file
+        self.columns = {column: [] for column in PARQUET_COLUMNS}
+        self.rows = 0
+
+    def write(self, logs, state):
+        for log in logs:
+            for column, values in self.columns.items():
+                value = log.get(column)
+                if value is not None and not isinstance(value, str):
+                    value = json.dumps(value, separators=(',', ':'))
+                values.append(value)
+        self.rows += len(logs)
+        if self.rows < self.rows_per_file and not state.get('done'):
+            return False
+        self._flush(state)
+        return True
+
+    def close(self, state):
+        if self.rows:
+            self._flush(state)
+
+    def abort(self):
+        pass
+
+    def _flush(self, state):
+        if not self.rows:
+            return
+        pyarrow = self.pyarrow
+        schema = pyarrow.schema([(column, pyarrow.string())
+                                 for column in PARQUET_COLUMNS])
+        table = pyarrow.Table.from_pydict(self.columns, schema=schema)
+        number = state.get('files', 0)
+        path = os.path.join(
+            self.directory, 'logs-{0}-{1:05d}.parquet'.format(self.key, number))
+        pyarrow.parquet.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        state['files'] = number + 1
+        self.columns = {column: [] for column in PARQUET_COLUMNS}
+        self.rows = 0
+
+
+def _after_watermark(logs, state):
+    """Drop the events at the watermark that were exported, and advance it."""
+    watermark = state.get('watermark')
+    exported = set(state.get('watermark_ids') or ())
+    ids = list(exported)
+    kept = []
+    for log in logs:
+        timestamp = log.get('request_timestamp')
+        if timestamp == watermark:
+            if log.get('log_id') in exported:
+                continue
+        else:
+            watermark = timestamp
+            exported = set()
+            ids = []
+        ids.append(log.get('log_id'))
+        kept.append(log)
+    state['watermark'] = watermark
+    state['watermark_ids'] = ids
+    return kept
+
+
+def _format_time(value):
+    if isinstance(value, str):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return '{0}.{1:03d}Z'.format(value.strftime('%Y-%m-%dT%H:%M:%S'),
+                                 value.microsecond // 1000)
+
+
+def _range_key(time_range):
+    start, end = time_range
+    return '{0}_{1}'.format(
+        _format_time(start).replace(':', '') if start else 'begin',
+        _format_time(end).replace(':', '') if end else 'open')
@@ -0,0 +1,442 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ibm_cloud_sdk_core.utils import convert_model
+
+from .assistant_v1 import AssistantV1
+from .assistant_bulk_classify import MAX_UTTERANCES, BulkClassifier
+from .assistant_context_policy import ContextPolicy
+from .assistant_dialog_graph import DialogGraph
+from .assistant_entity_matcher import EntityMatcher
+from .assistant_export_stream import DEFAULT_CHUNK_SIZE, ExportStream
+from .assistant_log_export import LogExporter
+from .assistant_waiters import Waiter
+from .assistant_workspace_sync import diff_workspace
+from .pager import Pager
+
+
+class AssistantV1Adapter(AssistantV1):
+
+    def message(self,
+                workspace_id,
+                *,
+                context=None,
+                context_policy: ContextPolicy = None,
+                **kwargs):
+        """
+        Get response to user input. See `AssistantV1.message`.
+
+        :param str workspace_id: The workspace ID.
+        :param Context context: (optional) The context of the conversation.
+        :param ContextPolicy context_policy: (optional) A policy that prunes the
+               context variables before they are sent and records the size of
+               the context of each turn.
+        :param kwargs: The other parameters of `AssistantV1.message`.
+        :rtype: DetailedResponse with `dict` result representing a
+                `MessageResponse` object
+        """
+        if context is not None and context_policy is not None:
+            context = context_policy.apply(convert_model(context))
+        return super().message(workspace_id, context=context, **kwargs)
+
+    def iter_workspaces(self, page_limit=None, prefetch=True, **kwargs):
+        """
+        Iterate the workspaces of all pages of `list_workspaces`.
+
+        The next page is requested while the current page is consumed, and the
+        listing restarts transparently when a page cursor expires.
+
+        :param int page_limit: (optional) The number of records per page.
+        :param bool prefetch: (optional) Whether to request the next page in the
+               background.
+        :param kwargs: The other parameters of `list_workspaces`.
+        :return: A pager that yields the workspaces as dicts.
+        :rtype: Pager
+        """
+        return Pager(self.list_workspaces,
+                     'workspaces',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     **kwargs)
+
+    def iter_intents(self, workspace_id, page_limit=None, prefetch=True,
+                     **kwargs):
+        """
+        Iterate the intents of all pages of `list_intents`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_intents,
+                     'intents',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     **kwargs)
+
+    def iter_examples(self,
+                      workspace_id,
+                      intent,
+                      page_limit=None,
+                      prefetch=True,
+                      **kwargs):
+        """
+        Iterate the examples of all pages of `list_examples`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_examples,
+                     'examples',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     intent=intent,
+                     **kwargs)
+
+    def iter_counterexamples(self,
+                             workspace_id,
+                             page_limit=None,
+                             prefetch=True,
+                             **kwargs):
+        """
+        Iterate the counterexamples of all pages of `list_counterexamples`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_counterexamples,
+                     'counterexamples',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     **kwargs)
+
+    def iter_entities(self, workspace_id, page_limit=None, prefetch=True,
+                      **kwargs):
+        """
+        Iterate the entities of all pages of `list_entities`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_entities,
+                     'entities',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     **kwargs)
+
+    def iter_values(self,
+                    workspace_id,
+                    entity,
+                    page_limit=None,
+                    prefetch=True,
+                    **kwargs):
+        """
+        Iterate the entity values of all pages of `list_values`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_values,
+                     'values',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     entity=entity,
+                     **kwargs)
+
+    def iter_synonyms(self,
+                      workspace_id,
+                      entity,
+                      value,
+                      page_limit=None,
+                      prefetch=True,
+                      **kwargs):
+        """
+        Iterate the synonyms of all pages of `list_synonyms`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_synonyms,
+                     'synonyms',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     entity=entity,
+                     value=value,
+                     **kwargs)
+
+    def iter_dialog_nodes(self,
+                          workspace_id,
+                          page_limit=None,
+                          prefetch=True,
+                          **kwargs):
+        """
+        Iterate the dialog nodes of all pages of `list_dialog_nodes`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_dialog_nodes,
+                     'dialog_nodes',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     **kwargs)
+
+    def iter_logs(self, workspace_id, page_limit=None, prefetch=True, **kwargs):
+        """
+        Iterate the log events of all pages of `list_logs`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_logs,
+                     'logs',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     workspace_id=workspace_id,
+                     **kwargs)
+
+    def iter_all_logs(self, filter, page_limit=None, prefetch=True, **kwargs):
+        """
+        Iterate the log events of all pages of `list_all_logs`. See
+        `iter_workspaces` for the parameters.
+        """
+        return Pager(self.list_all_logs,
+                     'logs',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     filter=filter,
+                     **kwargs)
+
+    def export_all_logs(self,
+                        filter,
+                        directory,
+                        start=None,
+                        end=None,
+                        step=None,
+                        format='jsonl',
+                        page_limit=1000,
+                        max_workers=4,
+                        progress=None,
+                        **kwargs):
+        """
+        Export the log events of all workspaces to JSONL or Parquet files with
+        a checkpoint, so that an interrupted or repeated export resumes where
+        it stopped.
+
+        :param str filter: The filter of `list_all_logs`, which must include a
+               `language`, `workspace_id` or `request.context.metadata.deployment`
+               clause. The time range is added to it.
+        :param str directory: The directory for the files and the checkpoint.
+        :param datetime start: (optional) The start of the time window.
+        :param datetime end: (optional) The end of the time window.
+        :param timedelta step: (optional) Export ranges of this length of the
+               time window in parallel.
+        :param str format: (optional) `jsonl` or `parquet`.
+        :param int page_limit: (optional) The number of events per page.
+        :param int max_workers: (optional) The number of ranges that are
+               exported in parallel.
+        :param progress: (optional) A function that is called with the
+               `ExportStats` after each page.
+        :param kwargs: The other parameters of `LogExporter`.
+        :return: The statistics of the export.
+        :rtype: ExportStats
+        """
+        exporter = LogExporter(self.list_all_logs,
+                               directory,
+                               format=format,
+                               filter=filter,
+                               page_limit=page_limit,
+                               max_workers=max_workers,
+                               progress=progress,
+                               **kwargs)
+        return exporter.run(start=start, end=end, step=step)
+
+    def sync_workspace(self,
+                       workspace_id,
+                       workspace,
+                       max_operations=100,
+                       max_concurrency=4,
+                       dry_run=False,
+                       **kwargs):
+        """
+        Update a workspace to match a local copy with the fewest calls.
+
+        The workspace on the service is exported and compared with the local
+        copy, and only the intents, examples, entities, values, synonyms,
+        counterexamples and dialog nodes that differ are created, updated or
+        deleted, in dependency order and with bounded concurrency. When the
+        difference needs more than `max_operations` calls or cannot be made
+        with individual calls, the workspace is replaced with one
+        `update_workspace` call instead.
+
+        :param str workspace_id: The workspace ID.
+        :param dict workspace: The local workspace, in the format of
+               `get_workspace` with `export=True`.
+        :param int max_operations: (optional) The maximum number of individual
+               calls before falling back to a bulk update.
+        :param int max_concurrency: (optional) The maximum number of concurrent
+               calls.
+        :param bool dry_run: (optional) Return the plan without applying it.
+        :param kwargs: The other parameters of `get_workspace`.
+        :return: The plan of the calls.
+        :rtype: WorkspacePlan
+        """
+        current = self.get_workspace(workspace_id, export=True,
+                                     **kwargs).get_result()
+        plan = diff_workspace(current, workspace, max_operations=max_operations)
+        if not dry_run:
+            plan.apply(self, workspace_id, max_concurrency=max_concurrency)
+        return plan
+
+    def iter_bulk_classify(self,
+                           workspace_id,
+                           utterances,
+                           chunk_size=MAX_UTTERANCES,
+                           max_concurrency=4,
+                           requests_per_second=None,
+                           max_retries=3,
+                           **kwargs):
+        """
+        Classify any number of utterances with `bulk_classify`, in concurrent
+        chunks, and yield the output of each utterance in input order.
+
+        :param str workspace_id: Unique identifier of the workspace.
+        :param utterances: Strings or `{'text': ...}` dicts, in any number.
+        :param int chunk_size: (optional) The number of utterances per request,
+               at most 50.
+        :param int max_concurrency: (optional) The maximum number of concurrent
+               requests.
+        :param float requests_per_second: (optional) The maximum rate of
+               requests, including retries.
+        :param int max_retries: (optional) The number of retries of a chunk
+               that fails with a rate limit, server or connection error.
+        :param kwargs: The other parameters of `bulk_classify`.
+        :return: A generator of `BulkClassifyOutput` dicts.
+        """
+        return self._bulk_classifier(workspace_id, chunk_size, max_concurrency,
+                                     requests_per_second, max_retries,
+                                     kwargs).iter_outputs(utterances)
+
+    def bulk_classify_all(self,
+                          workspace_id,
+                          utterances,
+                          intents=None,
+                          chunk_size=MAX_UTTERANCES,
+                          max_concurrency=4,
+                          requests_per_second=None,
+                          max_retries=3,
+                          **kwargs):
+        """
+        Classify any number of utterances like `iter_bulk_classify` and return
+        the top intent and confidence of each as NumPy arrays.
+
+        :param list intents: (optional) The intent names in the order of their
+               indices in the results. See `iter_bulk_classify` for the other
+               parameters.
+        :rtype: BulkClassifyResults
+        """
+        return self._bulk_classifier(workspace_id, chunk_size, max_concurrency,
+                                     requests_per_second, max_retries,
+                                     kwargs).classify_all(utterances, intents)
+
+    def _bulk_classifier(self, workspace_id, chunk_size, max_concurrency,
+                         requests_per_second, max_retries, kwargs):
+        return BulkClassifier(
+            lambda chunk: self.bulk_classify(
+                workspace_id, input=chunk, **kwargs),
+            chunk_size=chunk_size,
+            max_concurrency=max_concurrency,
+            requests_per_second=requests_per_second,
+            max_retries=max_retries)
+
+    def workspace_waiter(self, workspace_id, **kwargs):
+        """
+        Return a waiter for `create_workspace_async` or `update_workspace_async`
+        that polls `get_workspace` until the workspace is available.
+
+        :param str workspace_id: The workspace ID.
+        :param kwargs: The options of `Waiter`, such as `timeout`, `delay` and
+               `max_delay`.
+        :rtype: Waiter
+        """
+        return Waiter(lambda: self.get_workspace(workspace_id), **kwargs)
+
+    def workspace_export_waiter(self, workspace_id, **kwargs):
+        """
+        Return a waiter for `export_workspace_async` that repeats the request
+        until the export completes. The result of the waiter is the exported
+        workspace.
+
+        :param str workspace_id: The workspace ID.
+        :param kwargs: The options of `Waiter`, such as `timeout`, `delay` and
+               `max_delay`.
+        :rtype: Waiter
+        """
+        return Waiter(lambda: self.export_workspace_async(workspace_id),
+                      **kwargs)
+
+    def stream_workspace(self,
+                         workspace_id,
+                         asynchronous=False,
+                         chunk_size=DEFAULT_CHUNK_SIZE,
+                         **kwargs):
+        """
+        Stream the export of a workspace instead of loading it into memory.
+
+        The returned stream yields the body in chunks, can `save` it to a file
+        with optional gzip compression, and can parse sections of it
+        incrementally with `iter_items`, for example `intents.item`.
+
+        :param str workspace_id: The workspace ID.
+        :param bool asynchronous: (optional) Download the result of
+               `export_workspace_async` instead of `get_workspace` with
+               `export=True`. Wait for the export to complete first.
+        :param int chunk_size: (optional) The size of the chunks.
+        :param kwargs: The other parameters of the export method.
+        :rtype: ExportStream
+        """
+        if asynchronous:
+            response = self.export_workspace_async(workspace_id,
+                                                   stream=True,
+                                                   **kwargs)
+        else:
+            kwargs.setdefault('export', True)
+            response = self.get_workspace(workspace_id, stream=True, **kwargs)
+        return ExportStream(response.get_result(), chunk_size=chunk_size)
+
+    def entity_matcher(self,
+                       workspace_id,
+                       case_sensitive=False,
+                       whole_words=True,
+                       **kwargs):
+        """
+        Compile the dictionary and pattern entities of a workspace into an
+        `EntityMatcher`, which finds them in text locally instead of with a
+        `message` request per utterance.
+
+        :param str workspace_id: The workspace ID.
+        :param bool case_sensitive: (optional) Whether values and synonyms match
+               only with the same case.
+        :param bool whole_words: (optional) Whether values and synonyms match
+               only whole words.
+        :param kwargs: The other parameters of `iter_entities`.
+        :rtype: EntityMatcher
+        """
+        kwargs.setdefault('export', True)
+        return EntityMatcher(self.iter_entities(workspace_id, **kwargs),
+                             case_sensitive=case_sensitive,
+                             whole_words=whole_words)
+
+    def dialog_graph(self, workspace_id, **kwargs):
+        """
+        Load the dialog nodes of a workspace into a `DialogGraph`, for
+        traversing, validating and reordering the dialog tree.
+
+        :param str workspace_id: The workspace ID.
+        :param kwargs: The other parameters of `iter_dialog_nodes`.
+        :rtype: DialogGraph
+        """
+        return DialogGraph(self.iter_dialog_nodes(workspace_id, **kwargs))
@@ -0,0 +1,306 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from .assistant_v2 import AssistantV2
+from .assistant_bulk_classify import MAX_UTTERANCES, BulkClassifier
+from .assistant_export_stream import DEFAULT_CHUNK_SIZE, ExportStream
+from .assistant_log_export import LogExporter
+from .assistant_waiters import Waiter
+from .pager import Pager
+
+
+class AssistantV2Adapter(AssistantV2):
+
+    def iter_assistants(self, page_limit=None, prefetch=True, **kwargs):
+        """
+        Iterate the assistants of all pages of `list_assistants`.
+
+        The next page is requested while the current page is consumed, and the
+        listing restarts transparently when a page cursor expires.
+
+        :param int page_limit: (optional) The number of records per page.
+        :param bool prefetch: (optional) Whether to request the next page in the
+               background.
+        :param kwargs: The other parameters of `list_assistants`.
+        :return: A pager that yields the assistants as dicts.
+        :rtype: Pager
+        """
+        return Pager(self.list_assistants,
+                     'assistants',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     **kwargs)
+
+    def iter_providers(self, page_limit=None, prefetch=True, **kwargs):
+        """
+        Iterate the conversational skill providers of all pages of
+        `list_providers`. See `iter_assistants` for the parameters.
+        """
+        return Pager(self.list_providers,
+                     'conversational_skill_providers',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     **kwargs)
+
+    def iter_logs(self, assistant_id, page_limit=None, prefetch=True, **kwargs):
+        """
+        Iterate the log events of all pages of `list_logs`. See
+        `iter_assistants` for the parameters.
+        """
+        return Pager(self.list_logs,
+                     'logs',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     assistant_id=assistant_id,
+                     **kwargs)
+
+    def iter_environments(self,
+                          assistant_id,
+                          page_limit=None,
+                          prefetch=True,
+                          **kwargs):
+        """
+        Iterate the environments of all pages of `list_environments`. See
+        `iter_assistants` for the parameters.
+        """
+        return Pager(self.list_environments,
+                     'environments',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     assistant_id=assistant_id,
+                     **kwargs)
+
+    def iter_releases(self,
+                      assistant_id,
+                      page_limit=None,
+                      prefetch=True,
+                      **kwargs):
+        """
+        Iterate the releases of all pages of `list_releases`. See
+        `iter_assistants` for the parameters.
+        """
+        return Pager(self.list_releases,
+                     'releases',
+                     page_limit=page_limit,
+                     prefetch=prefetch,
+                     assistant_id=assistant_id,
+                     **kwargs)
+
+    def export_logs(self,
+                    assistant_id,
+                    directory,
+                    start=None,
+                    end=None,
+                    step=None,
+                    format='jsonl',
+                    filter=None,
+                    page_limit=1000,
+                    max_workers=4,
+                    progress=None,
+                    **kwargs):
+        """
+        Export the log events of an assistant to JSONL or Parquet files with a
+        checkpoint, so that an interrupted or repeated export resumes where it
+        stopped. See `LogExporter` for the details.
+
+        :param str assistant_id: The assistant ID or the environment ID.
+        :param str directory: The directory for the files and the checkpoint.
+        :param datetime start: (optional) The start of the time window.
+        :param datetime end: (optional) The end of the time window.
+        :param timedelta step: (optional) Export ranges of this length of the
+               time window in parallel.
+        :param str format: (optional) `jsonl` or `parquet`.
+        :param str filter: (optional) The filter of `list_logs`. The time range
+               is added to it.
+        :param int page_limit: (optional) The number of events per page.
+        :param int max_workers: (optional) The number of ranges that are
+               exported in parallel.
+        :param progress: (optional) A function that is called with the
+               `ExportStats` after each page.
+        :param kwargs: The other parameters of `LogExporter`.
+        :return: The statistics of the export.
+        :rtype: ExportStats
+        """
+        exporter = LogExporter(self.list_logs,
+                               directory,
+                               format=format,
+                               filter=filter,
+                               page_limit=page_limit,
+                               max_workers=max_workers,
+                               progress=progress,
+                               assistant_id=assistant_id,
+                               **kwargs)
+        return exporter.run(start=start, end=end, step=step)
+
+    def iter_bulk_classify(self,
+                           skill_id,
+                           utterances,
+                           chunk_size=MAX_UTTERANCES,
+                           max_concurrency=4,
+                           requests_per_second=None,
+                           max_retries=3,
+                           **kwargs):
+        """
+        Classify any number of utterances with `bulk_classify`, in concurrent
+        chunks, and yield the output of each utterance in input order.
+
+        :param str skill_id: Unique identifier of the skill.
+        :param utterances: Strings or `{'text': ...}` dicts, in any number.
+        :param int chunk_size: (optional) The number of utterances per request,
+               at most 50.
+        :param int max_concurrency: (optional) The maximum number of concurrent
+               requests.
+        :param float requests_per_second: (optional) The maximum rate of
+               requests, including retries.
+        :param int max_retries: (optional) The number of retries of a chunk
+               that fails with a rate limit, server or connection error.
+        :param kwargs: The other parameters of `bulk_classify`.
+        :return: A generator of `BulkClassifyOutput` dicts.
+        """
+        return self._bulk_classifier(skill_id, chunk_size, max_concurrency,
+                                     requests_per_second, max_retries,
+                                     kwargs).iter_outputs(utterances)
+
+    def bulk_classify_all(self,
+                          skill_id,
+                          utterances,
+                          intents=None,
+                          chunk_size=MAX_UTTERANCES,
+                          max_concurrency=4,
+                          requests_per_second=None,
+                          max_retries=3,
+                          **kwargs):
+        """
+        Classify any number of utterances like `iter_bulk_classify` and return
+        the top intent and confidence of each as NumPy arrays.
+
+        :param list intents: (optional) The intent names in the order of their
+               indices in the results. See `iter_bulk_classify` for the other
+               parameters.
+        :rtype: BulkClassifyResults
+        """
+        return self._bulk_classifier(skill_id, chunk_size, max_concurrency,
+                                     requests_per_second, max_retries,
+                                     kwargs).classify_all(utterances, intents)
+
+    def _bulk_classifier(self, skill_id, chunk_size, max_concurrency,
+                         requests_per_second, max_retries, kwargs):
+        return BulkClassifier(
+            lambda chunk: self.bulk_classify(skill_id, chunk, **kwargs),
+            chunk_size=chunk_size,
+            max_concurrency=max_concurrency,
+            requests_per_second=requests_per_second,
+            max_retries=max_retries)
+
+    def release_waiter(self, assistant_id, release, **kwargs):
+        """
+        Return a waiter for `create_release` that polls `get_release` until the
+        release is available.
+
+        :param str assistant_id: The assistant ID.
+        :param str release: The release number.
+        :param kwargs: The options of `Waiter`, such as `timeout`, `delay` and
+               `max_delay`.
+        :rtype: Waiter
+        """
+        return Waiter(lambda: self.get_release(assistant_id, release), **kwargs)
+
+    def deployment_waiter(self, assistant_id, environment_id, release,
+                          **kwargs):
+        """
+        Return a waiter for `deploy_release` that polls `get_environment` until
+        the environment refers to the release.
+
+        :param str assistant_id: The assistant ID.
+        :param str environment_id: The environment ID.
+        :param str release: The release number.
+        :param kwargs: The options of `Waiter`, such as `timeout`, `delay` and
+               `max_delay`.
+        :rtype: Waiter
+        """
+
+        def status(environment):
+            reference = environment.get('release_reference') or {}
+            if reference.get('release') == release:
+                return 'Available'
+            return 'Processing'
+
+        return Waiter(lambda: self.get_environment(assistant_id, environment_id),
+                      status=status,
+                      **kwargs)
+
+    def release_import_waiter(self, assistant_id, **kwargs):
+        """
+        Return a waiter for `create_release_import` that polls
+        `get_release_import_status` until the import completes.
+
+        :param str assistant_id: The assistant ID.
+        :param kwargs: The options of `Waiter`, such as `timeout`, `delay` and
+               `max_delay`.
+        :rtype: Waiter
+        """
+        return Waiter(lambda: self.get_release_import_status(assistant_id),
+                      **kwargs)
+
+    def skills_import_waiter(self, assistant_id, **kwargs):
+        """
+        Return a waiter for `import_skills` that polls `import_skills_status`
+        until the import completes.
+
+        :param str assistant_id: The assistant ID.
+        :param kwargs: The options of `Waiter`, such as `timeout`, `delay` and
+               `max_delay`.
+        :rtype: Waiter
+        """
+        return Waiter(lambda: self.import_skills_status(assistant_id), **kwargs)
+
+    def stream_release_export(self,
+                              assistant_id,
+                              release,
+                              chunk_size=DEFAULT_CHUNK_SIZE,
+                              **kwargs):
+        """
+        Stream the artifact of `download_release_export` instead of loading it
+        into memory. Wait for the export to be created first.
+
+        :param str assistant_id: The assistant ID.
+        :param str release: The release number.
+        :param int chunk_size: (optional) The size of the chunks.
+        :param kwargs: The other parameters of `download_release_export`.
+        :rtype: ExportStream
+        """
+        response = self.download_release_export(assistant_id,
+                                                release,
+                                                stream=True,
+                                                **kwargs)
+        return ExportStream(response.get_result(), chunk_size=chunk_size)
+
+    def stream_skills_export(self,
+                             assistant_id,
+                             chunk_size=DEFAULT_CHUNK_SIZE,
+                             **kwargs):
+        """
+        Stream the result of `export_skills` instead of loading it into memory.
+        Wait for the export to complete first. Sections can be parsed
+        incrementally with `iter_items`, for example `assistant_skills.item`.
+
+        :param str assistant_id: The assistant ID.
+        :param int chunk_size: (optional) The size of the chunks.
+        :param kwargs: The other parameters of `export_skills`.
+        :rtype: ExportStream
+        """
+        response = self.export_skills(assistant_id, stream=True, **kwargs)
+        return ExportStream(response.get_result(), chunk_size=chunk_size)
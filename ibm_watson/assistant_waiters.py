@@ -0,0 +1,239 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Waiters that poll asynchronous Assistant operations until they complete.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Tuple
+import asyncio
+import heapq
+import random
+import threading
+import time
+
+SUCCESS = ('Available', 'Completed')
+FAILURE = ('Failed', 'Non Existent', 'Unavailable')
+
+
+class WaiterError(Exception):
+    """
+    An asynchronous operation failed, timed out or was cancelled.
+
+    :param dict result: The last result of the status request, if any.
+    """
+
+    def __init__(self, message: str, result: Dict = None) -> None:
+        Exception.__init__(self, message)
+        self.result = result
+
+
+class WaiterTimeoutError(WaiterError, TimeoutError):
+    """The operation did not complete before the deadline."""
+
+
+class WaiterCancelledError(WaiterError):
+    """The waiter was cancelled."""
+
+
+def _status(result):
+    return result.get('status')
+
+
+class Waiter:
+    """
+    Polls the status of an asynchronous operation until it completes.
+
+    The delay between polls grows exponentially from `delay` to `max_delay`,
+    with random jitter so that many waiters do not poll in lockstep. Use
+    `wait` or `wait_async` for one operation, and `wait_all` for many
+    operations at once.
+
+    :param poll: A function that requests the status, returning a
+           `DetailedResponse`, such as `get_workspace` with its arguments bound.
+    :param status: (optional) A function that returns the status of a result.
+    :param tuple success: (optional) The statuses of a completed operation.
+    :param tuple failure: (optional) The statuses of a failed operation.
+    :param float delay: (optional) The seconds before the second poll.
+    :param float max_delay: (optional) The maximum seconds between polls.
+    :param float timeout: (optional) The seconds after which waiting fails with
+           `WaiterTimeoutError`, or `None` to wait without a deadline.
+    """
+
+    def __init__(self,
+                 poll: Callable,
+                 status: Callable[[Dict], str] = _status,
+                 success: Tuple[str] = SUCCESS,
+                 failure: Tuple[str] = FAILURE,
+                 delay: float = 1.0,
+                 max_delay: float = 30.0,
+                 timeout: float = 600.0) -> None:
+        self.poll = poll
+        self.status = status
+        self.success = success
+        self.failure = failure
+        self.delay = delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.attempts = 0
+        self.result = None
+        self._deadline = None
+        self._cancelled = threading.Event()
+
+    def wait(self) -> Dict:
+        """
+        Poll until the operation completes.
+
+        :return: The result of the last status request.
+        :rtype: dict
+        :raises WaiterError: If the operation failed, the deadline passed or the
+                waiter was cancelled.
+        """
+        while not self.poll_once():
+            self._cancelled.wait(self._next_delay())
+        return self.result
+
+    async def wait_async(self) -> Dict:
+        """
+        Like `wait`, for asyncio. The status requests run in the default
+        executor, so many waiters can be awaited concurrently, for example with
+        `asyncio.gather`.
+        """
+        loop = asyncio.get_running_loop()
+        while not await loop.run_in_executor(None, self.poll_once):
+            await asyncio.sleep(self._next_delay())
+        return self.result
+
+    def cancel(self) -> None:
+        """Stop waiting. The waiting call raises `WaiterCancelledError`."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def poll_once(self) -> bool:
+        """
+        Request the status once.
+
+        :return: Whether the operation completed.
+        :raises WaiterError: If the operation failed, the deadline passed or the
+                waiter was cancelled.
+        """
+        self._check()
+        self.result = self.poll().get_result()
+        self.attempts += 1
+        status = self.status(self.result)
+        if status in self.success:
+            return True
+        if status in self.failure:
+            raise WaiterError(
+                'The operation failed with status {0}: {1}'.format(
+                    status, _describe(self.result)), self.result)
+        return False
+
+    def _check(self):
+        if self._deadline is None and self.timeout is not None:
+            self._deadline = time.monotonic() + self.timeout
+        if self.cancelled:
+            raise WaiterCancelledError('The waiter was cancelled', self.result)
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise WaiterTimeoutError(
+                'The operation did not complete in {0} seconds'.format(
+                    self.timeout), self.result)
+
+    def _next_delay(self):
+        """Return the jittered delay before the next poll, within the deadline."""
+        delay = min(self.max_delay, self.delay * 2**max(self.attempts - 1, 0))
+        delay *= random.uniform(0.5, 1.0)
+        if self._deadline is not None:
+            # Poll once more at the deadline instead of sleeping past it.
+            delay = min(delay, max(self._deadline - time.monotonic(), 0) + 0.01)
+        return delay
+
+
+def wait_all(waiters: Iterable[Waiter],
+             max_concurrency: int = 8,
+             return_exceptions: bool = False) -> List:
+    """
+    Wait for many operations from one thread.
+
+    The waiters are scheduled by their next poll time and at most
+    `max_concurrency` status requests run at a time, so waiting for many
+    operations needs neither a thread per operation nor more requests than
+    polling each one on its own.
+
+    :param waiters: The waiters.
+    :param int max_concurrency: (optional) The maximum number of concurrent
+           status requests.
+    :param bool return_exceptions: (optional) Return the `WaiterError` and
+           `ApiException` of failed operations in the results instead of
+           cancelling the other waiters and raising the first one.
+    :return: The result of each waiter, in order.
+    :rtype: list
+    """
+    waiters = list(waiters)
+    results = [None] * len(waiters)
+    schedule = [(0.0, index) for index in range(len(waiters))]
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        try:
+            while schedule or running:
+                now = time.monotonic()
+                while (schedule and schedule[0][0] <= now and
+                       len(running) < max_concurrency):
+                    _, index = heapq.heappop(schedule)
+                    running[executor.submit(waiters[index].poll_once)] = index
+                timeout = None
+                if schedule and len(running) < max_concurrency:
+                    timeout = max(schedule[0][0] - now, 0)
+                if not running:
+                    time.sleep(timeout)
+                    continue
+                done, _ = wait(running, timeout=timeout,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        completed = future.result()
+                    except Exception as error:
+                        if not return_exceptions:
+                            raise
+                        results[index] = error
+                        continue
+                    if completed:
+                        results[index] = waiters[index].result
+                    else:
+                        heapq.heappush(schedule,
+                                       (time.monotonic() +
+                                        waiters[index]._next_delay(), index))
+        except BaseException:
+            for waiter in waiters:
+                waiter.cancel()
+            raise
+    return results
+
+
+def _describe(result):
+    description = result.get('status_description')
+    errors = result.get('status_errors')
+    if errors:
+        messages = '; '.join(
+            error.get('message', str(error)) if isinstance(error, dict) else
+            str(error) for error in errors)
+        description = '{0} ({1})'.format(description, messages) if (
+            description) else messages
+    return description or 'no description'
@@ -0,0 +1,494 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Differences between workspaces as minimal sets of AssistantV1 calls.
+"""
+
+from collections import deque, namedtuple
+from typing import Dict, List
+
+from .common import iter_ordered
+
+WORKSPACE_FIELDS = ('name', 'description', 'language', 'metadata',
+                    'learning_opt_out', 'system_settings', 'webhooks')
+COLLECTIONS = ('intents', 'entities', 'counterexamples', 'dialog_nodes')
+ENTITY_FIELDS = ('description', 'metadata', 'fuzzy_match')
+VALUE_FIELDS = ('metadata', 'type', 'patterns')
+DIALOG_NODE_FIELDS = ('description', 'conditions', 'parent',
+                      'previous_sibling', 'output', 'context', 'metadata',
+                      'next_step', 'title', 'type', 'event_name', 'variable',
+                      'actions', 'digress_in', 'digress_out',
+                      'digress_out_slots', 'user_label',
+                      'disambiguation_opt_out')
+# Fields that position a dialog node in the tree.
+STRUCTURE_FIELDS = ('parent', 'previous_sibling')
+# Values that the service assumes for absent fields.
+_VALUE_DEFAULTS = {'type': 'synonyms'}
+_DIALOG_NODE_DEFAULTS = {'type': 'standard'}
+# The arguments of the create methods.
+_ENTITY_ARGUMENTS = ('entity',) + ENTITY_FIELDS + ('values',)
+_VALUE_ARGUMENTS = ('value',) + VALUE_FIELDS + ('synonyms',)
+_INTENT_ARGUMENTS = ('intent', 'description', 'examples')
+_EXAMPLE_ARGUMENTS = ('text', 'mentions')
+_DIALOG_NODE_ARGUMENTS = ('dialog_node',) + DIALOG_NODE_FIELDS
+_NODE_CONTENT_FIELDS = tuple(
+    field for field in DIALOG_NODE_FIELDS if field not in STRUCTURE_FIELDS)
+
+Operation = namedtuple('Operation', ['method', 'kwargs'])
+Operation.__doc__ = """
+A call of an AssistantV1 method. `kwargs` are the arguments besides the
+workspace ID.
+"""
+
+
+class WorkspacePlan:
+    """
+    The calls that change a workspace into another one.
+
+    The calls are grouped in phases that run in dependency order: entities
+    before the values and synonyms that belong to them and before the intent
+    examples that mention them, new dialog nodes before the nodes that refer to
+    them, and deletions of intents and entities after the dialog nodes that
+    may use them. The calls of a phase are independent and can run
+    concurrently, except in the phases that create, move or delete dialog
+    nodes, where the order of siblings depends on the order of the calls.
+
+    :param list phases: A list of `(operations, concurrent)` tuples.
+    :param bool bulk: Whether the plan is a single `update_workspace` call
+           with the complete workspace.
+    :param list unsupported: The changes that cannot be made with individual
+           calls, like removing a field of a dialog node.
+    """
+
+    def __init__(self,
+                 phases: List = None,
+                 bulk: bool = False,
+                 unsupported: List[str] = None) -> None:
+        self.phases = phases or []
+        self.bulk = bulk
+        self.unsupported = unsupported or []
+
+    @property
+    def operations(self) -> List[Operation]:
+        """The calls of all phases in order."""
+        return [
+            operation for operations, _ in self.phases
+            for operation in operations
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(operations) for operations, _ in self.phases)
+
+    def apply(self, service, workspace_id: str,
+              max_concurrency: int = 4) -> List:
+        """
+        Make the calls of the plan, phase by phase. A failed call raises its
+        exception after the running calls of the phase completed, and the
+        later phases are not started.
+
+        :param AssistantV1 service: The service.
+        :param str workspace_id: The workspace ID.
+        :param int max_concurrency: (optional) The maximum number of concurrent
+               calls within a phase.
+        :return: The `DetailedResponse` of each call in order.
+        :rtype: list
+        """
+
+        def call(operation):
+            return getattr(service, operation.method)(workspace_id=workspace_id,
+                                                      **operation.kwargs)
+
+        responses = []
+        for operations, concurrent in self.phases:
+            responses.extend(
+                iter_ordered(call, operations,
+                             max_concurrency if concurrent else 1))
+        return responses
+
+    def __repr__(self) -> str:
+        return 'WorkspacePlan(operations={0}, bulk={1})'.format(
+            len(self), self.bulk)
+
+
+def diff_workspace(current: Dict,
+                   target: Dict,
+                   max_operations: int = None) -> WorkspacePlan:
+    """
+    Compute the calls that change the workspace `current` into `target`.
+
+    Both workspaces are dicts in the format of `get_workspace` with
+    `export=True`. Intents, examples, entities, values, synonyms,
+    counterexamples and dialog nodes are matched by their names, texts or
+    IDs, so a renamed item is deleted and created again. When the changes
+    cannot be made with individual calls or need more than `max_operations`
+    calls, the plan is a single `update_workspace` call with the complete
+    target workspace instead.
+
+    :param dict current: The workspace on the service.
+    :param dict target: The changed workspace.
+    :param int max_operations: (optional) The maximum number of individual
+           calls before falling back to a bulk update.
+    :rtype: WorkspacePlan
+    """
+    diff = _Diff()
+    diff.workspace(current, target)
+    diff.entities(_index(current.get('entities'), 'entity'),
+                  _index(target.get('entities'), 'entity'))
+    diff.intents(_index(current.get('intents'), 'intent'),
+                 _index(target.get('intents'), 'intent'))
+    diff.counterexamples(_index(current.get('counterexamples'), 'text'),
+                         _index(target.get('counterexamples'), 'text'))
+    diff.dialog_nodes(_index(current.get('dialog_nodes'), 'dialog_node'),
+                      _index(target.get('dialog_nodes'), 'dialog_node'))
+    plan = WorkspacePlan(
+        [(operations, concurrent)
+         for operations, concurrent in diff.phases
+         if operations], unsupported=diff.unsupported)
+    if plan.unsupported or (max_operations is not None and
+                            len(plan) > max_operations):
+        return bulk_plan(target, unsupported=plan.unsupported)
+    return plan
+
+
+def bulk_plan(target: Dict, unsupported: List[str] = None) -> WorkspacePlan:
+    """Return a plan that replaces the workspace with `target` in one call."""
+    kwargs = {
+        field: target[field]
+        for field in WORKSPACE_FIELDS
+        if target.get(field) is not None
+    }
+    for collection in COLLECTIONS:
+        kwargs[collection] = target.get(collection) or []
+    return WorkspacePlan([([Operation('update_workspace', kwargs)], False)],
+                         bulk=True,
+                         unsupported=unsupported)
+
+
+class _Diff:
+
+    def __init__(self):
+        self.unsupported = []
+        (self.workspace_updates, self.entity_updates, self.value_updates,
+         self.synonym_updates, self.intent_updates, self.example_updates,
+         self.counterexample_updates, self.node_changes, self.node_updates,
+         self.node_deletes, self.deletes) = [[] for _ in range(11)]
+        self.phases = [
+            (self.workspace_updates, False),
+            (self.entity_updates, True),
+            (self.value_updates, True),
+            (self.synonym_updates, True),
+            (self.intent_updates, True),
+            (self.example_updates, True),
+            (self.counterexample_updates, True),
+            (self.node_changes, False),
+            (self.node_updates, True),
+            (self.node_deletes, False),
+            (self.deletes, True),
+        ]
+
+    def workspace(self, current, target):
+        changes = self.changes('workspace', current, target, WORKSPACE_FIELDS)
+        if changes:
+            self.workspace_updates.append(
+                Operation('update_workspace', changes))
+
+    def entities(self, current, target):
+        for name, entity in target.items():
+            if name not in current:
+                self.entity_updates.append(
+                    Operation('create_entity', _fields(entity, _ENTITY_ARGUMENTS)))
+                continue
+            changes = self.changes('entity ' + name, current[name], entity,
+                                   ENTITY_FIELDS, prefix='new_')
+            if changes:
+                self.entity_updates.append(
+                    Operation('update_entity', dict(entity=name, **changes)))
+            self.values(name, _index(current[name].get('values'), 'value'),
+                        _index(entity.get('values'), 'value'))
+        for name in current:
+            if name not in target:
+                self.deletes.append(Operation('delete_entity', {'entity': name}))
+
+    def values(self, entity, current, target):
+        for name, value in target.items():
+            if name not in current:
+                self.value_updates.append(
+                    Operation('create_value',
+                              dict(entity=entity, **_fields(value, _VALUE_ARGUMENTS))))
+                continue
+            changes = self.changes('value {0}:{1}'.format(entity, name),
+                                   current[name],
+                                   value,
+                                   VALUE_FIELDS,
+                                   prefix='new_',
+                                   defaults=_VALUE_DEFAULTS)
+            if changes:
+                self.value_updates.append(
+                    Operation('update_value',
+                              dict(entity=entity, value=name, **changes)))
+            current_synonyms = current[name].get('synonyms') or []
+            target_synonyms = value.get('synonyms') or []
+            for synonym in target_synonyms:
+                if synonym not in current_synonyms:
+                    self.synonym_updates.append(
+                        Operation('create_synonym', {
+                            'entity': entity,
+                            'value': name,
+                            'synonym': synonym
+                        }))
+            for synonym in current_synonyms:
+                if synonym not in target_synonyms:
+                    self.synonym_updates.append(
+                        Operation('delete_synonym', {
+                            'entity': entity,
+                            'value': name,
+                            'synonym': synonym
+                        }))
+        for name in current:
+            if name not in target:
+                self.value_updates.append(
+                    Operation('delete_value', {
+                        'entity': entity,
+                        'value': name
+                    }))
+
+    def intents(self, current, target):
+        for name, intent in target.items():
+            if name not in current:
+                self.intent_updates.append(
+                    Operation('create_intent', _fields(intent, _INTENT_ARGUMENTS)))
+                continue
+            changes = self.changes('intent ' + name, current[name], intent,
+                                   ('description',), prefix='new_')
+            if changes:
+                self.intent_updates.append(
+                    Operation('update_intent', dict(intent=name, **changes)))
+            self.examples(name, _index(current[name].get('examples'), 'text'),
+                          _index(intent.get('examples'), 'text'))
+        for name in current:
+            if name not in target:
+                self.deletes.append(Operation('delete_intent', {'intent': name}))
+
+    def examples(self, intent, current, target):
+        for text, example in target.items():
+            if text not in current:
+                self.example_updates.append(
+                    Operation('create_example',
+                              dict(intent=intent, **_fields(example, _EXAMPLE_ARGUMENTS))))
+                continue
+            changes = self.changes('example ' + text, current[text], example,
+                                   ('mentions',), prefix='new_')
+            if changes:
+                self.example_updates.append(
+                    Operation('update_example',
+                              dict(intent=intent, text=text, **changes)))
+        for text in current:
+            if text not in target:
+                self.example_updates.append(
+                    Operation('delete_example', {
+                        'intent': intent,
+                        'text': text
+                    }))
+
+    def counterexamples(self, current, target):
+        for text in target:
+            if text not in current:
+                self.counterexample_updates.append(
+                    Operation('create_counterexample', {'text': text}))
+        for text in current:
+            if text not in target:
+                self.counterexample_updates.append(
+                    Operation('delete_counterexample', {'text': text}))
+
+    def dialog_nodes(self, current, target):
+        updates = {}
+        for name, node in target.items():
+            if name in current:
+                changes = self.changes('dialog node ' + name,
+                                       current[name],
+                                       node,
+                                       _NODE_CONTENT_FIELDS,
+                                       prefix='new_',
+                                       defaults=_DIALOG_NODE_DEFAULTS)
+                if changes:
+                    updates[name] = changes
+        tree = _Tree(current)
+
+        def move(name, changes):
+            parent = changes.get('new_parent', tree.parent[name])
+            # A node that moves to another parent without a previous sibling
+            # becomes its first child.
+            previous = changes.get(
+                'new_previous_sibling',
+                None if 'new_parent' in changes else tree.previous[name])
+            changes.update(updates.pop(name, {}))
+            self.node_changes.append(
+                Operation('update_dialog_node', dict(dialog_node=name,
+                                                     **changes)))
+            tree.unlink(name)
+            tree.link(name, parent, previous)
+
+        # The nodes are created and moved in the order of the target tree,
+        # parents before their children and each node after its previous
+        # sibling, so every node that a call refers to is already in place.
+        # A move to the root level cannot be made and ends the plan, which
+        # falls back to a bulk update.
+        for name in _Tree(target).walk():
+            node = target[name]
+            parent = node.get('parent')
+            previous = node.get('previous_sibling')
+            if name not in current:
+                self.node_changes.append(
+                    Operation('create_dialog_node',
+                              _fields(node, _DIALOG_NODE_ARGUMENTS)))
+                tree.link(name, parent, previous)
+                continue
+            if (tree.parent[name], tree.previous[name]) == (parent, previous):
+                continue
+            if parent is None and tree.parent[name] is not None:
+                self.unsupported.append(
+                    'dialog node {0}: remove parent'.format(name))
+                return
+            changes = {}
+            if parent != tree.parent[name]:
+                changes['new_parent'] = parent
+            if previous is not None and (changes or
+                                         previous != tree.previous[name]):
+                changes['new_previous_sibling'] = previous
+            if previous is not None or changes:
+                move(name, changes)
+                continue
+            # A previous sibling cannot be removed, so a node that becomes the
+            # first child of its parent is moved after the current first
+            # child, which is then moved after it.
+            anchor = tree.first[parent]
+            if anchor != tree.previous[name]:
+                move(name, {'new_previous_sibling': anchor})
+            move(anchor, {'new_previous_sibling': name})
+        for name, changes in updates.items():
+            self.node_updates.append(
+                Operation('update_dialog_node', dict(dialog_node=name,
+                                                     **changes)))
+        deleted = {name for name in current if name not in target}
+        for name in current:
+            if name not in deleted:
+                continue
+            # Deleting a node deletes its descendants, after the moves.
+            parent = tree.parent[name]
+            while parent is not None and parent not in deleted:
+                parent = tree.parent[parent]
+            if parent is None:
+                self.node_deletes.append(
+                    Operation('delete_dialog_node', {'dialog_node': name}))
+
+    def changes(self, name, current, target, fields, prefix='', defaults=None):
+        """Return the changed fields as arguments of an update method."""
+        defaults = defaults or {}
+        changes = {}
+        for field in fields:
+            old = _normalize(current.get(field, defaults.get(field)))
+            new = _normalize(target.get(field, defaults.get(field)))
+            if old == new:
+                continue
+            if new is None:
+                # Empty collections can be sent, but absent values are ignored.
+                if isinstance(old, (list, dict)):
+                    new = type(old)()
+                else:
+                    self.unsupported.append('{0}: remove {1}'.format(
+                        name, field))
+                    continue
+            changes[prefix + field] = new
+        return changes
+
+
+def _normalize(value):
+    if value in ([], {}):
+        return None
+    return value
+
+
+def _index(items, key):
+    return {item[key]: item for item in items or ()}
+
+
+def _fields(item, arguments):
+    """Return the arguments of a create method for an exported item."""
+    return {
+        field: item[field]
+        for field in arguments
+        if item.get(field) is not None
+    }
+
+
+class _Tree:
+    """The sibling lists of dialog nodes, linked by their previous siblings."""
+
+    def __init__(self, nodes):
+        self.parent = {}
+        self.previous = {}
+        self.next = {}
+        self.first = {}
+        for name, node in nodes.items():
+            self.link(name, node.get('parent'), node.get('previous_sibling'),
+                      relink=False)
+
+    def link(self, name, parent, previous, relink=True):
+        """Insert a node after its previous sibling, like the service does."""
+        self.parent[name] = parent
+        self.previous[name] = previous
+        siblings = self.first if previous is None else self.next
+        key = parent if previous is None else previous
+        following = siblings.get(key) if relink else None
+        siblings[key] = name
+        if following is not None:
+            self.next[name] = following
+            self.previous[following] = name
+
+    def unlink(self, name):
+        """Remove a node from its siblings, which close the gap."""
+        parent = self.parent.pop(name)
+        previous = self.previous.pop(name)
+        following = self.next.pop(name, None)
+        siblings = self.first if previous is None else self.next
+        key = parent if previous is None else previous
+        if following is None:
+            siblings.pop(key, None)
+        else:
+            siblings[key] = following
+            self.previous[following] = previous
+
+    def walk(self):
+        """
+        Yield the nodes breadth first, with the children of each node in
+        order.
+
+        :raises ValueError: If a node is not reachable from the root level.
+        """
+        visited = set()
+        parents = deque([None])
+        while parents:
+            name = self.first.get(parents.popleft())
+            while name is not None and name not in visited:
+                visited.add(name)
+                yield name
+                parents.append(name)
+                name = self.next.get(name)
+        for name in self.parent:
+            if name not in visited:
+                raise ValueError(
+                    'Dialog node {0} is not reachable from the root level'.
+                    format(name))
@@ -16,8 +16,19 @@
 
 import platform
 import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from .version import __version__
-from typing import Iterator
+from typing import Callable, Iterable, Iterator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 SDK_ANALYTICS_HEADER = 'X-IBMCloud-SDK-Analytics'
 USER_AGENT_HEADER = 'User-Agent'
@@ -52,6 +63,142 @@ def get_sdk_headers(service_name, service_version, operation_id):
     return headers
 
 
+def get_status_code(error):
+    """
+    Returns the HTTP status code of an ApiException, which older versions of
+    ibm_cloud_sdk_core store in `code` instead of `status_code`, or `None` for
+    other errors.
+    """
+    # The default of getattr is evaluated eagerly and `code` is deprecated.
+    if hasattr(error, 'status_code'):
+        return error.status_code
+    return getattr(error, 'code', None)
+
+
+def require_numpy(feature):
+    """
+    Returns the numpy module, raising an ImportError naming `feature` when the
+    optional dependency is not installed.
+    """
+    if numpy is None:
+        raise ImportError(
+            '{0} requires numpy. Install it with `pip install ibm-watson[numpy]`'
+            .format(feature))
+    return numpy
+
+
+def require_pyarrow(feature):
+    """
+    Returns the pyarrow module, raising an ImportError naming `feature` when the
+    optional dependency is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            '{0} requires pyarrow. Install it with '
+            '`pip install ibm-watson[parquet]`'.format(feature)) from None
+    return pyarrow
+
+
+def iter_ordered(function: Callable, items: Iterable,
+                 max_workers: int) -> Iterator:
+    """
+    Applies `function` to `items` with at most `max_workers` concurrent calls
+    and yields the results in the order of `items`. Items are taken from the
+    iterable only as calls complete, so it can be lazy or unbounded.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque(
+            executor.submit(function, item)
+            for item in islice(items, max_workers))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(function, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_pipelined(function: Callable, items: Iterable,
+                   max_workers: int) -> Iterator:
+    """
+    Like `iter_ordered`, but a background thread takes items from the iterable
+    and submits each one as soon as it is available, so slow producers and the
+    calls overlap. At most `max_workers` results are pending at a time.
+    """
+    futures = queue.Queue()
+    slots = threading.Semaphore(max_workers)
+    stopped = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def produce():
+        try:
+            for item in items:
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                futures.put(executor.submit(function, item))
+        except Exception as error:
+            futures.put(error)
+        finally:
+            futures.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            future = futures.get()
+            if future is None:
+                return
+            if isinstance(future, Exception):
+                raise future
+            result = future.result()
+            slots.release()
+            yield result
+    finally:
+        stopped.set()
+        slots.release()
+        while not futures.empty():
+            future = futures.get()
+            if future is not None and not isinstance(future, Exception):
+                future.cancel()
+        executor.shutdown(wait=False)
+
+
+class RateLimiter:
+    """
+    A token bucket that limits calls to `rate` per second across threads, with
+    bursts of up to `burst` calls.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until a call is allowed."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate
+        # Waiting outside the lock lets other threads reserve later tokens.
+        if wait > 0:
+            time.sleep(wait)
+
+
 def parse_sse_stream_data(response) -> Iterator[dict]:
     event_message = None  # Can be used in the future to return the event message to the user
     data_json = None
@@ -0,0 +1,124 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Iteration over the items of cursor-paginated list operations.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List
+import time
+
+from ibm_cloud_sdk_core import ApiException
+
+from .common import get_status_code
+
+# Cursors expire after 5 minutes; cursors older than this are not used.
+DEFAULT_CURSOR_TTL = 270.0
+
+
+class Pager:
+    """
+    Iterates the items of a list operation that returns pages with a
+    `pagination.next_cursor`.
+
+    The next page is requested in the background as soon as a page arrives,
+    while the consumer processes the current page. Cursors expire after 5
+    minutes, so when a consumer is slower than that, or the service rejects an
+    expired cursor, the listing is restarted from the first page and the items
+    that were already returned are skipped. Restarts assume that the listing
+    does not change while it is iterated.
+
+    :param int restarts: The number of times the listing was restarted.
+    """
+
+    def __init__(self,
+                 operation: Callable,
+                 items_key: str,
+                 page_limit: int = None,
+                 prefetch: bool = True,
+                 cursor_ttl: float = DEFAULT_CURSOR_TTL,
+                 **kwargs) -> None:
+        """
+        :param operation: The list method of the service.
+        :param str items_key: The key of the items in the result.
+        :param int page_limit: (optional) The number of items per page.
+        :param bool prefetch: (optional) Whether to request the next page while
+               the current page is consumed.
+        :param float cursor_ttl: (optional) The seconds after which a cursor is
+               considered expired.
+        :param kwargs: The other parameters of the operation.
+        """
+        self.operation = operation
+        self.items_key = items_key
+        self.page_limit = page_limit
+        self.prefetch = prefetch
+        self.cursor_ttl = cursor_ttl
+        self.kwargs = kwargs
+        self.restarts = 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        for page in self.pages():
+            yield from page
+
+    def get_all(self) -> List[Dict]:
+        """Return the items of all pages."""
+        return list(self)
+
+    def pages(self) -> Iterator[List[Dict]]:
+        """Yield the items of each page."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            position = 0
+            future = executor.submit(self._fetch, None, None, 0)
+            while future is not None:
+                items, cursor, received = future.result()
+                future = None
+                if cursor is not None and self.prefetch:
+                    future = executor.submit(self._fetch, cursor, received,
+                                             position + len(items))
+                yield items
+                position += len(items)
+                if cursor is not None and future is None:
+                    future = executor.submit(self._fetch, cursor, received,
+                                             position)
+
+    def _fetch(self, cursor, received, position):
+        if cursor is not None and time.monotonic() - received > self.cursor_ttl:
+            return self._restart(position)
+        try:
+            return self._request(cursor)
+        except ApiException as error:
+            if cursor is None or get_status_code(error) != 400:
+                raise
+            # The cursor expired.
+            return self._restart(position)
+
+    def _restart(self, position):
+        self.restarts += 1
+        skipped = 0
+        cursor = None
+        while True:
+            items, cursor, received = self._request(cursor)
+            if cursor is None or skipped + len(items) > position:
+                return items[max(position - skipped, 0):], cursor, received
+            skipped += len(items)
+
+    def _request(self, cursor):
+        result = self.operation(page_limit=self.page_limit,
+                                cursor=cursor,
+                                **self.kwargs).get_result()
+        items = result.get(self.items_key) or []
+        cursor = (result.get('pagination') or {}).get('next_cursor')
+        return items, cursor, time.monotonic()
@@ -0,0 +1,224 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Helpers for transcribing multichannel audio one channel at a time.
+
+Interleaved PCM audio (`audio/wav` or `audio/l16`) is split into mono streams on
+the client, each stream is recognized separately and the per-channel word
+streams are merged back by start time into a single channel-tagged transcript.
+"""
+
+import heapq
+import io
+import re
+import wave
+
+from ibm_watson.websocket import RecognizeCallback
+from .common import require_numpy
+
+WAV = 'audio/wav'
+L16 = 'audio/l16'
+
+
+def split_channels(audio, content_type=WAV):
+    """
+    Split interleaved PCM audio into one mono stream per channel.
+
+    :param bytes/BinaryIO audio: The audio to split. Only uncompressed
+           `audio/wav` and `audio/l16` audio is supported.
+    :param str content_type: The content type of `audio`. For `audio/l16`, the
+           `rate` and `channels` parameters are required, for example
+           `audio/l16;rate=16000;channels=2`.
+    :return: A list with a `(bytes, content_type)` tuple for each channel.
+    :rtype: list
+    """
+    np = require_numpy('split_channels')
+    if hasattr(audio, 'read'):
+        audio = audio.read()
+    mime = content_type.split(';')[0].strip().lower()
+
+    if mime in (WAV, 'audio/x-wav', 'audio/wave'):
+        with wave.open(io.BytesIO(audio), 'rb') as reader:
+            channels = reader.getnchannels()
+            sample_width = reader.getsampwidth()
+            frame_rate = reader.getframerate()
+            frames = reader.readframes(reader.getnframes())
+    elif mime == L16:
+        params = _content_type_params(content_type)
+        if 'rate' not in params:
+            raise ValueError('audio/l16 content_type must specify a rate')
+        channels = int(params.get('channels', 1))
+        sample_width = 2
+        frame_rate = int(params['rate'])
+        frames = audio
+    else:
+        raise ValueError(
+            'Cannot split channels of {0} audio. Use audio/wav or audio/l16'.
+            format(mime))
+
+    # View the interleaved frames as (frame, channel, sample byte) so that any
+    # sample width can be de-interleaved without decoding the samples.
+    frame_size = channels * sample_width
+    usable = len(frames) - len(frames) % frame_size
+    samples = np.frombuffer(frames, dtype=np.uint8, count=usable)
+    samples = samples.reshape(-1, channels, sample_width)
+
+    streams = []
+    for channel in range(channels):
+        mono = np.ascontiguousarray(samples[:, channel, :]).tobytes()
+        if mime == L16:
+            streams.append((mono, _mono_content_type(content_type)))
+        else:
+            buffer = io.BytesIO()
+            with wave.open(buffer, 'wb') as writer:
+                writer.setnchannels(1)
+                writer.setsampwidth(sample_width)
+                writer.setframerate(frame_rate)
+                writer.writeframes(mono)
+            streams.append((buffer.getvalue(), WAV))
+    return streams
+
+
+def merge_channel_results(channel_results):
+    """
+    Merge the recognition results of several channels by word start time.
+
+    :param list channel_results: A `SpeechRecognitionResults` dictionary for each
+           channel, in channel order. Results must include word timestamps.
+    :return: A `dict` with `words` (every word tagged with its `channel`, `from`
+           and `to` times) and `results` (one entry per final utterance tagged with
+           its `channel`), both ordered by start time.
+    :rtype: dict
+    """
+    word_streams = []
+    result_streams = []
+    for channel, results in enumerate(channel_results):
+        words = []
+        utterances = []
+        for result in _final_results(results):
+            alternatives = result.get('alternatives') or []
+            if not alternatives:
+                continue
+            best = alternatives[0]
+            timestamps = best.get('timestamps') or []
+            for word, start, end in timestamps:
+                words.append({
+                    'channel': channel,
+                    'word': word,
+                    'from': start,
+                    'to': end
+                })
+            if not timestamps:
+                continue
+            utterance = {
+                'channel': channel,
+                'from': timestamps[0][1],
+                'to': timestamps[-1][2],
+                'transcript': best.get('transcript')
+            }
+            if 'confidence' in best:
+                utterance['confidence'] = best['confidence']
+            utterances.append(utterance)
+        word_streams.append(words)
+        result_streams.append(utterances)
+
+    def start_time(entry):
+        return entry['from']
+
+    return {
+        'words': list(heapq.merge(*word_streams, key=start_time)),
+        'results': list(heapq.merge(*result_streams, key=start_time))
+    }
+
+
+class RecognitionError(Exception):
+    """
+    The recognition of a channel failed.
+
+    :param int channel: The index of the channel.
+    :param error: The error reported by the websocket callback.
+    """
+
+    def __init__(self, channel: int, error) -> None:
+        Exception.__init__(
+            self, 'Recognition of channel {0} failed: {1}'.format(
+                channel, error))
+        self.channel = channel
+        self.error = error
+
+
+class ResultsCollector(RecognizeCallback):
+    """
+    Callback that accumulates the final websocket results of one recognition
+    into a single `SpeechRecognitionResults` dictionary.
+    """
+
+    def __init__(self):
+        RecognizeCallback.__init__(self)
+        self.results = []
+        self.speaker_labels = []
+        self.error = None
+
+    def on_data(self, data):
+        for index, result in enumerate(data.get('results') or []):
+            if not result.get('final'):
+                continue
+            position = data.get('result_index', 0) + index
+            if position < len(self.results):
+                self.results[position] = result
+            else:
+                self.results.append(result)
+        self.speaker_labels.extend(
+            label for label in data.get('speaker_labels') or []
+            if label.get('final'))
+
+    def on_error(self, error):
+        self.error = error
+
+    def to_dict(self):
+        """Return the collected results as a `SpeechRecognitionResults` dict."""
+        _dict = {'result_index': 0, 'results': list(self.results)}
+        if self.speaker_labels:
+            _dict['speaker_labels'] = list(self.speaker_labels)
+        return _dict
+
+
+def _final_results(results):
+    if hasattr(results, 'to_dict'):
+        results = results.to_dict()
+    return [r for r in results.get('results') or [] if r.get('final', True)]
+
+
+def _content_type_params(content_type):
+    params = {}
+    for param in content_type.split(';')[1:]:
+        match = re.match(r'\s*([^=\s]+)\s*=\s*(\S+)', param)
+        if match:
+            params[match.group(1).lower()] = match.group(2)
+    return params
+
+
+def _mono_content_type(content_type):
+    """Return an l16 content type with the same parameters for one channel."""
+    params = [
+        param.strip() for param in content_type.split(';')[1:] if param.strip()
+    ]
+    names = [param.split('=')[0].strip().lower() for param in params]
+    if 'channels' in names:
+        params[names.index('channels')] = 'channels=1'
+    else:
+        params.append('channels=1')
+    return ';'.join([L16] + params)
@@ -0,0 +1,248 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Searchable inverted index over speech recognition results.
+"""
+
+from typing import Dict, List
+import json
+import mmap
+import re
+import struct
+
+MAGIC = b'WSTI'
+FORMAT_VERSION = 1
+# transcript number, start ms, end ms, word position
+POSTING = struct.Struct('<IIII')
+NO_POSITION = 0xFFFFFFFF
+HEADER = struct.Struct('<4sII')
+
+_TOKEN_SEPARATOR = re.compile(r"[^\w']+")
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Split text into the lowercase tokens used by the index."""
+    return [
+        token.strip("'") for token in _TOKEN_SEPARATOR.split(text.lower())
+        if token.strip("'")
+    ]
+
+
+class TranscriptIndex:
+    """
+    An inverted index from normalized tokens to the transcripts and audio
+    offsets where they are spoken.
+
+    Words of the best alternatives are indexed with their position so that
+    phrases can be matched. Words from `word_alternatives` share the position of
+    the best-alternative word that starts at the same time, and the phrases from
+    `keywords_result` are indexed as whole phrases.
+
+    An index can be saved to a compact binary file and loaded again with
+    `TranscriptIndex.load`, which memory-maps the postings instead of reading
+    them into memory.
+    """
+
+    def __init__(self) -> None:
+        self.transcript_ids = []
+        self._tokens = {}
+        self._phrases = {}
+        self._mmap = None
+        self._postings = None
+        self._closed = False
+
+    def add(self, transcript_id: str, results) -> None:
+        """
+        Add the results of one transcript to the index.
+
+        :param str transcript_id: The identifier returned by searches for this
+               transcript.
+        :param results: The `SpeechRecognitionResults` object or dictionary of the
+               transcript. The best alternatives must include `timestamps`.
+        """
+        if self._postings is not None:
+            raise ValueError('A loaded index is read-only')
+        if hasattr(results, 'to_dict'):
+            results = results.to_dict()
+        number = len(self.transcript_ids)
+        self.transcript_ids.append(transcript_id)
+
+        position = 0
+        for result in results.get('results') or []:
+            if not result.get('final', True):
+                continue
+            positions = {}
+            alternatives = result.get('alternatives') or []
+            timestamps = (alternatives[0].get('timestamps') or []
+                          if alternatives else [])
+            for word, start, end in timestamps:
+                for token in normalize_tokens(word):
+                    positions.setdefault(start, position)
+                    self._add(self._tokens, token, number, start, end,
+                              position)
+                    position += 1
+
+            for alternative_words in result.get('word_alternatives') or []:
+                start = alternative_words['start_time']
+                end = alternative_words['end_time']
+                word_position = positions.get(start, NO_POSITION)
+                for alternative in alternative_words.get('alternatives') or []:
+                    for token in normalize_tokens(alternative['word']):
+                        self._add(self._tokens, token, number, start, end,
+                                  word_position)
+
+            for matches in (result.get('keywords_result') or {}).values():
+                for match in matches:
+                    phrase = ' '.join(normalize_tokens(
+                        match['normalized_text']))
+                    self._add(self._phrases, phrase, number,
+                              match['start_time'], match['end_time'],
+                              NO_POSITION)
+
+    def search(self, phrase: str) -> List[Dict]:
+        """
+        Find the occurrences of a word or phrase.
+
+        :param str phrase: The text to search for.
+        :return: A list of dictionaries with the `transcript_id` and the `from`
+                 and `to` times of each occurrence in milliseconds, ordered by
+                 transcript and time.
+        :rtype: list
+        """
+        tokens = normalize_tokens(phrase)
+        if not tokens:
+            return []
+        hits = {}
+
+        if len(tokens) == 1:
+            for number, start, end, _ in self._lookup(self._tokens, tokens[0]):
+                hits[(number, start)] = end
+        else:
+            following = []
+            for token in tokens[1:]:
+                ends = {}
+                for number, _, end, position in self._lookup(
+                        self._tokens, token):
+                    if position != NO_POSITION:
+                        ends[(number, position)] = end
+                following.append(ends)
+            for number, start, end, position in self._lookup(
+                    self._tokens, tokens[0]):
+                if position == NO_POSITION:
+                    continue
+                for offset, ends in enumerate(following, 1):
+                    end = ends.get((number, position + offset))
+                    if end is None:
+                        break
+                else:
+                    hits[(number, start)] = max(end,
+                                                hits.get((number, start), 0))
+
+        for number, start, end, _ in self._lookup(self._phrases,
+                                                  ' '.join(tokens)):
+            hits.setdefault((number, start), end)
+
+        return [{
+            'transcript_id': self.transcript_ids[number],
+            'from': start,
+            'to': end
+        } for (number, start), end in sorted(hits.items())]
+
+    def save(self, path: str) -> None:
+        """Write the index to `path`."""
+        directory = {'tokens': {}, 'phrases': {}}
+        postings = bytearray()
+        for section, table in (('tokens', self._tokens), ('phrases',
+                                                          self._phrases)):
+            for key in sorted(table):
+                entries = sorted(self._lookup(table, key))
+                directory[section][key] = [len(postings) // POSTING.size,
+                                           len(entries)]
+                for entry in entries:
+                    postings += POSTING.pack(*entry)
+        directory['transcripts'] = self.transcript_ids
+
+        header = json.dumps(directory, separators=(',', ':')).encode('utf8')
+        # Keep the postings aligned for memoryview casts on load.
+        header += b' ' * (-(HEADER.size + len(header)) % POSTING.size)
+        with open(path, 'wb') as index_file:
+            index_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+            index_file.write(header)
+            index_file.write(postings)
+
+    @classmethod
+    def load(cls, path: str) -> 'TranscriptIndex':
+        """Memory-map an index written by `save`. The loaded index is read-only."""
+        with open(path, 'rb') as index_file:
+            magic, version, header_size = HEADER.unpack(
+                index_file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError('{0} is not a transcript index'.format(path))
+            directory = json.loads(index_file.read(header_size))
+            index = cls()
+            index.transcript_ids = directory['transcripts']
+            index._tokens = directory['tokens']
+            index._phrases = directory['phrases']
+            if index_file.seek(0, 2) > HEADER.size + header_size:
+                index._mmap = mmap.mmap(index_file.fileno(),
+                                        0,
+                                        access=mmap.ACCESS_READ)
+                index._postings = memoryview(
+                    index._mmap)[HEADER.size + header_size:]
+            else:
+                index._postings = memoryview(b'')
+        return index
+
+    def close(self) -> None:
+        """
+        Release the memory map of a loaded index. A loaded index cannot be
+        searched after it is closed.
+        """
+        if self._postings is not None:
+            self._closed = True
+        if self._mmap is not None:
+            self._postings.release()
+            self._mmap.close()
+            self._mmap = None
+        self._postings = None
+
+    def __enter__(self) -> 'TranscriptIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _lookup(self, table, key):
+        if self._closed:
+            raise ValueError('index is closed')
+        entry = table.get(key)
+        if entry is None:
+            return []
+        if self._postings is None:
+            return entry
+        offset, count = entry
+        return POSTING.iter_unpack(
+            self._postings[offset * POSTING.size:(offset + count) *
+                           POSTING.size])
+
+    @staticmethod
+    def _add(table, key, number, start, end, position):
+        table.setdefault(key, []).append(
+            (number, _milliseconds(start), _milliseconds(end), position))
+
+
+def _milliseconds(seconds):
+    return int(round(seconds * 1000))
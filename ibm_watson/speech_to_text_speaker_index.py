@@ -0,0 +1,142 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Interval index over the `speaker_labels` of speech recognition results.
+"""
+
+from typing import Dict, List, Optional
+
+from .common import require_numpy
+
+
+class SpeakerIndex:
+    """
+    A sorted interval index of speaker labels.
+
+    The `from` and `to` times of the labels are kept in sorted NumPy arrays, so
+    attributing words to speakers is a binary search per word instead of a scan
+    of every label.
+
+    :param list speaker_labels: The `SpeakerLabelsResult` objects or
+          dictionaries to index.
+    """
+
+    def __init__(self, speaker_labels: List) -> None:
+        np = require_numpy('SpeakerIndex')
+        labels = [
+            label.to_dict() if hasattr(label, 'to_dict') else label
+            for label in speaker_labels or []
+        ]
+        starts = np.array([label['from'] for label in labels], dtype=float)
+        order = np.argsort(starts, kind='stable')
+        self.from_ = starts[order]
+        self.to = np.array([label['to'] for label in labels],
+                           dtype=float)[order]
+        self.speaker = np.array([label['speaker'] for label in labels],
+                                dtype=int)[order]
+        self.confidence = np.array(
+            [label.get('confidence', 0.0) for label in labels],
+            dtype=float)[order]
+
+    @classmethod
+    def from_results(cls, results) -> 'SpeakerIndex':
+        """
+        Build an index from a `SpeechRecognitionResults` object or dictionary.
+        """
+        return cls(_as_dict(results).get('speaker_labels'))
+
+    def __len__(self) -> int:
+        return len(self.from_)
+
+    def speaker_at(self, time: float) -> Optional[int]:
+        """
+        Return the speaker who was speaking at `time` seconds, or `None` if no
+        label covers that time.
+        """
+        index = int(self.from_.searchsorted(time, side='right')) - 1
+        if index < 0 or time > self.to[index]:
+            return None
+        return int(self.speaker[index])
+
+    def speakers_for(self, starts, ends):
+        """
+        Attribute each word interval to the speaker label nearest to its midpoint.
+
+        :param starts: The start times of the words.
+        :param ends: The end times of the words.
+        :return: A NumPy array with the speaker of each word, or `-1` when the
+                 index is empty.
+        """
+        np = require_numpy('SpeakerIndex')
+        midpoints = (np.asarray(starts, dtype=float) +
+                     np.asarray(ends, dtype=float)) / 2
+        if not len(self):
+            return np.full(len(midpoints), -1, dtype=int)
+        last = len(self) - 1
+        before = np.clip(
+            self.from_.searchsorted(midpoints, side='right') - 1, 0, last)
+        after = np.clip(before + 1, 0, last)
+        # Distance from the midpoint to each candidate interval (0 if inside).
+        before_gap = np.maximum(self.from_[before] - midpoints,
+                                midpoints - self.to[before]).clip(min=0)
+        after_gap = np.maximum(self.from_[after] - midpoints,
+                               midpoints - self.to[after]).clip(min=0)
+        nearest = np.where(after_gap < before_gap, after, before)
+        return self.speaker[nearest]
+
+    def utterances(self, results) -> List[Dict]:
+        """
+        Group the words of the final results into speaker-attributed utterances.
+
+        :param results: The `SpeechRecognitionResults` object or dictionary whose
+               best alternatives include `timestamps`.
+        :return: A list of dictionaries with the `speaker`, `from` and `to` times
+                 and `transcript` of each run of words by the same speaker.
+        :rtype: list
+        """
+        words = []
+        for result in _as_dict(results).get('results') or []:
+            if not result.get('final', True) or not result.get('alternatives'):
+                continue
+            words.extend(result['alternatives'][0].get('timestamps') or [])
+        if not words:
+            return []
+
+        speakers = self.speakers_for([w[1] for w in words],
+                                     [w[2] for w in words])
+        utterances = []
+        current = None
+        for (word, start, end), speaker in zip(words, speakers.tolist()):
+            if current is None or current['speaker'] != speaker:
+                current = {
+                    'speaker': speaker,
+                    'from': start,
+                    'to': end,
+                    'words': [word]
+                }
+                utterances.append(current)
+            else:
+                current['to'] = end
+                current['words'].append(word)
+        for utterance in utterances:
+            utterance['transcript'] = ' '.join(utterance.pop('words'))
+        return utterances
+
+
+def _as_dict(results) -> Dict:
+    if hasattr(results, 'to_dict'):
+        return results.to_dict()
+    return results
@@ -14,8 +14,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ibm_watson.websocket import RecognizeCallback, RecognizeListener, AudioSource
+from concurrent.futures import ThreadPoolExecutor
+import io
+
+from ibm_watson.websocket import RecognizeCallback, RecognizeListener, AudioSource, ResilientRecognizeSession
 from .speech_to_text_v1 import SpeechToTextV1
+from .speech_to_text_multichannel import (split_channels,
+                                          merge_channel_results,
+                                          RecognitionError, ResultsCollector)
 from urllib.parse import urlencode
 
 BEARER = 'Bearer'
@@ -57,6 +63,9 @@ class SpeechToTextV1Adapter(SpeechToTextV1):
                                   background_audio_suppression=None,
                                   low_latency=None,
                                   character_insertion_bias=None,
+                                  max_reconnects=None,
+                                  bytes_per_second=None,
+                                  rollover_after=None,
                                   **kwargs):
         """
         Sends audio for speech recognition using web sockets.
@@ -309,6 +318,20 @@ class SpeechToTextV1Adapter(SpeechToTextV1):
                `Narrowband` models.
                See [Character insertion
                bias](https://cloud.ibm.com/docs/speech-to-text?topic=speech-to-text-parsing#insertion-bias).
+        :param int max_reconnects: (optional) Opt in to a resilient session that
+               reconnects up to this many consecutive times when the connection drops
+               before all audio is recognized. Audio after the last final result is
+               replayed from a buffer and the timestamps of later results are shifted so
+               the transcript continues seamlessly. Word timestamps are always returned.
+               Requires raw audio (`audio/l16`, `audio/mulaw`, `audio/alaw`,
+               `audio/basic`) or `bytes_per_second`.
+        :param int bytes_per_second: (optional) The byte rate of the audio, used to
+               find the resume offset for formats whose rate is not in the content type.
+        :param float rollover_after: (optional) For very long streams, the seconds of
+               audio after which a second connection is opened and the audio is handed
+               over to it at the next silence, before the first connection reaches the
+               service's session limits. Overlapping words are removed from the results.
+               Like `max_reconnects`, it requires raw audio or `bytes_per_second`.
         :param dict headers: A `dict` containing the request headers
         :return: A `dict` containing the `SpeechRecognitionResults` response.
         :rtype: dict
@@ -381,7 +404,91 @@ class SpeechToTextV1Adapter(SpeechToTextV1):
         options = {k: v for k, v in options.items() if v is not None}
         request['options'] = options
 
+        if max_reconnects or rollover_after:
+
+            def get_headers():
+                # Authenticate every connection; tokens can expire on long streams.
+                reconnect_request = {'headers': headers.copy()}
+                if self.authenticator:
+                    self.authenticator.authenticate(reconnect_request)
+                return reconnect_request['headers']
+
+            ResilientRecognizeSession(audio,
+                                      request.get('options'),
+                                      recognize_callback,
+                                      request.get('url'),
+                                      get_headers,
+                                      http_proxy_host,
+                                      http_proxy_port,
+                                      self.disable_ssl_verification,
+                                      max_reconnects=max_reconnects or 0,
+                                      bytes_per_second=bytes_per_second,
+                                      rollover_after=rollover_after).run()
+            return
+
         RecognizeListener(audio, request.get('options'), recognize_callback,
                           request.get('url'), request.get('headers'),
                           http_proxy_host, http_proxy_port,
                           self.disable_ssl_verification)
+
+    def recognize_multichannel(self,
+                               audio,
+                               content_type='audio/wav',
+                               use_websocket=False,
+                               max_workers=None,
+                               **kwargs):
+        """
+        Recognizes each channel of multichannel audio separately and merges the
+        results into one channel-tagged transcript. When every speaker is
+        recorded on a separate channel, this is faster and more accurate than
+        sending downmixed audio with `speaker_labels`.
+
+        The channels are split on the client, so the audio must be uncompressed
+        `audio/wav` or `audio/l16`. Word timestamps are always requested because
+        the merge orders words by start time.
+
+        :param bytes/BinaryIO audio: The multichannel audio to transcribe.
+        :param str content_type: The content type of `audio`. For `audio/l16`,
+        include the `rate` and `channels` parameters.
+        :param bool use_websocket: If `True`, recognize each channel with
+        `recognize_using_websocket` instead of the HTTP `recognize` method.
+        :param int max_workers: The maximum number of channels recognized
+        concurrently. Defaults to the number of channels.
+        :param kwargs: Any other parameter accepted by `recognize` or
+        `recognize_using_websocket`, passed through for every channel.
+        :return: A `dict` with `words` and `results` merged by start time and
+        tagged with their `channel`, and `channels`, the
+        `SpeechRecognitionResults` dictionary of each channel.
+        :rtype: dict
+        :raises RecognitionError: If the websocket recognition of a channel
+        reports an error.
+        """
+        if audio is None:
+            raise ValueError('audio must be provided')
+        streams = split_channels(audio, content_type)
+        kwargs['timestamps'] = True
+
+        def recognize_channel(channel, stream):
+            channel_audio, channel_content_type = stream
+            if not use_websocket:
+                return self.recognize(channel_audio,
+                                      content_type=channel_content_type,
+                                      **kwargs).get_result()
+            collector = ResultsCollector()
+            self.recognize_using_websocket(
+                AudioSource(io.BytesIO(channel_audio)), channel_content_type,
+                collector, **kwargs)
+            error = collector.error
+            if error is not None:
+                raise RecognitionError(channel, error) from (
+                    error if isinstance(error, Exception) else None)
+            return collector.to_dict()
+
+        with ThreadPoolExecutor(
+                max_workers=max_workers or len(streams)) as executor:
+            channels = list(
+                executor.map(recognize_channel, range(len(streams)), streams))
+
+        merged = merge_channel_results(channels)
+        merged['channels'] = channels
+        return merged
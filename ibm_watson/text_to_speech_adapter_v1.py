@@ -14,8 +14,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ibm_watson.websocket import SynthesizeCallback, SynthesizeListener
+import json
+import threading
+import time
+
+from ibm_cloud_sdk_core import DetailedResponse
+from ibm_watson.websocket import (SynthesizeCallback, SynthesizeListener,
+                                  SynthesizePool, SynthesizeEventStream)
+from .common import iter_ordered
 from .text_to_speech_v1 import TextToSpeechV1
+from .text_to_speech_cache import CachingSynthesizeCallback
+from .text_to_speech_stream import SynthesizeStream, DEFAULT_CHUNK_SIZE
+from .text_to_speech_long_form import (LongFormSynthesis, split_text,
+                                       MAX_REQUEST_BYTES)
+from .text_to_speech_incremental import IncrementalSynthesis, SegmentSplitter
 from urllib.parse import urlencode
 
 BEARER = 'Bearer'
@@ -23,6 +35,72 @@ BEARER = 'Bearer'
 
 class TextToSpeechV1Adapter(TextToSpeechV1):
 
+    synthesis_cache = None
+
+    def __init__(self, *args, **kwargs):
+        TextToSpeechV1.__init__(self, *args, **kwargs)
+        self.synthesize_pools = {}
+        self.pronunciation_cache = {}
+        self.pronunciation_lock = threading.Lock()
+
+    def set_synthesis_cache(self, synthesis_cache):
+        """
+        Serve repeated synthesis requests from a cache.
+
+        `synthesize` and `synthesize_using_websocket` look up the audio of each
+        request in the cache before contacting the service and store the audio
+        of completed requests in it. Streamed HTTP requests are served from the
+        cache but not stored, and websocket requests for word timings or with
+        SSML marks bypass the cache.
+
+        :param SynthesisCache synthesis_cache: The cache to use, or `None` to
+        disable caching.
+        """
+        self.synthesis_cache = synthesis_cache
+
+    def synthesize(self,
+                   text,
+                   *,
+                   accept=None,
+                   voice=None,
+                   customization_id=None,
+                   spell_out_mode=None,
+                   rate_percentage=None,
+                   pitch_percentage=None,
+                   **kwargs):
+        if self.synthesis_cache is None or text is None:
+            return super().synthesize(text,
+                                      accept=accept,
+                                      voice=voice,
+                                      customization_id=customization_id,
+                                      spell_out_mode=spell_out_mode,
+                                      rate_percentage=rate_percentage,
+                                      pitch_percentage=pitch_percentage,
+                                      **kwargs)
+        key = self.synthesis_cache.key(text, accept, voice, customization_id,
+                                       spell_out_mode, rate_percentage,
+                                       pitch_percentage)
+        cached = self.synthesis_cache.get(key)
+        if cached is not None:
+            return DetailedResponse(response=cached,
+                                    headers=cached.headers,
+                                    status_code=cached.status_code)
+        response = super().synthesize(text,
+                                      accept=accept,
+                                      voice=voice,
+                                      customization_id=customization_id,
+                                      spell_out_mode=spell_out_mode,
+                                      rate_percentage=rate_percentage,
+                                      pitch_percentage=pitch_percentage,
+                                      **kwargs)
+        if not kwargs.get('stream') and response.get_status_code() == 200:
+            result = response.get_result()
+            self.synthesis_cache.put(key, result.content,
+                                     result.headers.get('Content-Type', ''))
+        return response
+
+    synthesize.__doc__ = TextToSpeechV1.synthesize.__doc__
+
     def synthesize_using_websocket(self,
                                    text,
                                    synthesize_callback,
@@ -122,6 +200,41 @@ class TextToSpeechV1Adapter(TextToSpeechV1):
             raise Exception(
                 'Callback is not a derived class of SynthesizeCallback')
 
+        if (self.synthesis_cache is not None and timings is None and
+                '<mark' not in text):
+            key = self.synthesis_cache.key(text, accept, voice,
+                                           customization_id, spell_out_mode,
+                                           rate_percentage, pitch_percentage)
+            cached = self.synthesis_cache.get(key)
+            if cached is not None:
+                # Replay the messages of the service, with the audio as one
+                # binary message.
+                content_type = cached.headers['Content-Type']
+                audio = bytes(cached.content)
+                synthesize_callback.on_connected()
+                synthesize_callback.on_content_type(content_type)
+                synthesize_callback.on_data(
+                    json.dumps(
+                        {'binary_streams': [{
+                            'content_type': content_type
+                        }]}))
+                synthesize_callback.on_audio_stream(audio)
+                synthesize_callback.on_data(audio)
+                synthesize_callback.on_close()
+                return
+            synthesize_callback = CachingSynthesizeCallback(
+                synthesize_callback, self.synthesis_cache, key)
+
+        url = self._synthesize_url(voice, customization_id, spell_out_mode,
+                                   rate_percentage, pitch_percentage)
+        options = {'text': text, 'accept': accept, 'timings': timings}
+        options = {k: v for k, v in options.items() if v is not None}
+
+        pool = self.synthesize_pools.get(url)
+        if pool is not None and not pool.closed and 'headers' not in kwargs:
+            pool.synthesize(options, synthesize_callback)
+            return
+
         request = {}
 
         headers = {}
@@ -134,6 +247,122 @@ class TextToSpeechV1Adapter(TextToSpeechV1):
         if self.authenticator:
             self.authenticator.authenticate(request)
 
+        request['url'] = url
+        request['options'] = options
+
+        SynthesizeListener(request.get('options'), synthesize_callback,
+                           request.get('url'), request.get('headers'),
+                           http_proxy_host, http_proxy_port,
+                           self.disable_ssl_verification)
+
+    def synthesize_using_websocket_iter(self,
+                                        text,
+                                        accept=None,
+                                        voice=None,
+                                        timings=None,
+                                        customization_id=None,
+                                        spell_out_mode=None,
+                                        rate_percentage=None,
+                                        pitch_percentage=None,
+                                        http_proxy_host=None,
+                                        http_proxy_port=None,
+                                        max_buffered=64,
+                                        **kwargs):
+        """
+        Synthesizes text using web sockets and returns the results as an
+        iterator of events instead of calling a callback.
+
+        The synthesis runs in a background thread. Iterating with `for` or
+        `async for` yields a `ContentType` event, `AudioChunk` events with the
+        audio frames and `Timings` events with word timings and SSML marks, in
+        the order in which the service sends them. At most `max_buffered` events
+        are held, so a slow consumer slows the synthesis down instead of
+        buffering all of its audio. Errors are raised by the iteration.
+
+        The parameters are the same as for `synthesize_using_websocket`.
+
+        :param int max_buffered: (optional) The maximum number of events held
+        for the consumer.
+        :return: The events of the synthesis.
+        :rtype: SynthesizeEventStream
+        """
+        stream = SynthesizeEventStream(max_buffered)
+        return stream.start(lambda: self.synthesize_using_websocket(
+            text,
+            stream,
+            accept=accept,
+            voice=voice,
+            timings=timings,
+            customization_id=customization_id,
+            spell_out_mode=spell_out_mode,
+            rate_percentage=rate_percentage,
+            pitch_percentage=pitch_percentage,
+            http_proxy_host=http_proxy_host,
+            http_proxy_port=http_proxy_port,
+            **kwargs))
+
+    def create_synthesize_pool(self,
+                               voice=None,
+                               customization_id=None,
+                               spell_out_mode=None,
+                               rate_percentage=None,
+                               pitch_percentage=None,
+                               size=2,
+                               max_idle=20.0,
+                               http_proxy_host=None,
+                               http_proxy_port=None):
+        """
+        Keeps pre-connected, authenticated websockets open for
+        `synthesize_using_websocket` requests with these voice parameters.
+
+        The service handles one request per connection, so each request takes
+        an idle connection and the pool opens a replacement in the background.
+        Requests with these parameters and without custom headers skip the
+        handshake and authentication while an idle connection is available.
+        Close the pool to stop using it.
+
+        :param str voice: (optional) The voice to use for synthesis.
+        :param str customization_id: (optional) The customization ID (GUID) of a
+        custom voice model to use for the synthesis.
+        :param str spell_out_mode: (optional) *For German voices,* indicates how
+        the service is to spell out strings of individual letters.
+        :param int rate_percentage: (optional) The percentage change from the
+        default speaking rate of the voice.
+        :param int pitch_percentage: (optional) The percentage change from the
+        default speaking pitch of the voice.
+        :param int size: (optional) The number of idle connections to keep open.
+        :param float max_idle: (optional) The seconds after which an idle
+        connection is replaced with a freshly authenticated one.
+        :param str http_proxy_host: http proxy host name.
+        :param str http_proxy_port: http proxy port. If not set, set to 80.
+        :return: The connection pool.
+        :rtype: SynthesizePool
+        """
+        url = self._synthesize_url(voice, customization_id, spell_out_mode,
+                                   rate_percentage, pitch_percentage)
+
+        def get_headers():
+            # Authenticate every connection; the pool outlives access tokens.
+            request = {'headers': (self.default_headers or {}).copy()}
+            if self.authenticator:
+                self.authenticator.authenticate(request)
+            return request['headers']
+
+        pool = SynthesizePool(url,
+                              get_headers,
+                              size=size,
+                              http_proxy_host=http_proxy_host,
+                              http_proxy_port=http_proxy_port,
+                              verify=self.disable_ssl_verification,
+                              max_idle=max_idle)
+        previous = self.synthesize_pools.get(url)
+        if previous is not None:
+            previous.close()
+        self.synthesize_pools[url] = pool
+        return pool
+
+    def _synthesize_url(self, voice, customization_id, spell_out_mode,
+                        rate_percentage, pitch_percentage):
         url = self.service_url.replace('https:', 'wss:')
         params = {
             'voice': voice,
@@ -143,14 +372,346 @@ class TextToSpeechV1Adapter(TextToSpeechV1):
             'pitch_percentage': pitch_percentage
         }
         params = {k: v for k, v in params.items() if v is not None}
-        url += '/v1/synthesize?{0}'.format(urlencode(params))
-        request['url'] = url
+        return url + '/v1/synthesize?{0}'.format(urlencode(params))
 
-        options = {'text': text, 'accept': accept, 'timings': timings}
-        options = {k: v for k, v in options.items() if v is not None}
-        request['options'] = options
+    def synthesize_stream(self,
+                          text,
+                          accept=None,
+                          voice=None,
+                          customization_id=None,
+                          spell_out_mode=None,
+                          rate_percentage=None,
+                          pitch_percentage=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE,
+                          **kwargs):
+        """
+        Synthesizes text to audio over HTTP and yields the audio as it arrives.
 
-        SynthesizeListener(request.get('options'), synthesize_callback,
-                           request.get('url'), request.get('headers'),
-                           http_proxy_host, http_proxy_port,
-                           self.disable_ssl_verification)
+        The request is sent with a streamed response, so the first chunks of
+        audio can be played before the synthesis is complete, similar to
+        `synthesize_using_websocket` but without a websocket thread. The
+        parameters are the same as for `synthesize`.
+
+        :param str text: The text to synthesize.
+        :param str accept: (optional) The requested format (MIME type) of the
+        audio.
+        :param str voice: (optional) The voice to use for speech synthesis.
+        :param str customization_id: (optional) The customization ID (GUID) of a
+        custom model to use for the synthesis.
+        :param str spell_out_mode: (optional) *For German voices,* indicates how
+        the service is to spell out strings of individual letters.
+        :param int rate_percentage: (optional) The percentage change from the
+        default speaking rate of the voice.
+        :param int pitch_percentage: (optional) The percentage change from the
+        default speaking pitch of the voice.
+        :param int chunk_size: (optional) The maximum size in bytes of the
+        yielded audio chunks.
+        :param dict headers: A `dict` containing the request headers
+        :return: A `SynthesizeStream` that yields the audio chunks and exposes
+        `time_to_first_byte` and `content_type`.
+        :rtype: SynthesizeStream
+        """
+        started = time.perf_counter()
+        response = self.synthesize(text,
+                                   accept=accept,
+                                   voice=voice,
+                                   customization_id=customization_id,
+                                   spell_out_mode=spell_out_mode,
+                                   rate_percentage=rate_percentage,
+                                   pitch_percentage=pitch_percentage,
+                                   stream=True,
+                                   **kwargs)
+        return SynthesizeStream(response.get_result(), started, chunk_size)
+
+    def synthesize_long_text(self,
+                             text,
+                             accept=None,
+                             voice=None,
+                             customization_id=None,
+                             spell_out_mode=None,
+                             rate_percentage=None,
+                             pitch_percentage=None,
+                             max_concurrency=4,
+                             max_bytes=MAX_REQUEST_BYTES,
+                             **kwargs):
+        """
+        Synthesizes text of any length by splitting it into requests of at most
+        5 KB that are synthesized concurrently.
+
+        The text is split at sentence boundaries without breaking SSML markup,
+        and the audio of the pieces is joined in order into one stream of the
+        requested format. WAV, l16, mulaw, alaw, basic, mp3 and ogg audio can be
+        joined.
+
+        :param str text: The plain text or SSML to synthesize.
+        :param str accept: (optional) The requested format (MIME type) of the
+        audio.
+        :param str voice: (optional) The voice to use for speech synthesis.
+        :param str customization_id: (optional) The customization ID (GUID) of a
+        custom model to use for the synthesis.
+        :param str spell_out_mode: (optional) *For German voices,* indicates how
+        the service is to spell out strings of individual letters.
+        :param int rate_percentage: (optional) The percentage change from the
+        default speaking rate of the voice.
+        :param int pitch_percentage: (optional) The percentage change from the
+        default speaking pitch of the voice.
+        :param int max_concurrency: (optional) The maximum number of requests
+        that are sent at the same time.
+        :param int max_bytes: (optional) The maximum size in bytes of the text of
+        each request.
+        :param dict headers: A `dict` containing the request headers
+        :return: A `LongFormSynthesis` that yields the joined audio.
+        :rtype: LongFormSynthesis
+        """
+
+        def synthesize_segment(segment):
+            return self.synthesize(segment,
+                                   accept=accept,
+                                   voice=voice,
+                                   customization_id=customization_id,
+                                   spell_out_mode=spell_out_mode,
+                                   rate_percentage=rate_percentage,
+                                   pitch_percentage=pitch_percentage,
+                                   **kwargs).get_result().content
+
+        return LongFormSynthesis(synthesize_segment,
+                                 split_text(text, max_bytes), accept,
+                                 max_concurrency)
+
+    def synthesize_template(self,
+                            template,
+                            values=None,
+                            accept=None,
+                            voice=None,
+                            customization_id=None,
+                            spell_out_mode=None,
+                            rate_percentage=None,
+                            pitch_percentage=None,
+                            splice=False,
+                            max_concurrency=4,
+                            **kwargs):
+        """
+        Synthesizes an SSML template with the given slot values.
+
+        With `splice`, the template is synthesized in parts: the parts without
+        slots are the same for every request, so with a synthesis cache (see
+        `set_synthesis_cache`) their audio is synthesized once and only the parts
+        with slots are synthesized for each request. The audio of the parts is
+        joined in order. Splicing trades some prosody at the part boundaries for
+        shorter requests.
+
+        :param SSMLTemplate template: The compiled template.
+        :param dict values: (optional) The values of the slots.
+        :param str accept: (optional) The requested format (MIME type) of the
+        audio.
+        :param str voice: (optional) The voice to use for speech synthesis.
+        :param str customization_id: (optional) The customization ID (GUID) of a
+        custom model to use for the synthesis.
+        :param str spell_out_mode: (optional) *For German voices,* indicates how
+        the service is to spell out strings of individual letters.
+        :param int rate_percentage: (optional) The percentage change from the
+        default speaking rate of the voice.
+        :param int pitch_percentage: (optional) The percentage change from the
+        default speaking pitch of the voice.
+        :param bool splice: (optional) Whether to synthesize the static and
+        variable parts of the template separately.
+        :param int max_concurrency: (optional) The maximum number of parts that
+        are synthesized at the same time.
+        :param dict headers: A `dict` containing the request headers
+        :return: A `LongFormSynthesis` that yields the audio.
+        :rtype: LongFormSynthesis
+        """
+        values = values or {}
+        if splice:
+            segments = [ssml for ssml, _ in template.render_parts(**values)]
+        else:
+            segments = [template.render(**values)]
+
+        def synthesize_segment(segment):
+            return self.synthesize(segment,
+                                   accept=accept,
+                                   voice=voice,
+                                   customization_id=customization_id,
+                                   spell_out_mode=spell_out_mode,
+                                   rate_percentage=rate_percentage,
+                                   pitch_percentage=pitch_percentage,
+                                   **kwargs).get_result().content
+
+        return LongFormSynthesis(synthesize_segment, segments, accept,
+                                 max_concurrency)
+
+    def synthesize_incremental(self,
+                               fragments,
+                               accept=None,
+                               voice=None,
+                               customization_id=None,
+                               spell_out_mode=None,
+                               rate_percentage=None,
+                               pitch_percentage=None,
+                               max_concurrency=2,
+                               clause_chars=200,
+                               **kwargs):
+        """
+        Synthesizes text that arrives in fragments, such as the text deltas of
+        a streamed assistant response, while the fragments are still arriving.
+
+        The fragments are split into segments at sentence boundaries, or at
+        clause boundaries in long sentences. Each segment is synthesized as soon
+        as it is complete, so the first audio is available one sentence after
+        the first fragment. The audio of the segments is joined in order into
+        one stream of the requested format.
+
+        :param fragments: An iterator or async iterator of text fragments.
+        :param str accept: (optional) The requested format (MIME type) of the
+        audio.
+        :param str voice: (optional) The voice to use for speech synthesis.
+        :param str customization_id: (optional) The customization ID (GUID) of a
+        custom model to use for the synthesis.
+        :param str spell_out_mode: (optional) *For German voices,* indicates how
+        the service is to spell out strings of individual letters.
+        :param int rate_percentage: (optional) The percentage change from the
+        default speaking rate of the voice.
+        :param int pitch_percentage: (optional) The percentage change from the
+        default speaking pitch of the voice.
+        :param int max_concurrency: (optional) The maximum number of segments
+        that are synthesized or waiting to be consumed at the same time.
+        :param int clause_chars: (optional) The length in characters after which
+        a sentence is split at clause boundaries.
+        :param dict headers: A `dict` containing the request headers
+        :return: An `IncrementalSynthesis` that yields the joined audio with
+        `for` or `async for`.
+        :rtype: IncrementalSynthesis
+        """
+
+        def synthesize_segment(segment):
+            return self.synthesize(segment,
+                                   accept=accept,
+                                   voice=voice,
+                                   customization_id=customization_id,
+                                   spell_out_mode=spell_out_mode,
+                                   rate_percentage=rate_percentage,
+                                   pitch_percentage=pitch_percentage,
+                                   **kwargs).get_result().content
+
+        return IncrementalSynthesis(synthesize_segment, fragments, accept,
+                                    max_concurrency,
+                                    SegmentSplitter(clause_chars=clause_chars))
+
+    def get_pronunciations(self,
+                           words,
+                           voice=None,
+                           format=None,
+                           customization_id=None,
+                           max_concurrency=8,
+                           **kwargs):
+        """
+        Gets the pronunciations of many words.
+
+        Repeated words are looked up once, the lookups run concurrently, and the
+        results are cached per voice, format and custom model. The cached
+        pronunciations of a custom model are discarded when its words are
+        changed with `add_word`, `add_words`, `delete_word`,
+        `update_custom_model` or `delete_custom_model` of this client.
+
+        :param list[str] words: The words to pronounce.
+        :param str voice: (optional) A voice that specifies the language in which
+        the pronunciations are to be returned.
+        :param str format: (optional) The phoneme format in which to return the
+        pronunciations.
+        :param str customization_id: (optional) The customization ID (GUID) of a
+        custom model whose words are used for the pronunciations.
+        :param int max_concurrency: (optional) The maximum number of concurrent
+        lookups.
+        :param dict headers: A `dict` containing the request headers
+        :return: A `dict` from each word to its pronunciation.
+        :rtype: dict
+        """
+        cache_key = (voice, format, customization_id)
+        with self.pronunciation_lock:
+            cached = self.pronunciation_cache.setdefault(cache_key, {})
+            generation = cached
+            missing = [word for word in dict.fromkeys(words)
+                       if word not in cached]
+
+        def lookup(word):
+            return self.get_pronunciation(word,
+                                          voice=voice,
+                                          format=format,
+                                          customization_id=customization_id,
+                                          **kwargs).get_result()['pronunciation']
+
+        found = dict(zip(missing, iter_ordered(lookup, missing,
+                                               max_concurrency)))
+        with self.pronunciation_lock:
+            # Results of lookups that overlapped an invalidation are not kept.
+            if self.pronunciation_cache.get(cache_key) is generation:
+                generation.update(found)
+            return {
+                word: found[word] if word in found else generation[word]
+                for word in words
+            }
+
+    def clear_pronunciation_cache(self, customization_id=None):
+        """
+        Discard cached pronunciations of `get_pronunciations`.
+
+        :param str customization_id: (optional) Only discard the pronunciations
+        of this custom model.
+        """
+        with self.pronunciation_lock:
+            if customization_id is None:
+                self.pronunciation_cache.clear()
+                return
+            for key in list(self.pronunciation_cache):
+                if key[2] == customization_id:
+                    del self.pronunciation_cache[key]
+
+    def update_custom_model(self, customization_id, *, name=None,
+                            description=None, words=None, **kwargs):
+        try:
+            return super().update_custom_model(customization_id,
+                                               name=name,
+                                               description=description,
+                                               words=words,
+                                               **kwargs)
+        finally:
+            self.clear_pronunciation_cache(customization_id)
+
+    update_custom_model.__doc__ = TextToSpeechV1.update_custom_model.__doc__
+
+    def delete_custom_model(self, customization_id, **kwargs):
+        try:
+            return super().delete_custom_model(customization_id, **kwargs)
+        finally:
+            self.clear_pronunciation_cache(customization_id)
+
+    delete_custom_model.__doc__ = TextToSpeechV1.delete_custom_model.__doc__
+
+    def add_words(self, customization_id, words, **kwargs):
+        try:
+            return super().add_words(customization_id, words, **kwargs)
+        finally:
+            self.clear_pronunciation_cache(customization_id)
+
+    add_words.__doc__ = TextToSpeechV1.add_words.__doc__
+
+    def add_word(self, customization_id, word, translation, *,
+                 part_of_speech=None, **kwargs):
+        try:
+            return super().add_word(customization_id,
+                                    word,
+                                    translation,
+                                    part_of_speech=part_of_speech,
+                                    **kwargs)
+        finally:
+            self.clear_pronunciation_cache(customization_id)
+
+    add_word.__doc__ = TextToSpeechV1.add_word.__doc__
+
+    def delete_word(self, customization_id, word, **kwargs):
+        try:
+            return super().delete_word(customization_id, word, **kwargs)
+        finally:
+            self.clear_pronunciation_cache(customization_id)
+
+    delete_word.__doc__ = TextToSpeechV1.delete_word.__doc__
@@ -0,0 +1,245 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Joining separately synthesized pieces of audio into one stream.
+"""
+
+from typing import List, Tuple
+import struct
+
+DEFAULT_ACCEPT = 'audio/ogg;codecs=opus'
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def get_audio_concatenator(accept: str = None) -> 'AudioConcatenator':
+    """
+    Return a concatenator for audio of the `accept` type.
+
+    :param str accept: The requested audio format. `None` and `*/*` mean the
+           default format of the service, `audio/ogg;codecs=opus`.
+    :raises ValueError: If pieces of this format cannot be joined.
+    """
+    mime = (accept or DEFAULT_ACCEPT).split(';')[0].strip().lower()
+    if mime == '*/*':
+        mime = 'audio/ogg'
+    if mime in ('audio/wav', 'audio/x-wav', 'audio/wave'):
+        return WavConcatenator()
+    if mime == 'audio/basic':
+        return AuConcatenator()
+    if mime in ('audio/l16', 'audio/mulaw', 'audio/alaw'):
+        return AudioConcatenator()
+    if mime in ('audio/mp3', 'audio/mpeg'):
+        return Mp3Concatenator()
+    if mime == 'audio/ogg':
+        return OggConcatenator()
+    raise ValueError(
+        'Cannot join pieces of {0} audio. Use audio/wav, audio/l16, '
+        'audio/mulaw, audio/alaw, audio/basic, audio/mp3 or audio/ogg'.format(
+            mime))
+
+
+class AudioConcatenator:
+    """
+    Joins pieces of headerless audio by concatenating them.
+
+    Subclasses strip or rewrite the container data of the pieces so that the
+    output is a single stream of the same format.
+    """
+
+    def __init__(self) -> None:
+        self.pieces = 0
+        self.bytes_written = 0
+
+    def append(self, audio: bytes) -> bytes:
+        """Return the bytes that continue the joined stream with `audio`."""
+        output = self._join(audio)
+        self.pieces += 1
+        self.bytes_written += len(output)
+        return output
+
+    def header_patches(self) -> List[Tuple[int, bytes]]:
+        """
+        Return the `(offset, bytes)` changes that make the header of the joined
+        stream match its final length.
+        """
+        return []
+
+    def finalize(self, audio: bytes, start: int = 0) -> bytes:
+        """
+        Apply `header_patches` to the joined audio from offset `start` to the
+        end. Patches of the audio before `start` are skipped.
+        """
+        patches = [(offset - start, patch)
+                   for offset, patch in self.header_patches()
+                   if offset >= start]
+        if not patches:
+            return audio
+        audio = bytearray(audio)
+        for offset, patch in patches:
+            audio[offset:offset + len(patch)] = patch
+        return bytes(audio)
+
+    def _join(self, audio: bytes) -> bytes:
+        return audio
+
+
+class WavConcatenator(AudioConcatenator):
+    """
+    Joins WAV pieces under a single RIFF header. The header is written with
+    unknown sizes and fixed by `header_patches` once all pieces are joined.
+    """
+
+    def __init__(self) -> None:
+        AudioConcatenator.__init__(self)
+        self.fmt = None
+        self.header_size = 0
+
+    def _join(self, audio: bytes) -> bytes:
+        fmt, data = self._parse(audio)
+        if self.fmt is None:
+            self.fmt = fmt
+            header = (b'RIFF' + struct.pack('<I', UNKNOWN_SIZE) + b'WAVE' +
+                      b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' +
+                      struct.pack('<I', UNKNOWN_SIZE))
+            self.header_size = len(header)
+            return header + data
+        if fmt != self.fmt:
+            raise ValueError('Cannot join WAV audio with different formats')
+        return data
+
+    def header_patches(self) -> List[Tuple[int, bytes]]:
+        if self.fmt is None:
+            return []
+        data_size = self.bytes_written - self.header_size
+        return [(4, struct.pack('<I', self.bytes_written - 8)),
+                (self.header_size - 4, struct.pack('<I', data_size))]
+
+    @staticmethod
+    def _parse(audio):
+        if audio[:4] != b'RIFF' or audio[8:12] != b'WAVE':
+            raise ValueError('Audio is not in WAV format')
+        fmt = None
+        position = 12
+        while position + 8 <= len(audio):
+            chunk_id = audio[position:position + 4]
+            size = struct.unpack('<I', audio[position + 4:position + 8])[0]
+            body = position + 8
+            if chunk_id == b'data':
+                # Streamed WAV audio does not know its size in advance.
+                end = len(audio) if size in (0, UNKNOWN_SIZE) else body + size
+                return fmt, audio[body:end]
+            if chunk_id == b'fmt ':
+                fmt = audio[body:body + size]
+            position = body + size + size % 2
+        raise ValueError('WAV audio has no data chunk')
+
+
+class AuConcatenator(AudioConcatenator):
+    """Joins `audio/basic` (Sun AU) pieces under the header of the first one."""
+
+    def _join(self, audio: bytes) -> bytes:
+        if audio[:4] != b'.snd':
+            raise ValueError('Audio is not in audio/basic format')
+        data_offset = struct.unpack('>I', audio[4:8])[0]
+        if self.pieces == 0:
+            # The AU header allows an unknown data size.
+            return (audio[:8] + struct.pack('>I', UNKNOWN_SIZE) +
+                    audio[12:data_offset] + audio[data_offset:])
+        return audio[data_offset:]
+
+
+class Mp3Concatenator(AudioConcatenator):
+    """
+    Joins MP3 pieces at frame boundaries by dropping the ID3 tags of the pieces
+    after the first one.
+    """
+
+    def _join(self, audio: bytes) -> bytes:
+        if len(audio) >= 128 and audio[-128:-125] == b'TAG':
+            audio = audio[:-128]
+        if self.pieces == 0:
+            return audio
+        position = 0
+        if audio[:3] == b'ID3' and len(audio) >= 10:
+            size = 0
+            for byte in audio[6:10]:
+                size = (size << 7) | (byte & 0x7F)
+            position = 10 + size
+        # Skip to the first frame sync.
+        while position + 1 < len(audio) and not (
+                audio[position] == 0xFF and audio[position + 1] & 0xE0 == 0xE0):
+            position += 1
+        return audio[position:]
+
+
+class OggConcatenator(AudioConcatenator):
+    """
+    Joins Ogg pieces as a chained Ogg stream. Each piece is a complete logical
+    stream, so pieces are concatenated at page boundaries after making their
+    serial numbers unique.
+    """
+
+    def __init__(self) -> None:
+        AudioConcatenator.__init__(self)
+        self.serials = set()
+
+    def _join(self, audio: bytes) -> bytes:
+        pages = bytearray(audio)
+        replacements = {}
+        position = 0
+        while position + 27 <= len(pages):
+            if pages[position:position + 4] != b'OggS':
+                raise ValueError('Audio is not in Ogg format')
+            segments = pages[position + 26]
+            table = pages[position + 27:position + 27 + segments]
+            page_end = position + 27 + segments + sum(table)
+            serial = struct.unpack_from('<I', pages, position + 14)[0]
+            if serial not in replacements:
+                replacement = serial
+                while replacement in self.serials:
+                    replacement = (replacement + 1) & 0xFFFFFFFF
+                replacements[serial] = replacement
+            if replacements[serial] != serial:
+                struct.pack_into('<I', pages, position + 14,
+                                 replacements[serial])
+                struct.pack_into('<I', pages, position + 22, 0)
+                struct.pack_into('<I', pages, position + 22,
+                                 ogg_crc(pages[position:page_end]))
+            position = page_end
+        self.serials.update(replacements.values())
+        return bytes(pages)
+
+
+def _ogg_crc_table():
+    table = []
+    for index in range(256):
+        crc = index << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1)
+            crc &= 0xFFFFFFFF
+        table.append(crc)
+    return table
+
+
+_OGG_CRC_TABLE = _ogg_crc_table()
+
+
+def ogg_crc(page: bytes) -> int:
+    """Return the checksum of an Ogg page whose checksum field is zero."""
+    crc = 0
+    for byte in page:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _OGG_CRC_TABLE[(crc >> 24) ^ byte]
+    return crc
@@ -0,0 +1,253 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+On-disk cache of synthesized audio.
+"""
+
+from typing import Optional
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+
+from .websocket import SynthesizeCallback
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_SUFFIX = '.audio'
+
+
+class CachedAudio:
+    """
+    Synthesized audio served from a `SynthesisCache`.
+
+    It has the parts of the `requests.Response` interface that are used for
+    synthesized audio, so it can be returned as the result of `synthesize`. The
+    audio is a read-only view of a memory-mapped cache file and is not copied.
+
+    :param memoryview content: The audio.
+    :param dict headers: The `Content-Type` of the audio.
+    """
+
+    status_code = 200
+
+    def __init__(self, content: memoryview, content_type: str,
+                 mapping: mmap.mmap) -> None:
+        self.content = content
+        self.headers = {'Content-Type': content_type}
+        self._mmap = mapping
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        """Yield the audio in chunks of `chunk_size` bytes."""
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset:offset + chunk_size]
+
+    def close(self) -> None:
+        """Keeps the memory map open for views of the content that are in use."""
+
+
+class SynthesisCache:
+    """
+    A content-addressed cache of synthesized audio in a directory.
+
+    Entries are keyed by a hash of the text and every parameter that changes the
+    audio. The total size of the cache is capped at `max_bytes`, and the least
+    recently used entries are evicted to stay under it. Entries are written to
+    temporary files and renamed into place, so several processes can share a
+    cache directory without reading partial audio. Hits are memory-mapped and
+    served without copying the audio.
+
+    :param str directory: The cache directory. It is created if it does not
+          exist.
+    :param int max_bytes: The maximum total size of the cached audio.
+    """
+
+    def __init__(self, directory: str,
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(text: str,
+            accept: str = None,
+            voice: str = None,
+            customization_id: str = None,
+            spell_out_mode: str = None,
+            rate_percentage: int = None,
+            pitch_percentage: int = None) -> str:
+        """Return the cache key of a synthesis request."""
+        request = [
+            text, accept, voice, customization_id, spell_out_mode,
+            rate_percentage, pitch_percentage
+        ]
+        return hashlib.sha256(
+            json.dumps(request, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedAudio]:
+        """Return the cached audio for `key`, or `None` if it is not cached."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as audio_file:
+                mapping = mmap.mmap(audio_file.fileno(),
+                                    0,
+                                    access=mmap.ACCESS_READ)
+            # Record the use for the LRU order.
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        header_end = mapping.find(b'\n')
+        content_type = mapping[:header_end].decode('utf-8')
+        return CachedAudio(
+            memoryview(mapping)[header_end + 1:], content_type, mapping)
+
+    def put(self, key: str, audio: bytes, content_type: str) -> None:
+        """
+        Store the audio for `key`, evicting the least recently used entries if
+        the cache grows beyond `max_bytes`.
+        """
+        header = content_type.encode('utf-8') + b'\n'
+        if len(header) + len(audio) > self.max_bytes:
+            return
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory,
+                                                 suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as audio_file:
+                audio_file.write(header)
+                audio_file.write(audio)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            # Another process may hold the entry open on platforms that do
+            # not allow replacing open files. Its audio is the same.
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def size(self) -> int:
+        """Return the total size of the cached entries in bytes."""
+        return sum(stat.st_size for _, stat in self._stats())
+
+    def _evict(self):
+        with _DirectoryLock(os.path.join(self.directory, '.lock')):
+            stats = self._stats()
+            total = sum(stat.st_size for _, stat in stats)
+            if total <= self.max_bytes:
+                return
+            stats.sort(key=lambda item: item[1].st_mtime)
+            for entry, stat in stats:
+                if total <= self.max_bytes:
+                    break
+                self._remove(entry.path)
+                total -= stat.st_size
+
+    def _entries(self):
+        return [
+            entry for entry in os.scandir(self.directory)
+            if entry.name.endswith(_SUFFIX)
+        ]
+
+    def _stats(self):
+        stats = []
+        for entry in self._entries():
+            try:
+                stats.append((entry, entry.stat()))
+            except FileNotFoundError:
+                pass
+        return stats
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            # Removed by another process, or mapped on Windows.
+            pass
+
+
+class CachingSynthesizeCallback(SynthesizeCallback):
+    """
+    Passes websocket synthesis events to another callback and stores the audio
+    in a `SynthesisCache` when the synthesis completes without an error.
+    """
+
+    def __init__(self, callback: SynthesizeCallback, cache: SynthesisCache,
+                 key: str) -> None:
+        SynthesizeCallback.__init__(self)
+        self.callback = callback
+        self.cache = cache
+        self.key = key
+        self.content_type = None
+        self.audio = []
+        self.failed = False
+
+    def on_connected(self):
+        self.callback.on_connected()
+
+    def on_error(self, error):
+        self.failed = True
+        self.callback.on_error(error)
+
+    def on_content_type(self, content_type):
+        self.content_type = content_type
+        self.callback.on_content_type(content_type)
+
+    def on_timing_information(self, timing_information):
+        self.callback.on_timing_information(timing_information)
+
+    def on_audio_stream(self, audio_stream):
+        self.audio.append(audio_stream)
+        self.callback.on_audio_stream(audio_stream)
+
+    def on_data(self, data):
+        self.callback.on_data(data)
+
+    def on_close(self):
+        if not self.failed and self.content_type and self.audio:
+            self.cache.put(self.key, b''.join(self.audio), self.content_type)
+        self.callback.on_close()
+
+
+class _DirectoryLock:
+    """An exclusive lock on a file that is shared by processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_file = None
+
+    def __enter__(self):
+        self.lock_file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        if fcntl is not None:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+        self.lock_file.close()
@@ -0,0 +1,222 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Synthesis of text that arrives in fragments, such as streamed assistant
+responses.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+import asyncio
+import re
+
+from .common import iter_pipelined
+from .text_to_speech_audio import get_audio_concatenator
+from .text_to_speech_long_form import LongFormSynthesis, MAX_REQUEST_BYTES
+
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|[。！？]+\s*')
+_CLAUSE_END = re.compile(r'[,;:]\s+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class SegmentSplitter:
+    """
+    Splits text that arrives in fragments into segments as soon as their end is
+    known.
+
+    A segment ends at a sentence boundary. Text that grows beyond
+    `clause_chars` characters without a sentence boundary is split at the last
+    clause boundary, and text beyond `max_bytes` is split at the last
+    whitespace.
+
+    :param int clause_chars: The length after which clauses are segments.
+    :param int max_bytes: The maximum size of a segment in UTF-8 bytes.
+    """
+
+    def __init__(self, clause_chars: int = 200,
+                 max_bytes: int = MAX_REQUEST_BYTES) -> None:
+        self.clause_chars = clause_chars
+        self.max_bytes = max_bytes
+        self.buffer = ''
+
+    def feed(self, fragment: str) -> List[str]:
+        """Add a fragment and return the segments that it completes."""
+        self.buffer += fragment
+        segments = []
+        while True:
+            end = self._segment_end()
+            if end is None:
+                break
+            segment, self.buffer = self.buffer[:end], self.buffer[end:]
+            if segment.strip():
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> List[str]:
+        """Return the remaining text as segments at the end of the input."""
+        segments = self.feed('')
+        while self.buffer.strip():
+            if len(self.buffer.encode('utf-8')) <= self.max_bytes:
+                segments.append(self.buffer)
+                break
+            end = self._split_at(_WHITESPACE, self._max_chars())
+            if end is None:
+                raise ValueError('Cannot split the text into segments of {0} '
+                                 'bytes'.format(self.max_bytes))
+            segments.append(self.buffer[:end])
+            self.buffer = self.buffer[end:]
+        self.buffer = ''
+        return segments
+
+    def _segment_end(self):
+        limit = self._max_chars()
+        match = _SENTENCE_END.search(self.buffer, 0, limit)
+        if match is not None:
+            return match.end()
+        if len(self.buffer) > self.clause_chars:
+            end = self._split_at(_CLAUSE_END, limit)
+            if end is not None:
+                return end
+        if len(self.buffer.encode('utf-8')) > self.max_bytes:
+            return self._split_at(_WHITESPACE, limit)
+        return None
+
+    def _split_at(self, pattern, limit):
+        end = None
+        for match in pattern.finditer(self.buffer, 0, limit):
+            end = match.end()
+        return end
+
+    def _max_chars(self):
+        # The number of leading characters that fit in max_bytes.
+        encoded = self.buffer.encode('utf-8')[:self.max_bytes]
+        return len(encoded.decode('utf-8', 'ignore'))
+
+
+class IncrementalSynthesis(LongFormSynthesis):
+    """
+    The audio of text fragments that is synthesized while the fragments arrive.
+
+    Each segment is sent for synthesis as soon as it is complete, while later
+    fragments are still being produced, and the audio is yielded in order as
+    one stream of the requested format. At most `max_concurrency` segments are
+    synthesized or waiting to be consumed at a time.
+
+    Iterate with `for` when the fragments are an iterator, and with `async for`
+    when they are an async iterator. The synthesis requests are sent from
+    worker threads in both cases.
+
+    :param list segments: The segments that were sent for synthesis so far.
+    """
+
+    def __init__(self, synthesize: Callable, fragments, accept: str,
+                 max_concurrency: int, splitter: SegmentSplitter) -> None:
+        """
+        :param synthesize: A function that returns the audio of one segment.
+        :param fragments: An iterator or async iterator of text fragments.
+        :param str accept: The format of the audio.
+        :param int max_concurrency: The maximum number of pending segments.
+        :param SegmentSplitter splitter: Splits the fragments into segments.
+        """
+        self.segments = []
+        self._synthesize = synthesize
+        self._fragments = fragments
+        self._max_concurrency = max_concurrency
+        self._splitter = splitter
+        self._concatenator = get_audio_concatenator(accept)
+        self._audio = None
+        self._closed = False
+        if not hasattr(fragments, '__aiter__'):
+            self._audio = iter_pipelined(synthesize, self._iter_segments(),
+                                         max_concurrency)
+
+    def __iter__(self):
+        if self._audio is None:
+            raise TypeError(
+                'Use async for to synthesize fragments of an async iterator')
+        return LongFormSynthesis.__iter__(self)
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue()
+        slots = asyncio.Semaphore(self._max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+
+        async def produce():
+            try:
+                async for segment in self._aiter_segments():
+                    await slots.acquire()
+                    pending.put_nowait(
+                        loop.run_in_executor(executor, self._synthesize,
+                                             segment))
+            finally:
+                # The queue is unbounded, so the end never waits for the
+                # consumer, which may have stopped.
+                pending.put_nowait(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while not self._closed:
+                future = await pending.get()
+                if future is None:
+                    await producer
+                    break
+                audio = await future
+                slots.release()
+                yield self._concatenator.append(audio)
+        finally:
+            producer.cancel()
+            while not pending.empty():
+                future = pending.get_nowait()
+                if future is not None:
+                    future.cancel()
+            executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Stop taking fragments and cancel the requests that have not started."""
+        self._closed = True
+        if self._audio is not None:
+            self._audio.close()
+
+    def _iter_segments(self):
+        for fragment in self._fragments:
+            for segment in self._splitter.feed(fragment):
+                self.segments.append(segment)
+                yield segment
+        for segment in self._splitter.flush():
+            self.segments.append(segment)
+            yield segment
+
+    async def _aiter_segments(self):
+        if hasattr(self._fragments, '__aiter__'):
+            async for fragment in self._fragments:
+                if self._closed:
+                    return
+                for segment in self._splitter.feed(fragment):
+                    self.segments.append(segment)
+                    yield segment
+        else:
+            for fragment in self._fragments:
+                if self._closed:
+                    return
+                for segment in self._splitter.feed(fragment):
+                    self.segments.append(segment)
+                    yield segment
+        if self._closed:
+            return
+        for segment in self._splitter.flush():
+            self.segments.append(segment)
+            yield segment
@@ -0,0 +1,156 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Synthesis of texts that are longer than the 5 KB limit of a single request.
+"""
+
+from typing import BinaryIO, Callable, List
+import re
+
+from .common import iter_ordered
+from .text_to_speech_audio import get_audio_concatenator
+from .text_to_speech_ssml_utils import (TAG, group_pieces, render_pieces,
+                                        split_root)
+
+MAX_REQUEST_BYTES = 5000
+
+_SENTENCE_BOUNDARY = re.compile(r'[.!?]+["\')\]]*(\s+|$)|[。！？]+\s*')
+_WORD_BOUNDARY = re.compile(r'[,;:]\s+|\s+')
+
+
+def split_text(text: str, max_bytes: int = MAX_REQUEST_BYTES) -> List[str]:
+    """
+    Split text into pieces of at most `max_bytes` UTF-8 bytes for synthesis.
+
+    Text is split at sentence boundaries, after paragraphs and sentences of
+    SSML and after `<break>` elements, and only at clauses or words where a
+    sentence does not fit. SSML markup is kept valid: each piece is wrapped in
+    the `<speak>` element of the input, and the elements that are open at a
+    split are closed at the end of one piece and reopened at the start of the
+    next. The content of `<say-as>`, `<phoneme>` and `<sub>` is never split.
+
+    :param str text: The plain text or SSML to split.
+    :param int max_bytes: The maximum size of each piece.
+    :return: The pieces of the text in order.
+    :rtype: list
+    :raises ValueError: If a word or unsplittable element does not fit.
+    """
+    prefix, body, suffix = split_root(text)
+    pieces = []
+    for piece in group_pieces(TAG.split(body), (), _SENTENCE_BOUNDARY):
+        if _size(prefix, suffix, [piece]) > max_bytes:
+            pieces.extend(
+                group_pieces(TAG.split(piece[0]), piece[1], _WORD_BOUNDARY))
+        else:
+            pieces.append(piece)
+
+    chunks = []
+    group = []
+    for piece in pieces:
+        if _size(prefix, suffix, [piece]) > max_bytes:
+            raise ValueError(
+                'Cannot split the text into pieces of {0} bytes near {1!r}'.
+                format(max_bytes, piece[0][:50]))
+        if group and _size(prefix, suffix, group + [piece]) > max_bytes:
+            chunks.append(render_pieces(prefix, suffix, group))
+            group = []
+        group.append(piece)
+    if group:
+        chunks.append(render_pieces(prefix, suffix, group))
+    # Drop trailing whitespace that would be an empty request on its own.
+    return [
+        chunk for chunk in chunks
+        if TAG.sub('', chunk).strip() or '<break' in chunk
+    ]
+
+
+class LongFormSynthesis:
+    """
+    The audio of a text that is synthesized in several concurrent requests.
+
+    Iterating yields the audio of the pieces in order as one stream of the
+    requested format. At most `max_concurrency` pieces are synthesized at a
+    time, and pieces are only requested as earlier pieces are consumed.
+
+    The header of a joined WAV stream is written before its length is known.
+    Use `read_all` or `save` to get audio with a correct header, or apply
+    `header_patches` after iterating.
+
+    :param list segments: The pieces of the text.
+    """
+
+    def __init__(self, synthesize: Callable, segments: List[str], accept: str,
+                 max_concurrency: int) -> None:
+        """
+        :param synthesize: A function that returns the audio of one piece.
+        :param list segments: The pieces of the text.
+        :param str accept: The format of the audio.
+        :param int max_concurrency: The maximum number of concurrent requests.
+        """
+        self.segments = segments
+        self._concatenator = get_audio_concatenator(accept)
+        self._audio = iter_ordered(synthesize, segments, max_concurrency)
+
+    def __iter__(self):
+        for audio in self._audio:
+            yield self._concatenator.append(audio)
+
+    def header_patches(self):
+        """
+        Return the `(offset, bytes)` changes that correct the header of the audio
+        yielded so far.
+        """
+        return self._concatenator.header_patches()
+
+    def read_all(self) -> bytes:
+        """
+        Return the remaining audio as one `bytes` object. If part of the audio
+        was already read, its header is not corrected; apply `header_patches`
+        to it.
+        """
+        start = self._concatenator.bytes_written
+        return self._concatenator.finalize(b''.join(self), start)
+
+    def save(self, audio_file: BinaryIO) -> None:
+        """
+        Write the remaining audio to a seekable binary file and correct its
+        header, if the header is part of the remaining audio.
+        """
+        start = self._concatenator.bytes_written
+        file_start = audio_file.tell()
+        for chunk in self:
+            audio_file.write(chunk)
+        end = audio_file.tell()
+        for offset, patch in self.header_patches():
+            if offset >= start:
+                audio_file.seek(file_start + offset - start)
+                audio_file.write(patch)
+        audio_file.seek(end)
+
+    def close(self) -> None:
+        """Cancel the requests that have not started."""
+        self._audio.close()
+
+    def __enter__(self) -> 'LongFormSynthesis':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _size(prefix, suffix, group):
+    return len(render_pieces(prefix, suffix, group).encode('utf-8'))
+
@@ -0,0 +1,196 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compiled SSML templates with escaped variable slots.
+"""
+
+from collections import OrderedDict
+from string import Formatter
+from typing import List, Tuple
+from xml.etree import ElementTree
+import re
+import threading
+
+from .text_to_speech_long_form import MAX_REQUEST_BYTES
+from .text_to_speech_ssml_utils import (TAG, group_pieces, render_pieces,
+                                        split_root)
+
+_ESCAPES = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&apos;'
+})
+# Slots are marked with characters that cannot occur in XML while compiling.
+_SLOT = re.compile('\x00(\\d+)\x00')
+_SLOT_EDGES = re.compile('(?=\x00\\d+\x00)|\x00\\d+\x00')
+_WORD = re.compile(r'\w')
+
+
+def escape_ssml(value) -> str:
+    """Escape a value for use in SSML text or attribute values."""
+    return str(value).translate(_ESCAPES)
+
+
+class SSMLTemplate:
+    """
+    An SSML template with variable slots that is validated and compiled once.
+
+    Slots are written like `str.format` fields, for example `{name}` or
+    `{amount:.2f}`, and literal braces are doubled. Slot values are escaped
+    when they are rendered, so they cannot change the markup. Rendered SSML is
+    cached for repeated values.
+
+    The template can also be rendered in parts for spliced synthesis: the
+    static parts contain no slots and their audio can be synthesized once,
+    while only the parts with slots are synthesized for each request. Elements
+    that are open at a part boundary are closed and reopened, so every part is
+    valid SSML, and the content of `<say-as>`, `<phoneme>` and `<sub>` stays in
+    one part.
+
+    :param str template: The SSML template.
+    :param int max_bytes: The maximum size in UTF-8 bytes of rendered SSML.
+    :param int cache_size: The number of rendered values to cache.
+    :param tuple slots: The names of the slots in the order they occur.
+    :raises ValueError: If the template is not well-formed SSML.
+    """
+
+    def __init__(self,
+                 template: str,
+                 max_bytes: int = MAX_REQUEST_BYTES,
+                 cache_size: int = 256) -> None:
+        self.template = template
+        self.max_bytes = max_bytes
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        fields = []
+        marked = []
+        for literal, name, spec, conversion in Formatter().parse(template):
+            marked.append(literal)
+            if name is not None:
+                if not name.isidentifier():
+                    raise ValueError(
+                        'Invalid slot name {0!r} in the template'.format(name))
+                marked.append('\x00{0}\x00'.format(len(fields)))
+                fields.append((name, spec, conversion))
+        marked = ''.join(marked)
+        self._fields = fields
+        self.slots = tuple(dict.fromkeys(name for name, _, _ in fields))
+        self._validate(marked)
+        self._segments = _compile(marked)
+
+        prefix, body, suffix = split_root(marked)
+        parts = []
+        for piece in group_pieces(TAG.split(body), (), _SLOT_EDGES):
+            # Parts without speech are kept with their neighbours.
+            static = ('\x00' not in render_pieces(prefix, suffix, [piece]) and
+                      bool(_WORD.search(TAG.sub('', piece[0])) or
+                           '<break' in piece[0]))
+            if parts and parts[-1][1] == static:
+                parts[-1][0].append(piece)
+            else:
+                parts.append(([piece], static))
+        self._parts = [(_compile(render_pieces(prefix, suffix, group)), static)
+                       for group, static in parts]
+
+    def render(self, **values) -> str:
+        """
+        Render the template with escaped slot values.
+
+        :raises KeyError: If a slot has no value.
+        :raises ValueError: If the rendered SSML is larger than `max_bytes`.
+        """
+        key = tuple(values[name] for name in self.slots)
+        try:
+            with self._lock:
+                ssml = self._cache.get(key)
+                if ssml is not None:
+                    self._cache.move_to_end(key)
+                    return ssml
+        except TypeError:
+            # Unhashable values are rendered without the cache.
+            key = None
+        ssml = self._render(self._segments, values)
+        if len(ssml.encode('utf-8')) > self.max_bytes:
+            raise ValueError(
+                'The rendered SSML is larger than {0} bytes'.format(
+                    self.max_bytes))
+        if key is not None and self.cache_size:
+            with self._lock:
+                self._cache[key] = ssml
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return ssml
+
+    def render_parts(self, **values) -> List[Tuple[str, bool]]:
+        """
+        Render the template as separately synthesizable parts.
+
+        :return: A list of `(ssml, static)` tuples in order, where `static` is
+                 `True` for parts whose SSML does not depend on the values.
+        :rtype: list
+        """
+        parts = []
+        for segments, static in self._parts:
+            ssml = self._render(segments, values)
+            if len(ssml.encode('utf-8')) > self.max_bytes:
+                raise ValueError(
+                    'A rendered SSML part is larger than {0} bytes'.format(
+                        self.max_bytes))
+            parts.append((ssml, static))
+        return parts
+
+    def _render(self, segments, values):
+        rendered = []
+        for segment in segments:
+            if isinstance(segment, str):
+                rendered.append(segment)
+                continue
+            name, spec, conversion = self._fields[segment]
+            value = values[name]
+            if conversion == 'r':
+                value = repr(value)
+            elif conversion == 'a':
+                value = ascii(value)
+            elif conversion == 's':
+                value = str(value)
+            rendered.append(escape_ssml(format(value, spec)))
+        return ''.join(rendered)
+
+    @staticmethod
+    def _validate(marked):
+        document = _SLOT.sub('x', marked)
+        if not document.lstrip().startswith(('<speak', '<?xml')):
+            document = '<speak>{0}</speak>'.format(document)
+        try:
+            ElementTree.fromstring(document)
+        except ElementTree.ParseError as error:
+            raise ValueError('The SSML template is not well-formed: {0}'.format(
+                error)) from error
+
+
+def _compile(marked):
+    """Split marked markup into literal strings and slot numbers."""
+    segments = []
+    for index, segment in enumerate(_SLOT.split(marked)):
+        if index % 2:
+            segments.append(int(segment))
+        elif segment:
+            segments.append(segment)
+    return segments
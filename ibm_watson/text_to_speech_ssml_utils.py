@@ -0,0 +1,141 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tokenizing, splitting and rendering of SSML, shared by long-form synthesis and
+SSML templates.
+"""
+
+from typing import List, Pattern, Tuple
+import re
+
+TAG = re.compile(r'(<[^>]*>)')
+_TAG_NAME = re.compile(r'</?\s*([\w:.-]+)')
+# Elements whose content is spoken as a unit and must not be split.
+_UNSPLITTABLE = ('say-as', 'phoneme', 'sub')
+# Elements after whose end a request can be split.
+_BLOCKS = ('p', 's', 'paragraph', 'sentence')
+
+
+def split_root(text: str) -> Tuple[str, str, str]:
+    """
+    Split SSML into the opening of its `<speak>` element, including an XML
+    declaration, the body and the closing tag. Text without a `<speak>` element
+    is returned as the body.
+
+    :raises ValueError: If the `<speak>` element is not closed.
+    """
+    match = re.match(r'\s*(<\?xml[^>]*\?>\s*)?<speak\b[^>]*>', text)
+    if match is None:
+        return '', text, ''
+    end = text.rfind('</speak>')
+    if end < match.end():
+        raise ValueError('The SSML has no closing </speak> element')
+    return text[:match.end()], text[match.end():end], text[end:]
+
+
+def group_pieces(tokens: List[str], stack: Tuple[str, ...],
+                 boundary: Pattern) -> List[Tuple]:
+    """
+    Group the tokens of `TAG.split` into the pieces between split points:
+    matches of `boundary` in text, ends of paragraphs and sentences and
+    `<break>` elements, outside of `<say-as>`, `<phoneme>` and `<sub>`. Each
+    piece is a tuple of its markup, the open elements at its start and the
+    open elements at its end.
+
+    :param list tokens: The tags and texts of the SSML.
+    :param tuple stack: The elements that are open before the first token.
+    :param boundary: A regex of the split points in text.
+    """
+    stack = list(stack)
+    pieces = []
+    current = []
+    start = tuple(stack)
+    protected = 0
+
+    def end_piece():
+        nonlocal current, start
+        # Elements opened at the end of a piece start the next one instead.
+        opened = []
+        while current and stack and current[-1] is stack[-1]:
+            opened.insert(0, current.pop())
+            stack.pop()
+        if any(current):
+            pieces.append((''.join(current), start, tuple(stack)))
+        start = tuple(stack)
+        stack.extend(opened)
+        current = opened
+
+    for token in tokens:
+        if not token:
+            continue
+        if not token.startswith('<'):
+            if protected:
+                current.append(token)
+                continue
+            position = 0
+            for match in boundary.finditer(token):
+                if match.end() > position:
+                    current.append(token[position:match.end()])
+                position = match.end()
+                end_piece()
+            if position < len(token):
+                current.append(token[position:])
+            continue
+
+        current.append(token)
+        match = _TAG_NAME.match(token)
+        if token.startswith(('<!', '<?')) or match is None:
+            continue
+        name = match.group(1).lower()
+        if token.startswith('</'):
+            if stack and _TAG_NAME.match(stack[-1]).group(1).lower() == name:
+                stack.pop()
+            if pieces and not ''.join(current[:-1]).strip():
+                # Close the element in the previous piece instead of reopening
+                # it only to close it.
+                pieces[-1] = (pieces[-1][0] + ''.join(current), pieces[-1][1],
+                              tuple(stack))
+                current = []
+                start = tuple(stack)
+            if name in _UNSPLITTABLE:
+                protected = max(protected - 1, 0)
+            if name in _BLOCKS and not protected:
+                end_piece()
+        elif token.endswith('/>'):
+            if name == 'break' and not protected:
+                end_piece()
+        else:
+            stack.append(token)
+            if name in _UNSPLITTABLE:
+                protected += 1
+    end_piece()
+    return pieces
+
+
+def _closing_tags(stack):
+    return ''.join('</{0}>'.format(_TAG_NAME.match(tag).group(1))
+                   for tag in reversed(stack))
+
+
+def render_pieces(prefix: str, suffix: str, group: List[Tuple]) -> str:
+    """
+    Return consecutive pieces of `group_pieces` as one SSML document, with the
+    elements that are open at their start reopened and those that are open at
+    their end closed.
+    """
+    return (prefix + ''.join(group[0][1]) +
+            ''.join(piece[0] for piece in group) + _closing_tags(group[-1][2]) +
+            suffix)
@@ -0,0 +1,83 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Streaming access to the audio of HTTP synthesis requests.
+"""
+
+import time
+
+DEFAULT_CHUNK_SIZE = 1024
+
+
+class SynthesizeStream:
+    """
+    An iterable over the audio of a streamed `synthesize` response.
+
+    Iterating yields the audio in chunks as it is read from the socket, so
+    playback can start before the synthesis is complete. The connection is
+    released when the iteration ends or `close` is called.
+
+    :param float time_to_headers: Seconds from sending the request to receiving
+          the response headers.
+    :param float time_to_first_byte: Seconds from sending the request to
+          receiving the first audio, or `None` before it is received.
+    :param str content_type: The format of the audio.
+    :param int bytes_received: The number of audio bytes yielded so far.
+    """
+
+    def __init__(self,
+                 response,
+                 started: float,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        :param requests.Response response: The streamed response.
+        :param float started: The `time.perf_counter` value when the request was
+               sent.
+        :param int chunk_size: The maximum size of the yielded chunks.
+        """
+        self.response = response
+        self.started = started
+        self.chunk_size = chunk_size
+        self.time_to_headers = time.perf_counter() - started
+        self.time_to_first_byte = None
+        self.content_type = response.headers.get('Content-Type')
+        self.bytes_received = 0
+
+    def __iter__(self):
+        try:
+            for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                if not chunk:
+                    continue
+                if self.time_to_first_byte is None:
+                    self.time_to_first_byte = time.perf_counter() - self.started
+                self.bytes_received += len(chunk)
+                yield chunk
+        finally:
+            self.close()
+
+    def read_all(self) -> bytes:
+        """Return the remaining audio as one `bytes` object."""
+        return b''.join(self)
+
+    def close(self) -> None:
+        """Release the connection of the response."""
+        self.response.close()
+
+    def __enter__(self) -> 'SynthesizeStream':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
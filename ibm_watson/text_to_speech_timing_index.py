@@ -0,0 +1,174 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Index over the word timings and marks of websocket synthesis.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Dict, Optional
+
+from .common import require_numpy
+
+
+class TimingIndex:
+    """
+    An index of the word timings of synthesized audio.
+
+    Add the timing messages that `SynthesizeCallback.on_timing_information`
+    receives with `add`. The start and end times of the words and their
+    character offsets in the synthesized text are appended to growable arrays
+    in the order of the start times, so looking up the word at an audio time
+    or the audio time of a character is a binary search instead of a scan of
+    every word, also while timings are still being added. The words are sorted
+    again only if a timing message arrives out of order.
+
+    :param str text: (optional) The synthesized text. Words are located in it to
+          find their character offsets. Without it, offsets refer to the words
+          joined by spaces.
+    """
+
+    def __init__(self, text: str = None) -> None:
+        self.text = text
+        self.words = []
+        self.marks = {}
+        self._starts = array('d')
+        self._ends = array('d')
+        self._offsets = array('q')
+        self._position = 0
+        self._sorted = True
+        self._arrays = None
+
+    def add(self, timing_information: Dict) -> None:
+        """
+        Add a timing message of the service.
+
+        :param dict timing_information: The message with `words` and/or `marks`,
+               or a `Timings` event of `synthesize_using_websocket_iter`.
+        """
+        if hasattr(timing_information, '_asdict'):
+            timing_information = timing_information._asdict()
+        for word, start, end in timing_information.get('words') or []:
+            if self._starts and start < self._starts[-1]:
+                self._sorted = False
+            self.words.append(word)
+            self._starts.append(start)
+            self._ends.append(end)
+            self._offsets.append(self._locate(word))
+        for mark, time in timing_information.get('marks') or []:
+            self.marks[mark] = time
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def start(self):
+        """The start times of the words in seconds."""
+        return self._freeze()[0]
+
+    @property
+    def end(self):
+        """The end times of the words in seconds."""
+        return self._freeze()[1]
+
+    @property
+    def offset(self):
+        """The character offsets of the words in the text."""
+        return self._freeze()[2]
+
+    def word_at(self, time: float) -> Optional[int]:
+        """
+        Return the index of the word that is spoken at `time` seconds, or `None`
+        if no word is spoken at that time.
+        """
+        self._sort()
+        index = bisect_right(self._starts, time) - 1
+        if index < 0 or time > self._ends[index]:
+            return None
+        return index
+
+    def words_at(self, times):
+        """
+        Return the index of the word spoken at each of `times`, or of the last
+        word that started before it, and `-1` before the first word.
+        """
+        np = require_numpy('TimingIndex')
+        start = self._freeze()[0]
+        return start.searchsorted(np.asarray(times, dtype=float),
+                                  side='right') - 1
+
+    def time_of_offset(self, offset: int) -> Optional[float]:
+        """
+        Return the start time of the word at character `offset` of the text, or
+        of the last word before it. Returns `None` before the first word.
+        """
+        self._sort()
+        index = bisect_right(self._offsets, offset) - 1
+        if index < 0:
+            return None
+        return self._starts[index]
+
+    def word(self, index: int) -> Dict:
+        """
+        Return the `word`, `start`, `end` and `offset` of the word at `index`.
+        """
+        self._sort()
+        return {
+            'word': self.words[index],
+            'start': self._starts[index],
+            'end': self._ends[index],
+            'offset': self._offsets[index]
+        }
+
+    def mark_time(self, name: str) -> Optional[float]:
+        """Return the audio time of the SSML mark `name`."""
+        return self.marks.get(name)
+
+    def _locate(self, word):
+        if self.text is None:
+            # Offsets in the words joined by spaces.
+            offset = self._position
+            self._position += len(word) + 1
+            return offset
+        found = self.text.find(word, self._position)
+        if found < 0:
+            # Words that the service normalized keep the current offset.
+            return self._position
+        self._position = found + len(word)
+        return found
+
+    def _sort(self):
+        """Sort the words by start time after an out-of-order message."""
+        if self._sorted:
+            return
+        order = sorted(range(len(self._starts)), key=self._starts.__getitem__)
+        self.words[:] = [self.words[index] for index in order]
+        self._starts = array('d', [self._starts[index] for index in order])
+        self._ends = array('d', [self._ends[index] for index in order])
+        self._offsets = array('q', [self._offsets[index] for index in order])
+        self._sorted = True
+
+    def _freeze(self):
+        """Return NumPy copies of the arrays, cached until the next `add`."""
+        self._sort()
+        if self._arrays is None:
+            np = require_numpy('TimingIndex')
+            # Copies, as views would prevent appending to the arrays.
+            self._arrays = (np.frombuffer(self._starts, dtype=float).copy(),
+                            np.frombuffer(self._ends, dtype=float).copy(),
+                            np.frombuffer(self._offsets, dtype=np.int64).copy())
+        return self._arrays
@@ -19,3 +19,8 @@ from .recognize_listener import RecognizeListener
 from .audio_source import AudioSource
 from .synthesize_callback import SynthesizeCallback
 from .synthesize_listener import SynthesizeListener
+from .resilient_recognize_session import ResilientRecognizeSession
+from .synthesize_pool import SynthesizePool
+from .synthesize_event_stream import (SynthesizeEventStream, ContentType,
+                                     AudioChunk, Timings)
+from .audio_jitter_buffer import AudioJitterBuffer
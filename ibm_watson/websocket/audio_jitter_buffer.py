@@ -0,0 +1,170 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+
+class AudioJitterBuffer(object):
+    """
+    A ring buffer that smooths the playback of streamed audio.
+
+    The synthesis callback writes audio as it arrives and the audio sink reads
+    it at its own pace. Reads wait until `pre_roll` bytes are buffered, so short
+    gaps in the network stream do not interrupt playback. When the buffer runs
+    empty during playback, an underrun is counted and reads wait for the pre-roll
+    again. The buffer is allocated once and reads return views of it without
+    copying.
+
+    :param int capacity: The size of the buffer in bytes.
+    :param int pre_roll: The number of bytes to buffer before playback starts
+           or resumes after an underrun.
+    :param int frame_size: Reads return whole frames of this many bytes, for
+           example 2 for 16-bit mono audio.
+    :param int underruns: The number of times the buffer ran empty during
+           playback.
+    """
+
+    def __init__(self, capacity, pre_roll=0, frame_size=1):
+        if pre_roll > capacity:
+            raise ValueError('pre_roll must not be larger than capacity')
+        self.capacity = capacity
+        self.pre_roll = pre_roll
+        self.frame_size = frame_size
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.read_offset = 0
+        self.fill_level = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.underruns = 0
+        self.playing = False
+        self.finished = False
+        self.condition = threading.Condition()
+
+    def write(self, data, timeout=None):
+        """
+        Copy audio into the buffer, waiting while it is full.
+
+        :param data: The audio.
+        :param float timeout: (optional) The maximum seconds to wait for space.
+        :return: The number of bytes written, which is less than the length of
+                 the audio if the timeout expired.
+        :rtype: int
+        """
+        data = memoryview(data).cast('B')
+        written = 0
+        with self.condition:
+            while written < len(data):
+                if not self.condition.wait_for(
+                        lambda: self.fill_level < self.capacity, timeout):
+                    break
+                start = (self.read_offset + self.fill_level) % self.capacity
+                size = min(len(data) - written, self.capacity - self.fill_level,
+                           self.capacity - start)
+                self.view[start:start + size] = data[written:written + size]
+                written += size
+                self.fill_level += size
+                self.bytes_written += size
+                if self.fill_level >= self.pre_roll:
+                    self.playing = True
+                self.condition.notify_all()
+        return written
+
+    def finish(self):
+        """Mark the end of the audio. Reads return the rest without pre-roll."""
+        with self.condition:
+            self.finished = True
+            self.playing = True
+            self.condition.notify_all()
+
+    def read_views(self, size, timeout=None):
+        """
+        Return up to `size` bytes of buffered audio as views of the buffer,
+        waiting until playback can start. Call `consume` with the number of
+        bytes that were used before the next read.
+
+        :param int size: The maximum number of bytes to return.
+        :param float timeout: (optional) The maximum seconds to wait.
+        :return: One or two memoryviews (two when the audio wraps around the end
+                 of the buffer), or an empty list after the end of the audio or
+                 when the timeout expired.
+        :rtype: list
+        """
+        with self.condition:
+            if (self.playing and self.fill_level < self.frame_size and
+                    not self.finished):
+                self._underrun()
+            if not self.condition.wait_for(
+                    lambda: self.playing and
+                    (self.fill_level >= self.frame_size or self.finished),
+                    timeout):
+                return []
+            return self._views(size)
+
+    def consume(self, size):
+        """Release `size` bytes returned by `read_views` for new audio."""
+        with self.condition:
+            size = min(size, self.fill_level)
+            self.read_offset = (self.read_offset + size) % self.capacity
+            self.fill_level -= size
+            self.bytes_read += size
+            self.condition.notify_all()
+
+    def read_into(self, output):
+        """
+        Fill `output` with buffered audio without waiting, for sinks that pull
+        audio from a real-time callback. The rest of `output` is filled with
+        zeros while the buffer is pre-rolling or runs empty.
+
+        :param output: A writable buffer, such as a `bytearray`.
+        :return: The number of audio bytes copied.
+        :rtype: int
+        """
+        output = memoryview(output).cast('B')
+        copied = 0
+        with self.condition:
+            if self.playing:
+                for view in self._views(len(output)):
+                    output[copied:copied + len(view)] = view
+                    copied += len(view)
+                    view.release()
+                if copied < len(output) and not self.finished:
+                    self._underrun()
+            self.read_offset = (self.read_offset + copied) % self.capacity
+            self.fill_level -= copied
+            self.bytes_read += copied
+            self.condition.notify_all()
+        output[copied:] = bytes(len(output) - copied)
+        return copied
+
+    @property
+    def end_of_audio(self):
+        """Whether the audio is finished and has been read completely."""
+        return self.finished and not self.fill_level
+
+    def _views(self, size):
+        size = min(size, self.fill_level)
+        if not self.finished:
+            size -= size % self.frame_size
+        first = min(size, self.capacity - self.read_offset)
+        views = [self.view[self.read_offset:self.read_offset + first]]
+        if size > first:
+            views.append(self.view[:size - first])
+        return [view for view in views if len(view)]
+
+    def _underrun(self):
+        self.underruns += 1
+        self.playing = False
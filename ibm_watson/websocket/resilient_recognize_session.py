@@ -0,0 +1,706 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+import copy
+from array import array
+import json
+import re
+import sys
+import threading
+import time
+import websocket
+from .recognize_abstract_callback import RecognizeCallback
+from .recognize_listener import RecognizeListener, ONE_KB, TEN_MILLISECONDS
+try:
+    import thread
+except ImportError:
+    import _thread as thread
+
+# Bytes per sample of the raw formats whose audio can be resumed at any frame.
+SAMPLE_WIDTHS = {
+    'audio/l16': 2,
+    'audio/mulaw': 1,
+    'audio/alaw': 1,
+    'audio/basic': 1,
+}
+
+
+def get_audio_format(content_type):
+    """
+    Returns the `(bytes_per_second, frame_size)` of a raw audio content type, or
+    `None` if audio of that type cannot be split at arbitrary offsets.
+    """
+    if not content_type:
+        return None
+    parts = [part.strip() for part in content_type.lower().split(';')]
+    sample_width = SAMPLE_WIDTHS.get(parts[0])
+    if sample_width is None:
+        return None
+    params = dict(
+        re.match(r'([^=\s]+)\s*=\s*(\S+)', part).groups()
+        for part in parts[1:]
+        if '=' in part)
+    rate = int(params.get('rate', 8000 if parts[0] == 'audio/basic' else 0))
+    if not rate:
+        return None
+    frame_size = sample_width * int(params.get('channels', 1))
+    return rate * frame_size, frame_size
+
+
+def get_sample_format(content_type):
+    """
+    Returns the `array` type code and byte order of `audio/l16` samples, or
+    `None` for other content types.
+    """
+    if not content_type or not content_type.lower().startswith('audio/l16'):
+        return None
+    big_endian = 'endianness=big-endian' in content_type.lower().replace(
+        ' ', '')
+    return 'h', 'big' if big_endian else 'little'
+
+
+def shift_results(data, seconds, result_base):
+    """
+    Returns a copy of a recognition message whose times are moved `seconds`
+    later and whose `result_index` is increased by `result_base`.
+    """
+    data = copy.deepcopy(data)
+    if 'result_index' in data:
+        data['result_index'] += result_base
+    if not seconds:
+        return data
+    for result in data.get('results') or []:
+        for alternative in result.get('alternatives') or []:
+            for timestamp in alternative.get('timestamps') or []:
+                timestamp[1] += seconds
+                timestamp[2] += seconds
+        for alternatives in result.get('word_alternatives') or []:
+            alternatives['start_time'] += seconds
+            alternatives['end_time'] += seconds
+        for matches in (result.get('keywords_result') or {}).values():
+            for match in matches:
+                match['start_time'] += seconds
+                match['end_time'] += seconds
+    for label in data.get('speaker_labels') or []:
+        label['from'] += seconds
+        label['to'] += seconds
+    return data
+
+
+def trim_results(data, before):
+    """
+    Drops the words of a recognition message whose midpoint is not after
+    `before` seconds.
+
+    :return: A tuple with a copy of the message, or `None` if nothing is left,
+    and the index after the last final result that was dropped entirely (`0` if
+    none was).
+    """
+
+    def kept(start, end):
+        return (start + end) / 2.0 > before
+
+    result_index = data.get('result_index', 0)
+    results = []
+    leading = 0
+    dropped_finals = 0
+    for index, result in enumerate(data.get('results') or []):
+        alternatives = result.get('alternatives') or []
+        timestamps = alternatives[0].get('timestamps') if alternatives else None
+        if not timestamps or kept(timestamps[0][1], timestamps[0][2]):
+            results.append(result)
+            continue
+        first = next((i for i, (_, start, end) in enumerate(timestamps)
+                      if kept(start, end)), None)
+        if first is None:
+            if not results:
+                leading += 1
+            if result.get('final'):
+                dropped_finals = result_index + index + 1
+            continue
+        best = dict(alternatives[0])
+        best['timestamps'] = timestamps[first:]
+        best['transcript'] = ' '.join(word for word, _, _ in timestamps[first:])
+        if best.get('word_confidence'):
+            best['word_confidence'] = best['word_confidence'][first:]
+        result = dict(result, alternatives=[best])
+        if result.get('word_alternatives'):
+            result['word_alternatives'] = [
+                alternatives for alternatives in result['word_alternatives']
+                if kept(alternatives['start_time'], alternatives['end_time'])
+            ]
+        if result.get('keywords_result'):
+            result['keywords_result'] = {
+                keyword: [
+                    match for match in matches
+                    if kept(match['start_time'], match['end_time'])
+                ] for keyword, matches in result['keywords_result'].items()
+            }
+        results.append(result)
+
+    speaker_labels = [
+        label for label in data.get('speaker_labels') or []
+        if kept(label['from'], label['to'])
+    ]
+    if not results and not speaker_labels:
+        return None, dropped_finals
+    data = dict(data)
+    if 'results' in data:
+        data['results'] = results
+        data['result_index'] = result_index + leading
+    if 'speaker_labels' in data:
+        data['speaker_labels'] = speaker_labels
+    return data, dropped_finals
+
+
+class AudioRingBuffer(object):
+    """
+    Keeps the most recent `capacity` bytes of a stream, addressed by their
+    absolute offset from the start of the stream.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.chunks = deque()
+        self.start = 0
+        self.end = 0
+
+    def append(self, chunk):
+        self.chunks.append(bytes(chunk))
+        self.end += len(chunk)
+        excess = self.end - self.start - self.capacity
+        while excess > 0:
+            oldest = self.chunks[0]
+            if len(oldest) <= excess:
+                self.chunks.popleft()
+                self.start += len(oldest)
+                excess -= len(oldest)
+            else:
+                self.chunks[0] = oldest[excess:]
+                self.start += excess
+                excess = 0
+
+    def read(self, offset, size):
+        """
+        Returns up to `size` bytes starting at the absolute `offset`, which must
+        be between `start` and `end`.
+        """
+        pieces = []
+        position = self.start
+        for chunk in self.chunks:
+            if size <= 0:
+                break
+            if offset < position + len(chunk):
+                begin = max(offset - position, 0)
+                piece = chunk[begin:begin + size]
+                pieces.append(piece)
+                size -= len(piece)
+            position += len(chunk)
+        return b''.join(pieces)
+
+
+class ResilientRecognizeSession(object):
+    """
+    Recognizes a long audio stream over as many websocket connections as needed.
+
+    When a connection drops before all of the audio is recognized, the session
+    reconnects with the same options and replays the audio that follows the end
+    of the last final result from a bounded buffer of recently sent audio.
+
+    With `rollover_after`, the session also replaces connections before they
+    reach the service's session limits: once a connection has streamed that many
+    seconds of audio, a second connection is opened and the audio is handed over
+    to it at the next silence. The new connection starts `rollover_overlap`
+    seconds before the silence. Silence is detected in `audio/l16` audio only; for other
+    formats, or when nobody stops talking, the handover happens
+    `silence_timeout` seconds later.
+
+    The times and result indexes of the results of later connections are
+    shifted and overlapping words are removed, so the callback receives one
+    continuous transcript and a single `on_connected`, `on_listening` and
+    `on_close`.
+
+    Only raw audio (`audio/l16`, `audio/mulaw`, `audio/alaw` and `audio/basic`)
+    can be resumed at an arbitrary offset. For other formats the stream must be
+    resumable at any byte and `bytes_per_second` must be provided.
+    """
+
+    def __init__(self,
+                 audio_source,
+                 options,
+                 callback,
+                 url,
+                 get_headers,
+                 http_proxy_host=None,
+                 http_proxy_port=None,
+                 verify=None,
+                 max_reconnects=5,
+                 bytes_per_second=None,
+                 max_buffer_seconds=60,
+                 reconnect_delay=1.0,
+                 rollover_after=None,
+                 rollover_overlap=0.5,
+                 silence_threshold=500,
+                 silence_duration=0.3,
+                 silence_timeout=10.0):
+        """
+        :param AudioSource audio_source: The audio to transcribe.
+        :param dict options: The recognition options of the start message.
+        :param RecognizeCallback callback: The callback for the whole stream.
+        :param str url: The websocket URL of the recognize endpoint.
+        :param function get_headers: Returns the (authenticated) headers for a
+        new connection.
+        :param int max_reconnects: The maximum number of consecutive
+        reconnection attempts before `on_error` is called.
+        :param int bytes_per_second: The byte rate of the audio. Derived from the
+        content type for raw audio.
+        :param float max_buffer_seconds: How much of the most recently sent audio
+        is kept for replay.
+        :param float reconnect_delay: Seconds to wait before reconnecting.
+        :param float rollover_after: Seconds of audio after which a connection is
+        replaced by a new one. Must be well below the service's session limits.
+        :param float rollover_overlap: Seconds of audio before the handover
+        point that are also sent to the new connection.
+        :param int silence_threshold: The mean absolute sample value below
+        which `audio/l16` audio counts as silence.
+        :param float silence_duration: The minimum length of a silence that
+        the audio is handed over in.
+        :param float silence_timeout: Seconds to wait for a silence before the
+        audio is handed over regardless.
+        """
+        audio_format = get_audio_format(options.get('content_type'))
+        if bytes_per_second is not None:
+            audio_format = (bytes_per_second,
+                            audio_format[1] if audio_format else 1)
+        if audio_format is None:
+            raise ValueError(
+                'bytes_per_second must be provided for {0} audio'.format(
+                    options.get('content_type')))
+        self.bytes_per_second, self.frame_size = audio_format
+        self.sample_format = get_sample_format(options.get('content_type'))
+
+        self.audio_source = audio_source
+        self.options = dict(options, timestamps=True)
+        self.callback = callback
+        self.url = url
+        self.get_headers = get_headers
+        self.http_proxy_host = http_proxy_host
+        self.http_proxy_port = http_proxy_port
+        self.verify = verify
+        self.max_reconnects = max_reconnects
+        self.reconnect_delay = reconnect_delay
+        self.rollover_after = rollover_after
+        self.rollover_overlap = rollover_overlap
+        self.silence_threshold = silence_threshold
+        self.silence_duration = silence_duration
+        self.silence_timeout = silence_timeout
+
+        self.buffer = AudioRingBuffer(
+            int(max_buffer_seconds * self.bytes_per_second))
+        self.lock = threading.Lock()
+        self.delivery_lock = threading.RLock()
+        self.exhausted = False
+        self.connected = False
+        self.listening = False
+        # The connection that reads new audio from the source.
+        self.current = None
+        # Final results delivered so far and the end time of the last one.
+        self.final_results = 0
+        self.final_end = 0.0
+        # Silence detection state while a rollover is pending.
+        self.scan_offset = 0
+        self.quiet_since = None
+        self.next_rollover = 0
+
+    def run(self):
+        """
+        Streams the audio until it is recognized completely or the session
+        gives up after `max_reconnects` failed attempts. Blocks until done.
+        """
+        attempts = 0
+        connection = _ConnectionCallback(self, 0, released=True)
+        self.current = connection
+        self._open_connection(connection)
+        while True:
+            failed = connection.error or not connection.completed
+            successor = connection.successor
+            if successor is not None:
+                if not failed and successor.start_offset is not None:
+                    self._release(successor)
+                    successor.finished.wait()
+                    connection = successor
+                    attempts = 0
+                    continue
+                successor.close()
+            if not failed:
+                break
+            if connection.received_results:
+                attempts = 0
+            attempts += 1
+            if attempts > self.max_reconnects:
+                self.callback.on_error(connection.error or
+                                       'Connection closed before the end of the audio')
+                break
+            time.sleep(self.reconnect_delay)
+            connection = self._resume_connection()
+            self._open_connection(connection)
+        self.callback.on_close()
+
+    def audio_chunks(self, connection):
+        """
+        Yields the audio of a connection: first the buffered audio from its start
+        offset, then new audio from the source. Returns when the source is
+        exhausted, the connection is closed or the audio has been handed over
+        to a new connection.
+        """
+        while connection.start_offset is None:
+            # A new connection waits for the handover point.
+            if connection.closed:
+                return
+            time.sleep(TEN_MILLISECONDS)
+
+        position = connection.start_offset
+        while not connection.closed:
+            live = False
+            with self.lock:
+                position = max(position, self.buffer.start)
+                stop_offset = connection.stop_offset
+                if stop_offset is not None and position >= stop_offset:
+                    return
+                if position < self.buffer.end:
+                    size = ONE_KB
+                    if stop_offset is not None:
+                        size = min(size, stop_offset - position)
+                    chunk = self.buffer.read(position, size)
+                elif self.exhausted:
+                    return
+                elif connection is not self.current:
+                    chunk = b''
+                else:
+                    chunk = self._read_source()
+                    if chunk is None:
+                        self.exhausted = True
+                        return
+                    self.buffer.append(chunk)
+                    live = True
+                    if self.rollover_after:
+                        self._check_rollover(connection)
+            if chunk:
+                position += len(chunk)
+                yield chunk
+            if live or not chunk:
+                time.sleep(TEN_MILLISECONDS)
+
+    def deliver(self, connection, data):
+        """
+        Moves a message of a connection onto the stream timeline and passes it
+        to the callback. Messages of a new connection are held back until the
+        connection it replaces has finished.
+        """
+        with self.delivery_lock:
+            if not connection.released:
+                connection.pending.append(data)
+                return
+            data = shift_results(data, connection.offset, 0)
+            if connection.min_end is not None:
+                data, dropped_finals = trim_results(data, connection.min_end)
+                connection.dropped_finals = max(connection.dropped_finals,
+                                                dropped_finals)
+                if data is None:
+                    return
+            if 'result_index' in data:
+                data['result_index'] += (connection.result_base -
+                                         connection.dropped_finals)
+            for index, result in enumerate(data.get('results') or []):
+                if not result.get('final'):
+                    continue
+                self.final_results = max(
+                    self.final_results,
+                    data.get('result_index', 0) + index + 1)
+                timestamps = (result.get('alternatives') or [{}])[0].get(
+                    'timestamps')
+                if timestamps:
+                    self.final_end = max(self.final_end, timestamps[-1][2])
+            self._dispatch(data)
+
+    def _dispatch(self, data):
+        """Calls the transcription callbacks the way `RecognizeListener` does."""
+        results = data.get('results')
+        if results:
+            if self.options.get('interim_results') is True:
+                alternatives = results[0].get('alternatives')
+                if alternatives:
+                    hypothesis = alternatives[0].get('transcript')
+                    if results[0].get('final') is True:
+                        self.callback.on_transcription(
+                            RecognizeListener.extract_transcripts(alternatives))
+                    if hypothesis:
+                        self.callback.on_hypothesis(hypothesis)
+            else:
+                self.callback.on_transcription([
+                    RecognizeListener.extract_transcripts(
+                        result.get('alternatives')) for result in results
+                ])
+        self.callback.on_data(data)
+
+    def _open_connection(self, connection):
+        _ResumableRecognizeListener(self, connection, self.options, self.url,
+                                    self.get_headers(), self.http_proxy_host,
+                                    self.http_proxy_port, self.verify)
+
+    def _resume_connection(self):
+        """Creates the connection that replaces a dropped one."""
+        with self.lock:
+            resume_offset = int(self.final_end * self.bytes_per_second)
+            resume_offset -= resume_offset % self.frame_size
+            connection = _ConnectionCallback(self,
+                                             max(resume_offset,
+                                                 self.buffer.start),
+                                             released=True)
+            connection.result_base = self.final_results
+            connection.min_end = self.final_end
+            self.current = connection
+        return connection
+
+    def _release(self, successor):
+        """Delivers the held back messages of a connection that took over."""
+        with self.delivery_lock:
+            successor.result_base = self.final_results
+            successor.min_end = self.final_end
+            successor.released = True
+            pending, successor.pending = successor.pending, []
+            for data in pending:
+                self.deliver(successor, data)
+
+    def _check_rollover(self, connection):
+        """
+        Starts a new connection once `connection` has streamed `rollover_after`
+        seconds of audio, and hands the audio over to it at the next silence.
+        Called with the lock held.
+        """
+        streamed = float(self.buffer.end -
+                         connection.start_offset) / self.bytes_per_second
+        if streamed < self.rollover_after:
+            return
+        successor = connection.successor
+        if successor is None:
+            if time.time() < self.next_rollover:
+                return
+            successor = _ConnectionCallback(self, None, released=False)
+            connection.successor = successor
+            self.scan_offset = self.buffer.end
+            self.quiet_since = None
+            worker = threading.Thread(target=self._run_successor,
+                                      args=(connection, successor))
+            worker.daemon = True
+            worker.start()
+            return
+        if not successor.listening or successor.start_offset is not None:
+            return
+
+        handover = self._find_silence()
+        if handover is None and streamed >= self.rollover_after + self.silence_timeout:
+            handover = self.buffer.end
+        if handover is None:
+            return
+        # The current connection has already been sent the audio up to the end
+        # of the buffer, so the new one starts a little before the silence and
+        # the words recognized twice are removed from its results.
+        overlap = int(self.rollover_overlap * self.bytes_per_second)
+        start_offset = max(handover - overlap, self.buffer.start,
+                           connection.start_offset)
+        connection.stop_offset = self.buffer.end
+        successor.start_offset = start_offset - start_offset % self.frame_size
+        self.current = successor
+
+    def _run_successor(self, connection, successor):
+        try:
+            self._open_connection(successor)
+        except Exception as error:
+            successor.error = error
+        finally:
+            with self.lock:
+                if successor.start_offset is None and connection.successor is successor:
+                    # The new connection failed before the handover; retry later.
+                    connection.successor = None
+                    self.next_rollover = time.time() + self.reconnect_delay
+            successor.finished.set()
+
+    def _find_silence(self):
+        """
+        Scans the audio received since the rollover started for a silence of
+        `silence_duration` seconds and returns the offset of its middle.
+        """
+        if self.sample_format is None:
+            return None
+        window = max(int(0.02 * self.bytes_per_second), self.frame_size)
+        window -= window % self.frame_size
+        silence = int(self.silence_duration * self.bytes_per_second)
+        type_code, byte_order = self.sample_format
+        self.scan_offset = max(self.scan_offset, self.buffer.start)
+        while self.scan_offset + window <= self.buffer.end:
+            samples = array(type_code,
+                            self.buffer.read(self.scan_offset, window))
+            if byte_order != sys.byteorder:
+                samples.byteswap()
+            level = sum(abs(sample) for sample in samples) / len(samples)
+            if level >= self.silence_threshold:
+                self.quiet_since = None
+            elif self.quiet_since is None:
+                self.quiet_since = self.scan_offset
+            self.scan_offset += window
+            if (self.quiet_since is not None and
+                    self.scan_offset - self.quiet_since >= silence):
+                middle = (self.quiet_since + self.scan_offset) // 2
+                return middle - middle % self.frame_size
+        return None
+
+    def _read_source(self):
+        """
+        Returns the next chunk of the audio source, `b''` if none is available
+        yet or `None` once the source is exhausted.
+        """
+        source = self.audio_source
+        if not source.is_buffer:
+            chunk = source.input.read(ONE_KB)
+            if not chunk:
+                source.input.close()
+                return None
+            return chunk
+        try:
+            if not source.input.empty():
+                return source.input.get()
+        except Exception:
+            pass
+        return b'' if source.is_recording else None
+
+
+class _ConnectionCallback(RecognizeCallback):
+    """
+    The state of one connection of a session. Forwards its events to the
+    callback of the session.
+    """
+
+    def __init__(self, session, start_offset, released):
+        RecognizeCallback.__init__(self)
+        self.session = session
+        self.listener = None
+        self.error = None
+        self.closed = False
+        self.listening = False
+        self.stop_sent = False
+        # Whether the service confirmed the end of the audio after the stop
+        # message, so every final result was received.
+        self.completed = False
+        self.received_results = False
+        self.finished = threading.Event()
+        # The byte offsets of the audio of this connection.
+        self.start_offset = start_offset
+        self.stop_offset = None
+        # Maps the results of this connection onto the stream.
+        self.released = released
+        self.pending = []
+        self.result_base = 0
+        self.dropped_finals = 0
+        self.min_end = None
+        self.successor = None
+
+    @property
+    def offset(self):
+        return float(self.start_offset or 0) / self.session.bytes_per_second
+
+    def close(self):
+        self.closed = True
+        ws_client = getattr(self.listener, 'ws_client', None)
+        if ws_client is not None:
+            ws_client.close()
+
+    def on_connected(self):
+        if not self.session.connected:
+            self.session.connected = True
+            self.session.callback.on_connected()
+
+    def on_listening(self):
+        self.listening = True
+        if not self.session.listening:
+            self.session.listening = True
+            self.session.callback.on_listening()
+
+    def on_inactivity_timeout(self, error):
+        if self.released:
+            self.session.callback.on_inactivity_timeout(error)
+
+    def on_data(self, data):
+        self.received_results = True
+        self.session.deliver(self, data)
+
+    def on_error(self, error):
+        self.error = error
+
+    def on_close(self):
+        self.closed = True
+
+
+class _ResumableRecognizeListener(RecognizeListener):
+    """A `RecognizeListener` that streams the audio of a resilient session."""
+
+    def __init__(self, session, connection, options, url, headers,
+                 http_proxy_host=None, http_proxy_port=None, verify=None):
+        self.session = session
+        self.connection = connection
+        connection.listener = self
+        RecognizeListener.__init__(self, session.audio_source, dict(options),
+                                   connection, url, headers, http_proxy_host,
+                                   http_proxy_port, verify)
+
+    def send_audio(self, ws):
+
+        def run(*args):
+            """Background process to stream the data"""
+            connection = self.connection
+            try:
+                for chunk in self.session.audio_chunks(connection):
+                    self.ws_client.send(chunk, websocket.ABNF.OPCODE_BINARY)
+                if not connection.closed:
+                    connection.stop_sent = True
+                    self.ws_client.send(self.build_closing_message(),
+                                        websocket.ABNF.OPCODE_TEXT)
+            except Exception:
+                # The connection dropped; the session resumes the audio.
+                connection.closed = True
+
+        thread.start_new_thread(run, ())
+
+    def on_data(self, ws, message, message_type, fin):
+        # The service answers the stop message with the listening state after
+        # the last final result.
+        if (self.isListening and self.connection.stop_sent and
+                message_type == websocket.ABNF.OPCODE_TEXT):
+            try:
+                if 'state' in json.loads(message):
+                    self.connection.completed = True
+            except ValueError:
+                pass
+        RecognizeListener.on_data(self, ws, message, message_type, fin)
+
+    def on_error(self, ws, error):
+        self.connection.closed = True
+        RecognizeListener.on_error(self, ws, error)
+
+    def on_close(self, ws, *args):
+        self.connection.closed = True
+        RecognizeListener.on_close(self, ws, *args)
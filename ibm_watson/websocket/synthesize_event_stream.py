@@ -0,0 +1,143 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import namedtuple
+import asyncio
+import queue
+import threading
+from .synthesize_callback import SynthesizeCallback
+
+ContentType = namedtuple('ContentType', ['content_type'])
+AudioChunk = namedtuple('AudioChunk', ['audio'])
+Timings = namedtuple('Timings', ['words', 'marks'])
+
+_END = object()
+
+
+class SynthesizeEventStream(SynthesizeCallback):
+    """
+    A `SynthesizeCallback` that is consumed as an iterator of events.
+
+    The synthesis runs in a background thread and its events are yielded as
+    `ContentType`, `AudioChunk` and `Timings` tuples with `for` or `async for`.
+    At most `max_buffered` events are held; when the consumer falls behind, the
+    websocket thread waits, so the pace of the consumer bounds the memory that
+    is used. Errors of the synthesis are raised by the iteration.
+
+    :param int max_buffered: The maximum number of events held for the consumer.
+    """
+
+    def __init__(self, max_buffered=64):
+        SynthesizeCallback.__init__(self)
+        self.events = queue.Queue(maxsize=max_buffered)
+        self.error = None
+        self.closed = threading.Event()
+        self.thread = None
+
+    def start(self, synthesize):
+        """
+        Run the synthesis in a background thread.
+
+        :param synthesize: A function that synthesizes with this callback and
+               returns when the connection is closed.
+        """
+
+        def run():
+            try:
+                synthesize()
+            except Exception as error:
+                self.on_error(error)
+            finally:
+                self._put(_END)
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __iter__(self):
+        while not self.closed.is_set():
+            event = self.events.get()
+            if event is _END:
+                break
+            yield event
+        self._raise_error()
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        while not self.closed.is_set():
+            event = await loop.run_in_executor(None, self.events.get)
+            if event is _END:
+                break
+            yield event
+        self._raise_error()
+
+    def read_audio(self):
+        """Return the complete audio as one `bytes` object."""
+        return b''.join(
+            event.audio for event in self if isinstance(event, AudioChunk))
+
+    def close(self):
+        """
+        Stop buffering events. The synthesis finishes in the background and its
+        remaining events are discarded, and iterating ends.
+        """
+        self.closed.set()
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                break
+        # Wake a consumer that is waiting for the next event.
+        try:
+            self.events.put_nowait(_END)
+        except queue.Full:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def on_error(self, error):
+        if self.error is None:
+            self.error = error
+
+    def on_content_type(self, content_type):
+        self._put(ContentType(content_type))
+
+    def on_timing_information(self, timing_information):
+        self._put(
+            Timings(timing_information.get('words', []),
+                    timing_information.get('marks', [])))
+
+    def on_audio_stream(self, audio_stream):
+        self._put(AudioChunk(audio_stream))
+
+    def _put(self, event):
+        while not self.closed.is_set():
+            try:
+                self.events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _raise_error(self):
+        if self.error is None:
+            return
+        if isinstance(self.error, Exception):
+            raise self.error
+        raise Exception(self.error)
@@ -0,0 +1,210 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+import json
+import ssl
+import threading
+import time
+import websocket
+from .synthesize_listener import SynthesizeListener
+
+
+class SynthesizePool(object):
+    """
+    A pool of open, authenticated synthesis websockets.
+
+    The service handles one request per connection, so every request takes an
+    idle connection from the pool and a background thread opens a replacement.
+    Requests skip the TLS handshake and authentication as long as an idle
+    connection is available. Idle connections are replaced after `max_idle`
+    seconds, before the service closes them for inactivity and before the
+    credentials they were opened with expire.
+
+    :param str url: The synthesis URL with the query parameters of the voice.
+    :param get_headers: A function that returns freshly authenticated headers.
+    :param int size: The number of idle connections to keep open. With 0, no
+           connections are kept open and each synthesis opens its own.
+    :param float max_idle: The seconds after which idle connections are
+           replaced.
+    """
+
+    def __init__(self,
+                 url,
+                 get_headers,
+                 size=2,
+                 http_proxy_host=None,
+                 http_proxy_port=None,
+                 verify=None,
+                 max_idle=20.0,
+                 retry_delay=1.0):
+        if size < 0:
+            raise ValueError('size must not be negative')
+        self.url = url
+        self.get_headers = get_headers
+        self.size = size
+        self.http_proxy_host = http_proxy_host
+        self.http_proxy_port = http_proxy_port
+        self.verify = verify
+        self.max_idle = max_idle
+        self.retry_delay = retry_delay
+
+        self.idle = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.refill_thread = None
+        if size:
+            self.refill_thread = threading.Thread(target=self._refill,
+                                                  daemon=True)
+            self.refill_thread.start()
+
+    def synthesize(self, options, callback):
+        """
+        Synthesize on an idle connection, or on a new one if none is idle.
+        Blocks until the service closes the connection like
+        `SynthesizeListener`.
+
+        :param dict options: The text message of the request.
+        :param SynthesizeCallback callback: The callback for the request.
+        """
+        ws = self._take()
+        if ws is None:
+            try:
+                ws = self._connect()
+            except Exception as error:
+                callback.on_error(error)
+                callback.on_close()
+                return
+        PooledSynthesizeListener(options, callback, ws).run()
+
+    def close(self):
+        """Stop refilling the pool and close the idle connections."""
+        with self.condition:
+            self.closed = True
+            idle = list(self.idle)
+            self.idle.clear()
+            self.condition.notify_all()
+        for _, ws in idle:
+            self._close(ws)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _take(self):
+        expired = []
+        with self.condition:
+            ws = None
+            while self.idle:
+                opened, candidate = self.idle.popleft()
+                if time.monotonic() - opened < self.max_idle and \
+                        candidate.connected:
+                    ws = candidate
+                    break
+                expired.append(candidate)
+            self.condition.notify_all()
+        for candidate in expired:
+            self._close(candidate)
+        return ws
+
+    def _refill(self):
+        while True:
+            expired = []
+            with self.condition:
+                while not self.closed:
+                    now = time.monotonic()
+                    while self.idle and now - self.idle[0][0] >= self.max_idle:
+                        expired.append(self.idle.popleft()[1])
+                    if expired or len(self.idle) < self.size:
+                        break
+                    self.condition.wait(self.max_idle -
+                                        (now - self.idle[0][0]))
+                missing = self.size - len(self.idle)
+            for ws in expired:
+                self._close(ws)
+            if self.closed:
+                return
+            if missing <= 0:
+                continue
+            try:
+                ws = self._connect()
+            except Exception:
+                time.sleep(self.retry_delay)
+                continue
+            with self.condition:
+                if not self.closed:
+                    self.idle.append((time.monotonic(), ws))
+                    self.condition.notify_all()
+                    continue
+            self._close(ws)
+            return
+
+    def _connect(self):
+        return websocket.create_connection(
+            self.url,
+            header=self.get_headers(),
+            http_proxy_host=self.http_proxy_host,
+            http_proxy_port=self.http_proxy_port,
+            suppress_origin=True,
+            sslopt={'cert_reqs': ssl.CERT_NONE}
+            if self.verify is not None else None)
+
+    @staticmethod
+    def _close(ws):
+        try:
+            ws.close()
+        except Exception:
+            pass
+
+
+class PooledSynthesizeListener:
+    """
+    Dispatches the messages of a connection that is already open to a
+    callback, like a `SynthesizeListener`, whose initializer opens a new
+    connection.
+    """
+
+    on_data = SynthesizeListener.on_data
+    on_error = SynthesizeListener.on_error
+    on_close = SynthesizeListener.on_close
+
+    def __init__(self, options, callback, ws):
+        self.options = options
+        self.callback = callback
+        self.ws_client = ws
+
+    def run(self):
+        """Send the text and dispatch the messages until the connection closes."""
+        ws = self.ws_client
+        try:
+            self.callback.on_connected()
+            ws.send(json.dumps(self.options))
+            while True:
+                opcode, message = ws.recv_data()
+                if opcode == websocket.ABNF.OPCODE_CLOSE:
+                    break
+                if opcode == websocket.ABNF.OPCODE_TEXT:
+                    message = message.decode('utf-8')
+                self.on_data(ws, message, opcode, True)
+        except websocket.WebSocketConnectionClosedException:
+            pass
+        except Exception as error:
+            self.on_error(ws, error)
+        finally:
+            SynthesizePool._close(ws)
+            self.on_close(ws)
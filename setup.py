@@ -28,6 +28,7 @@ setup(name='ibm-watson',
       description='Client library to use the IBM Watson Services',
       packages=['ibm_watson'],
       install_requires=['requests>=2.0, <3.0', 'python_dateutil>=2.5.3', 'websocket-client>=1.1.0', 'ibm_cloud_sdk_core>=3.3.6, == 3.*'],
+      extras_require={'numpy': ['numpy>=1.17'], 'parquet': ['pyarrow>=7.0']},
       tests_require=['responses', 'pytest', 'python_dotenv', 'pytest-rerunfailures'],
       license='Apache 2.0',
       author='IBM Watson',
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for chunked bulk classification
+"""
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import time
+import pytest
+import responses
+from ibm_watson import AssistantV1, AssistantV2
+from ibm_watson.common import RateLimiter
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+
+class Classifier:
+    """Classifies 'n' as intent 'even' or 'odd', failing the first requests."""
+
+    def __init__(self, failures=0, status=503):
+        self.failures = failures
+        self.status = status
+        self.sizes = []
+
+    def __call__(self, request):
+        headers = {'Content-Type': 'application/json'}
+        if self.failures:
+            self.failures -= 1
+            return (self.status, dict(headers, **{'Retry-After': '0'}),
+                    json.dumps({'error': 'Unavailable'}))
+        utterances = json.loads(request.body)['input']
+        self.sizes.append(len(utterances))
+        output = []
+        for utterance in utterances:
+            number = int(utterance['text'])
+            intents = [] if number % 5 == 0 else [{
+                'intent': 'odd' if number % 2 else 'even',
+                'confidence': 0.9
+            }, {
+                'intent': 'other',
+                'confidence': 0.1
+            }]
+            output.append({'input': utterance, 'intents': intents})
+        return (200, headers, json.dumps({'output': output}))
+
+
+@pytest.fixture
+def assistant_v1():
+    service = AssistantV1(version='2021-11-27',
+                          authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    return service
+
+
+class TestBulkClassify:
+
+    @responses.activate
+    def test_outputs_in_order(self, assistant_v1):
+        classifier = Classifier()
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/workspaces/ws/bulk_classify',
+                               callback=classifier)
+        outputs = list(
+            assistant_v1.iter_bulk_classify('ws',
+                                            (str(n) for n in range(120)),
+                                            max_concurrency=3))
+        assert [output['input']['text'] for output in outputs
+               ] == [str(n) for n in range(120)]
+        assert sorted(classifier.sizes) == [20, 50, 50]
+
+    @responses.activate
+    def test_retries(self, assistant_v1):
+        classifier = Classifier(failures=2)
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/workspaces/ws/bulk_classify',
+                               callback=classifier)
+        outputs = list(
+            assistant_v1.iter_bulk_classify('ws', ['1', '2'], max_retries=2))
+        assert len(outputs) == 2
+
+        classifier.failures = 1
+        classifier.status = 400
+        with pytest.raises(ApiException):
+            list(assistant_v1.iter_bulk_classify('ws', ['1']))
+
+    @responses.activate
+    def test_numpy_results(self):
+        np = pytest.importorskip('numpy')
+        service = AssistantV2(version='2023-06-15',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        responses.add_callback(responses.POST,
+                               _base_url + '/v2/skills/skill/workspace/bulk_classify',
+                               callback=Classifier())
+        results = service.bulk_classify_all('skill',
+                                            [str(n) for n in range(1, 7)],
+                                            intents=['even', 'odd'],
+                                            chunk_size=4)
+        assert results.intents == ['even', 'odd']
+        assert results.top_intent.tolist() == [1, 0, 1, 0, -1, 0]
+        assert results.confidence.dtype == np.float32
+        assert results.confidence[4] == 0.0
+        expected = ['odd', 'even', 'odd', 'even', 'odd', 'even']
+        assert results.accuracy(expected) == pytest.approx(5 / 6)
+        assert results.accuracy(iter(expected)) == pytest.approx(5 / 6)
+        expected[4] = None
+        assert results.accuracy(expected) == 1.0
+        # No intent has no confidence, but is correct above any threshold.
+        assert results.accuracy(expected, threshold=1.5) == pytest.approx(1 / 6)
+        expected[4] = 'odd'
+        with pytest.raises(ValueError, match='7 expected intents for 6'):
+            results.accuracy(expected + ['odd'])
+        with pytest.raises(ValueError, match='5 expected intents for 6'):
+            results.accuracy(expected[:5])
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(50)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        assert time.monotonic() - started >= 0.09
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for context policies
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import responses
+from ibm_watson import AssistantV1
+from ibm_watson.assistant_context_policy import ContextPolicy
+from ibm_watson.assistant_v1 import Context
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+CONTEXT = {
+    'conversation_id': 'c1',
+    'system': {
+        'dialog_stack': [{
+            'dialog_node': 'root'
+        }],
+        'dialog_turn_counter': 3
+    },
+    'metadata': {
+        'user_id': 'u1'
+    },
+    'name': 'Ada',
+    'history': ['a', 'b', 'c', 'd'],
+    'cart': {
+        'items': ['x' * 100]
+    },
+    'debug': 'trace'
+}
+
+
+class TestContextPolicy:
+
+    def test_keep(self):
+        pruned = ContextPolicy(keep=['name']).apply(CONTEXT)
+        assert sorted(pruned) == ['conversation_id', 'metadata', 'name',
+                                  'system']
+        assert pruned['system'] is CONTEXT['system']
+        assert 'debug' in CONTEXT
+
+    def test_drop_and_truncate(self):
+        policy = ContextPolicy(drop=['debug'], max_list_items=2)
+        pruned = policy.apply(CONTEXT)
+        assert pruned['history'] == ['c', 'd']
+        assert CONTEXT['history'] == ['a', 'b', 'c', 'd']
+        assert 'debug' not in pruned
+        assert policy.last_turn.dropped == ['debug']
+        assert policy.last_turn.truncated == ['history']
+
+    def test_size_caps(self):
+        pruned = ContextPolicy(max_value_bytes=50).apply(CONTEXT)
+        assert 'cart' not in pruned
+        policy = ContextPolicy(max_bytes=30)
+        pruned = policy.apply(CONTEXT)
+        assert sorted(policy.last_turn.dropped) == ['cart', 'history']
+        assert pruned['name'] == 'Ada'
+
+    def test_turn_sizes(self):
+        policy = ContextPolicy(measure_system=True, history=2)
+        for _ in range(3):
+            pruned = policy.apply(CONTEXT)
+        turn = policy.last_turn
+        assert turn.turn == 3
+        assert len(policy.turns) == 2
+        without_system = dict(pruned)
+        del without_system['system']
+        assert turn.context_bytes == len(json.dumps(without_system))
+        assert turn.system_bytes == len(json.dumps(CONTEXT['system']))
+        assert ContextPolicy().apply({}) == {}
+
+    @responses.activate
+    def test_message(self):
+        url = _base_url + '/v1/workspaces/ws/message'
+        bodies = []
+
+        def callback(request):
+            bodies.append(json.loads(request.body))
+            return (200, {'Content-Type': 'application/json'},
+                    json.dumps({'context': CONTEXT}))
+
+        responses.add_callback(responses.POST, url, callback=callback)
+        service = AssistantV1(version='2021-11-27',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        policy = ContextPolicy(keep=['name'])
+        context = service.message('ws', context=CONTEXT,
+                                  context_policy=policy).get_result()['context']
+        service.message('ws',
+                        context=Context._from_dict(context),
+                        context_policy=policy,
+                        input={'text': 'hi'})
+        service.message('ws', context=CONTEXT)
+        assert sorted(bodies[0]['context']) == sorted(bodies[1]['context']) == [
+            'conversation_id', 'metadata', 'name', 'system'
+        ]
+        assert bodies[1]['input'] == {'text': 'hi'}
+        assert bodies[2]['context'] == CONTEXT
+        assert policy.last_turn.turn == 2
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for the dialog node graph
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import random
+import time
+import pytest
+import responses
+from ibm_watson import AssistantV1
+from ibm_watson.assistant_dialog_graph import DialogGraph
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+
+def tree(spec):
+    """Build dialog nodes from a dict of parent to ordered children."""
+    nodes = []
+    for parent, children in spec.items():
+        previous = None
+        for name in children:
+            node = {'dialog_node': name}
+            if parent is not None:
+                node['parent'] = parent
+            if previous is not None:
+                node['previous_sibling'] = previous
+            nodes.append(node)
+            previous = name
+    return nodes
+
+
+def apply(nodes, plan):
+    """Apply update_dialog_node calls the way the service does."""
+    graph = DialogGraph(nodes)
+    children = {None: graph.children()}
+    parents = {name: None for name in children[None]}
+    for name in graph.walk():
+        children[name] = graph.children(name)
+        for child in children[name]:
+            parents[child] = name
+    for operation in plan.operations:
+        assert operation.method == 'update_dialog_node'
+        kwargs = operation.kwargs
+        name = kwargs['dialog_node']
+        parent = kwargs.get('new_parent', parents[name])
+        previous = kwargs.get('new_previous_sibling')
+        # A node cannot become its own ancestor.
+        ancestor = parent
+        while ancestor is not None:
+            assert ancestor != name
+            ancestor = parents[ancestor]
+        children[parents[name]].remove(name)
+        siblings = children[parent]
+        siblings.insert(siblings.index(previous) + 1 if previous else 0, name)
+        parents[name] = parent
+    return {parent: names for parent, names in children.items() if names}
+
+
+SPEC = {None: ['welcome', 'order', 'help', 'anything_else'],
+        'order': ['size', 'flavor'],
+        'flavor': ['chocolate', 'vanilla']}
+
+
+class TestDialogGraph:
+
+    def test_traversal(self):
+        graph = DialogGraph(reversed(tree(SPEC)))
+        assert graph.children() == SPEC[None]
+        assert graph.children('flavor') == ['chocolate', 'vanilla']
+        assert graph.ancestors('vanilla') == ['flavor', 'order']
+        assert list(graph.walk()) == [
+            'welcome', 'order', 'size', 'flavor', 'chocolate', 'vanilla',
+            'help', 'anything_else'
+        ]
+        assert list(graph.walk('order')) == [
+            'size', 'flavor', 'chocolate', 'vanilla'
+        ]
+        assert [node['dialog_node'] for node in graph.subtree('flavor')
+               ] == ['flavor', 'chocolate', 'vanilla']
+        assert graph.validate() == []
+
+    def test_duplicate(self):
+        with pytest.raises(ValueError):
+            DialogGraph([{'dialog_node': 'a'}, {'dialog_node': 'a'}])
+
+    def test_validate(self):
+        nodes = tree(SPEC) + [
+            {'dialog_node': 'x', 'parent': 'y'},
+            {'dialog_node': 'y', 'parent': 'x'},
+            {'dialog_node': 'lost', 'parent': 'missing'},
+            {'dialog_node': 'jump', 'previous_sibling': 'anything_else',
+             'next_step': {'behavior': 'jump_to', 'selector': 'body',
+                           'dialog_node': 'gone'}},
+        ]
+        graph = DialogGraph(nodes)
+        assert graph.cycles() == [['x', 'y']]
+        assert graph.orphans() == ['x', 'y', 'lost']
+        problems = graph.validate()
+        assert 'dialog node lost: parent missing does not exist' in problems
+        assert 'dialog node jump: next_step gone does not exist' in problems
+        assert 'dialog nodes x -> y -> x: cycle' in problems
+        assert len(problems) == 6
+
+    def test_conflicting_siblings(self):
+        graph = DialogGraph([
+            {'dialog_node': 'a'},
+            {'dialog_node': 'b', 'previous_sibling': 'a'},
+            {'dialog_node': 'c', 'previous_sibling': 'a'},
+            {'dialog_node': 'd', 'parent': 'a', 'previous_sibling': 'b'},
+        ])
+        assert graph.validate() == [
+            'dialog nodes b and c: both follow a',
+            'dialog node d: previous sibling b has another parent',
+            'dialog node c: not reachable from the root'
+        ]
+
+    def test_move_plan_is_minimal(self):
+        current = tree({None: ['a', 'b', 'c', 'd', 'e']})
+        target = tree({None: ['a', 'c', 'd', 'e', 'b']})
+        plan = DialogGraph(current).move_plan(target)
+        assert [operation.kwargs for operation in plan.operations] == [{
+            'dialog_node': 'b',
+            'new_previous_sibling': 'e'
+        }]
+
+    def test_move_to_first_position(self):
+        current = tree({None: ['a'], 'a': ['x', 'y', 'z']})
+        target = tree({None: ['a'], 'a': ['z', 'x', 'y']})
+        plan = DialogGraph(current).move_plan(target)
+        assert apply(current, plan) == {None: ['a'], 'a': ['z', 'x', 'y']}
+        assert len(plan) == 2
+
+    def test_move_between_parents(self):
+        current = tree(SPEC)
+        target = tree({None: ['welcome', 'flavor', 'help', 'anything_else'],
+                       'flavor': ['chocolate', 'order'],
+                       'order': ['vanilla', 'size']})
+        plan = DialogGraph(current).move_plan(target)
+        assert plan.unsupported == ['dialog node flavor: move to the root level']
+
+    def test_reparent_under_former_descendant(self):
+        current = tree({None: ['a'], 'a': ['b'], 'b': ['c']})
+        target = tree({None: ['a'], 'a': ['c'], 'c': ['b']})
+        plan = DialogGraph(current).move_plan(target)
+        assert apply(current, plan) == {None: ['a'], 'a': ['c'], 'c': ['b']}
+        assert len(plan) == 2
+
+    def test_random_reorders(self):
+        randomizer = random.Random(7)
+        names = ['n{0}'.format(index) for index in range(40)]
+        for _ in range(30):
+            specs = []
+            for _ in range(2):
+                spec = {None: names[:3]}
+                for name in names[3:]:
+                    parent = randomizer.choice(list(spec[None]) + [
+                        child for children in list(spec.values())[1:]
+                        for child in children
+                    ])
+                    spec.setdefault(parent, []).append(name)
+                for parent, children in spec.items():
+                    if parent is not None:
+                        randomizer.shuffle(children)
+                specs.append(spec)
+            plan = DialogGraph(tree(specs[0])).move_plan(tree(specs[1]))
+            assert plan.unsupported == []
+            assert apply(tree(specs[0]), plan) == specs[1]
+
+    def test_move_plan_scales_linearly(self):
+        names = ['n{0}'.format(index) for index in range(20000)]
+        shuffled = list(names)
+        random.Random(3).shuffle(shuffled)
+        current = tree({None: ['root'], 'root': names})
+        target = tree({None: ['root'], 'root': shuffled})
+        graph = DialogGraph(current)
+        start = time.perf_counter()
+        plan = graph.move_plan(target)
+        # Quadratic list updates took over ten seconds for this reorder.
+        assert time.perf_counter() - start < 5
+        assert 0 < len(plan) < len(names)
+        small = tree({None: ['root'], 'root': shuffled[:2000]})
+        reordered = sorted(shuffled[:2000])
+        plan = DialogGraph(small).move_plan(
+            tree({None: ['root'], 'root': reordered}))
+        assert apply(small, plan) == {None: ['root'], 'root': reordered}
+
+        # Each node is a parent, so the children of every node are listed.
+        chain = {None: ['n0']}
+        chain.update((names[index], [names[index + 1]])
+                     for index in range(len(names) - 1))
+        graph = DialogGraph(tree(chain))
+        start = time.perf_counter()
+        assert len(graph.move_plan(tree(chain))) == 0
+        assert time.perf_counter() - start < 5
+
+    def test_invalid_target(self):
+        with pytest.raises(ValueError):
+            DialogGraph(tree(SPEC)).move_plan([{'dialog_node': 'a',
+                                                'parent': 'a'}])
+
+    @responses.activate
+    def test_adapter(self):
+        url = _base_url + '/v1/workspaces/ws/dialog_nodes'
+        responses.add(responses.GET,
+                      url,
+                      body=json.dumps({
+                          'dialog_nodes': tree(SPEC),
+                          'pagination': {}
+                      }),
+                      content_type='application/json')
+        service = AssistantV1(version='2021-11-27',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        graph = service.dialog_graph('ws')
+        assert graph.children('order') == ['size', 'flavor']
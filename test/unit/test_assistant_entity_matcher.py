@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for the entity matcher
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import pytest
+import responses
+from ibm_watson import AssistantV1
+from ibm_watson.assistant_entity_matcher import EntityMatcher
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+ENTITIES = [{
+    'entity': 'city',
+    'values': [{
+        'value': 'New York',
+        'type': 'synonyms',
+        'synonyms': ['NYC', 'big apple']
+    }, {
+        'value': 'York',
+        'type': 'synonyms',
+        'synonyms': []
+    }]
+}, {
+    'entity': 'drink',
+    'values': [{
+        'value': 'tea',
+        'type': 'synonyms'
+    }, {
+        'value': 'iced tea',
+        'type': 'synonyms'
+    }]
+}, {
+    'entity': 'order_id',
+    'values': [{
+        'value': 'order',
+        'type': 'patterns',
+        'patterns': [r'ORD-(\d+)-([A-Z])', r'#\d{4}']
+    }]
+}]
+
+
+class TestEntityMatcher:
+
+    def test_synonyms_and_values(self):
+        matcher = EntityMatcher(ENTITIES)
+        assert matcher.match('Fly from nyc to the Big Apple') == [{
+            'entity': 'city',
+            'location': [9, 12],
+            'value': 'New York',
+            'confidence': 1.0
+        }, {
+            'entity': 'city',
+            'location': [20, 29],
+            'value': 'New York',
+            'confidence': 1.0
+        }]
+
+    def test_longest_match_wins(self):
+        matcher = EntityMatcher(ENTITIES)
+        entities = matcher.match('new york iced tea')
+        assert [(entity['value'], entity['location']) for entity in entities
+               ] == [('New York', [0, 8]), ('iced tea', [9, 17])]
+
+    def test_whole_words(self):
+        matcher = EntityMatcher(ENTITIES)
+        assert matcher.match('steady yorkshire') == []
+        matcher = EntityMatcher(ENTITIES, whole_words=False)
+        assert [entity['value'] for entity in matcher.match('steady')
+               ] == ['tea']
+
+    def test_case_sensitive(self):
+        matcher = EntityMatcher(ENTITIES, case_sensitive=True)
+        assert matcher.match('nyc') == []
+        assert matcher.match('NYC')[0]['value'] == 'New York'
+
+    def test_same_span_in_several_entities(self):
+        entities = ENTITIES + [{
+            'entity': 'team',
+            'values': [{
+                'value': 'NYC',
+                'type': 'synonyms'
+            }]
+        }]
+        matcher = EntityMatcher(entities)
+        assert [entity['entity'] for entity in matcher.match('go NYC')
+               ] == ['city', 'team']
+
+    def test_patterns(self):
+        matcher = EntityMatcher(ENTITIES)
+        assert matcher.match('status of ORD-123-B and #2024') == [{
+            'entity': 'order_id',
+            'location': [10, 19],
+            'value': 'order',
+            'confidence': 1.0,
+            'groups': [{
+                'group': 'group_0',
+                'location': [14, 17]
+            }, {
+                'group': 'group_1',
+                'location': [18, 19]
+            }]
+        }, {
+            'entity': 'order_id',
+            'location': [24, 29],
+            'value': 'order',
+            'confidence': 1.0
+        }]
+
+    def test_pattern_flags_and_backreferences(self):
+        matcher = EntityMatcher([{
+            'entity': 'code',
+            'values': [{
+                'value': 'flagged',
+                'type': 'patterns',
+                'patterns': [r'(?i)abc']
+            }, {
+                'value': 'double',
+                'type': 'patterns',
+                'patterns': [r'(\w)\1', r'(?P<x>z)(?P=x)']
+            }]
+        }])
+        assert [(entity['value'], entity['location'])
+                for entity in matcher.match('ABC qq zz')] == [
+                    ('flagged', [0, 3]), ('double', [4, 6]),
+                    ('double', [7, 9])
+                ]
+
+    def test_overlapping_patterns_prefer_longest(self):
+        matcher = EntityMatcher([{
+            'entity': 'short',
+            'values': [{
+                'value': 'short',
+                'type': 'patterns',
+                'patterns': [r'\d{3}']
+            }]
+        }, {
+            'entity': 'phone',
+            'values': [{
+                'value': 'phone',
+                'type': 'patterns',
+                'patterns': [r'\d{3}-\d{4}']
+            }]
+        }])
+        assert [(entity['entity'], entity['location'])
+                for entity in matcher.match('call 555-1234')] == [
+                    ('phone', [5, 13])
+                ]
+
+    def test_invalid_pattern(self):
+        with pytest.raises(ValueError, match=r"'\(' of entity e, value v"):
+            EntityMatcher([{
+                'entity': 'e',
+                'values': [{
+                    'value': 'v',
+                    'type': 'patterns',
+                    'patterns': ['(']
+                }]
+            }])
+
+    def test_locations_with_expanding_lowercase(self):
+        matcher = EntityMatcher(ENTITIES)
+        # 'İ' lowercases to two characters.
+        assert matcher.match('İ tea')[0]['location'] == [2, 5]
+
+    def test_match_many(self):
+        matcher = EntityMatcher(ENTITIES)
+        assert [len(entities) for entities in matcher.match_many(
+            ['tea', 'nothing', 'tea in york'])] == [1, 0, 2]
+
+    @responses.activate
+    def test_adapter(self):
+        url = _base_url + '/v1/workspaces/ws/entities'
+
+        def callback(request):
+            assert 'export=true' in request.url
+            return (200, {'Content-Type': 'application/json'},
+                    json.dumps({
+                        'entities': ENTITIES,
+                        'pagination': {}
+                    }))
+
+        responses.add_callback(responses.GET, url, callback=callback)
+        service = AssistantV1(version='2021-11-27',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        matcher = service.entity_matcher('ws')
+        assert matcher.match('tea')[0]['entity'] == 'drink'
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for streamed exports
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import gzip
+import io
+import json
+import pytest
+import responses
+from ibm_watson import AssistantV1, AssistantV2
+from ibm_watson.assistant_export_stream import iter_json_events, iter_json_items
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+WORKSPACE = {
+    'name': 'café \"bot\"',
+    'intents': [{
+        'intent': 'order',
+        'examples': [{
+            'text': 'one coffee'
+        }, {
+            'text': '☕ please'
+        }]
+    }, {
+        'intent': 'cancel',
+        'examples': []
+    }],
+    'learning_opt_out': False,
+    'metadata': None,
+    'counts': [1, -2.5e3, 0],
+    'dialog_nodes': [{
+        'dialog_node': 'welcome'
+    }]
+}
+
+
+def chunked(document, size):
+    data = json.dumps(document, ensure_ascii=False).encode('utf-8')
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+class TestExportStream:
+
+    def test_events(self):
+        events = list(iter_json_events(chunked({'a': [1, {'b': None}]}, 1)))
+        assert events == [
+            ('', 'start_map', None),
+            ('', 'map_key', 'a'),
+            ('a', 'start_array', None),
+            ('a.item', 'number', 1),
+            ('a.item', 'start_map', None),
+            ('a.item', 'map_key', 'b'),
+            ('a.item.b', 'null', None),
+            ('a.item', 'end_map', None),
+            ('a', 'end_array', None),
+            ('', 'end_map', None),
+        ]
+
+    @pytest.mark.parametrize('size', [1, 3, 7, 1000])
+    def test_items_across_chunk_boundaries(self, size):
+        chunks = chunked(WORKSPACE, size)
+        assert list(iter_json_items(chunks, 'intents.item')) == (
+            WORKSPACE['intents'])
+        assert list(iter_json_items(chunks, 'name')) == [WORKSPACE['name']]
+        assert list(iter_json_items(chunks, 'counts.item')) == [1, -2500.0, 0]
+        assert list(iter_json_items(chunks, '')) == [WORKSPACE]
+        assert list(
+            iter_json_items(chunks,
+                            'dialog_nodes.item.dialog_node')) == ['welcome']
+
+    def test_invalid_json(self):
+        with pytest.raises(ValueError):
+            list(iter_json_events([b'{"a": tru']))
+        with pytest.raises(ValueError):
+            list(iter_json_events([b'{"a": [1}']))
+
+    @pytest.mark.parametrize('document', [
+        b'{"a":1 "b":2}', b'[1 2]', b'[,,1]', b'{"a":1,}', b'{"a"}', b'1 2',
+        b'[1,]', b'{,}', b'{"a" 1}', b'{1: 2}', b']', b'', b'{"a":}'
+    ])
+    def test_invalid_grammar(self, document):
+        with pytest.raises(ValueError):
+            list(iter_json_events([document]))
+
+    def test_empty_containers_and_scalars(self):
+        assert [event for _, event, _ in iter_json_events([b'{"a": [], "b": {}}'])
+               ] == [
+                   'start_map', 'map_key', 'start_array', 'end_array',
+                   'map_key', 'start_map', 'end_map', 'end_map'
+               ]
+        assert list(iter_json_events([b' 1 '])) == [('', 'number', 1)]
+
+    @responses.activate
+    def test_stream_workspace(self, tmp_path):
+        service = AssistantV1(version='2021-11-27',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        responses.add(responses.GET,
+                      _base_url + '/v1/workspaces/ws',
+                      json=WORKSPACE)
+        path = str(tmp_path / 'workspace.json.gz')
+        with service.stream_workspace('ws', chunk_size=16) as stream:
+            written = stream.save(path, compress=True)
+        assert 'export=true' in responses.calls[0].request.url
+        with gzip.open(path) as file:
+            assert json.load(file) == WORKSPACE
+        assert written == len(open(path, 'rb').read())
+        assert stream.bytes_received > written
+
+        responses.add(responses.GET,
+                      _base_url + '/v1/workspaces_async/ws/export',
+                      json=WORKSPACE)
+        stream = service.stream_workspace('ws', asynchronous=True)
+        assert [intent['intent'] for intent in stream.iter_items('intents.item')
+               ] == ['order', 'cancel']
+        assert '/v1/workspaces_async/ws/export' in responses.calls[1].request.url
+
+    @responses.activate
+    def test_stream_release_export(self):
+        service = AssistantV2(version='2023-06-15',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        responses.add(responses.GET,
+                      _base_url + '/v2/assistants/a/releases/1/export',
+                      body=b'PK\x03\x04zip',
+                      content_type='application/octet-stream')
+        output = io.BytesIO()
+        assert service.stream_release_export(
+            'a', '1', accept='application/octet-stream').save(output) == 7
+        assert output.getvalue() == b'PK\x03\x04zip'
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for IntentAnalytics
+"""
+
+import pytest
+from ibm_watson.assistant_intent_analytics import IntentAnalytics, encode_intents
+
+np = pytest.importorskip('numpy')
+
+
+def intents(name, confidence):
+    return {'intents': [{'intent': name, 'confidence': confidence}]}
+
+
+OUTPUTS = [
+    intents('order', 0.9),
+    intents('order', 0.8),
+    intents('cancel', 0.4),  # expected order
+    intents('cancel', 0.95),
+    intents('order', 0.3),  # expected cancel
+    {
+        'output': {
+            'intents': [{
+                'intent': 'hello',
+                'confidence': 0.7
+            }]
+        }
+    },
+    {
+        'intents': []
+    },  # expected hello
+]
+EXPECTED = ['order', 'order', 'order', 'cancel', 'cancel', 'hello', 'hello']
+
+
+@pytest.fixture
+def analytics():
+    return IntentAnalytics.from_outputs(OUTPUTS, EXPECTED)
+
+
+class TestIntentAnalytics:
+
+    def test_encode_intents(self):
+        names = ['a']
+        codes = encode_intents(['b', None, 'a', 'b'], names)
+        assert codes.tolist() == [1, -1, 0, 1]
+        assert names == ['a', 'b']
+
+    def test_confusion_matrix(self, analytics):
+        assert analytics.intents == ['order', 'cancel', 'hello']
+        assert analytics.confusion_matrix().tolist() == [
+            [2, 1, 0, 0],
+            [1, 1, 0, 0],
+            [0, 0, 1, 1],
+            [0, 0, 0, 0],
+        ]
+        # Predictions below the threshold count as no intent.
+        assert analytics.confusion_matrix(threshold=0.5)[0].tolist() == [
+            2, 0, 0, 1
+        ]
+        assert analytics.accuracy() == pytest.approx(4 / 7)
+
+    def test_precision_recall(self, analytics):
+        precision, recall, f1 = analytics.precision_recall()
+        assert precision.tolist() == pytest.approx([2 / 3, 1 / 2, 1.0])
+        assert recall.tolist() == pytest.approx([2 / 3, 1 / 2, 1 / 2])
+        assert f1[2] == pytest.approx(2 / 3)
+        assert analytics.report()['hello'] == {
+            'precision': 1.0,
+            'recall': 0.5,
+            'f1': pytest.approx(2 / 3),
+            'support': 2
+        }
+
+    def test_confidence_histogram(self, analytics):
+        correct, incorrect, edges = analytics.confidence_histogram(bins=2)
+        assert correct.tolist() == [0, 4]
+        assert incorrect.tolist() == [2, 0]
+        assert edges.tolist() == [0.0, 0.5, 1.0]
+
+    def test_confusable_pairs(self, analytics):
+        assert analytics.confusable_pairs(min_rate=0.1) == [
+            ('order', 'cancel', 2, pytest.approx(2 / 5))
+        ]
+
+    def test_large_input(self):
+        size = 1000000
+        rng = np.random.default_rng(0)
+        expected = rng.integers(0, 50, size)
+        predicted = np.where(rng.random(size) < 0.9, expected, 0)
+        analytics = IntentAnalytics(expected, predicted, rng.random(size),
+                                    ['i{0}'.format(i) for i in range(50)])
+        assert analytics.confusion_matrix().sum() == size
+        assert 0.89 < analytics.accuracy() < 0.92
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for the Assistant log export
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+import json
+import os
+import pytest
+import responses
+from ibm_watson import AssistantV1, AssistantV2
+from ibm_watson.assistant_log_export import LogExporter, time_ranges
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+# Two events per timestamp, over two days.
+LOGS = [{
+    'log_id': 'log-{0}'.format(n),
+    'request_timestamp': '2024-01-0{0}T{1:02d}:00:00.000Z'.format(
+        1 + n // 12, n % 12 // 2),
+    'request': {
+        'input': {
+            'text': 'hello {0}'.format(n)
+        }
+    }
+} for n in range(24)]
+
+
+class LogService:
+    """Serves LOGS with the filter, sort and cursor of list_all_logs."""
+
+    def __init__(self, expired_cursors=()):
+        self.expired_cursors = set(expired_cursors)
+        self.requests = []
+
+    def __call__(self, request):
+        query = parse_qs(urlparse(request.url).query)
+        self.requests.append(query)
+        headers = {'Content-Type': 'application/json'}
+        cursor = query.get('cursor', [None])[0]
+        if cursor in self.expired_cursors:
+            self.expired_cursors.discard(cursor)
+            return (400, headers, json.dumps({'error': 'Invalid cursor'}))
+        logs = LOGS
+        for clause in query.get('filter', [''])[0].split(','):
+            if clause.startswith('request_timestamp>='):
+                bound = clause[len('request_timestamp>='):]
+                logs = [log for log in logs if log['request_timestamp'] >= bound]
+            elif clause.startswith('request_timestamp<'):
+                bound = clause[len('request_timestamp<'):]
+                logs = [log for log in logs if log['request_timestamp'] < bound]
+        limit = int(query['page_limit'][0])
+        start = int(cursor or 0)
+        result = {'logs': logs[start:start + limit], 'pagination': {}}
+        if start + limit < len(logs):
+            result['pagination']['next_cursor'] = str(start + limit)
+        return (200, headers, json.dumps(result))
+
+
+def exported(directory):
+    logs = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.jsonl'):
+            with open(os.path.join(directory, name)) as file:
+                logs.extend(json.loads(line) for line in file)
+    return sorted(logs, key=lambda log: int(log['log_id'][4:]))
+
+
+@pytest.fixture
+def assistant_v1():
+    service = AssistantV1(version='2021-11-27',
+                          authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    return service
+
+
+class TestLogExport:
+
+    def test_time_ranges(self):
+        start = datetime(2024, 1, 1)
+        assert time_ranges(start, start + timedelta(hours=5),
+                           timedelta(hours=2)) == [
+                               (start, start + timedelta(hours=2)),
+                               (start + timedelta(hours=2),
+                                start + timedelta(hours=4)),
+                               (start + timedelta(hours=4),
+                                start + timedelta(hours=5)),
+                           ]
+
+    @responses.activate
+    def test_export_date_ranges(self, assistant_v1, tmp_path):
+        service = LogService()
+        responses.add_callback(responses.GET,
+                               _base_url + '/v1/logs',
+                               callback=service)
+        stats = assistant_v1.export_all_logs('language::en',
+                                             str(tmp_path),
+                                             start=datetime(2024, 1, 1),
+                                             end=datetime(2024, 1, 3),
+                                             step=timedelta(days=1),
+                                             page_limit=5)
+        assert stats.events == 24
+        assert stats.pages == 6
+        assert stats.events_per_second > 0
+        assert exported(tmp_path) == LOGS
+        filters = {query['filter'][0] for query in service.requests}
+        assert ('language::en,request_timestamp>=2024-01-01T00:00:00.000Z,'
+                'request_timestamp<2024-01-02T00:00:00.000Z') in filters
+        assert all(query['sort'] == ['request_timestamp']
+                   for query in service.requests)
+
+        # Completed ranges are not exported again.
+        requests = len(service.requests)
+        stats = assistant_v1.export_all_logs('language::en',
+                                             str(tmp_path),
+                                             start=datetime(2024, 1, 1),
+                                             end=datetime(2024, 1, 3),
+                                             step=timedelta(days=1))
+        assert stats.events == 0
+        assert len(service.requests) == requests
+
+    @responses.activate
+    def test_expired_cursor_resumes_from_watermark(self, assistant_v1,
+                                                   tmp_path):
+        # The page boundary at 5 splits the two events at one timestamp.
+        service = LogService(expired_cursors={'5'})
+        responses.add_callback(responses.GET,
+                               _base_url + '/v1/logs',
+                               callback=service)
+        stats = assistant_v1.export_all_logs('language::en',
+                                             str(tmp_path),
+                                             page_limit=5)
+        assert stats.restarts == 1
+        assert exported(tmp_path) == LOGS
+        assert 'request_timestamp>=2024-01-01T02:00:00.000Z' in (
+            service.requests[2]['filter'][0])
+
+    @responses.activate
+    def test_resume_after_interruption(self, assistant_v1, tmp_path):
+        service = LogService()
+        responses.add_callback(responses.GET,
+                               _base_url + '/v1/logs',
+                               callback=service)
+
+        def interrupt(stats):
+            if stats.pages == 2:
+                raise KeyboardInterrupt
+
+        exporter = LogExporter(assistant_v1.list_all_logs,
+                               str(tmp_path),
+                               filter='language::en',
+                               page_limit=7,
+                               progress=interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            exporter.run()
+        assert len(exported(tmp_path)) == 14
+
+        # An open range resumes from the watermark, also with new events.
+        LOGS.append({
+            'log_id': 'log-24',
+            'request_timestamp': '2024-01-03T00:00:00.000Z'
+        })
+        try:
+            exporter = LogExporter(assistant_v1.list_all_logs,
+                                   str(tmp_path),
+                                   filter='language::en',
+                                   page_limit=7,
+                                   cursor_ttl=-1)
+            stats = exporter.run()
+            assert exported(tmp_path) == LOGS
+            assert stats.events == 11
+        finally:
+            LOGS.pop()
+
+    @responses.activate
+    def test_assistant_v2_export(self, tmp_path):
+        service = AssistantV2(version='2023-06-15',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        responses.add_callback(responses.GET,
+                               _base_url + '/v2/assistants/a/logs',
+                               callback=LogService())
+        stats = service.export_logs('a', str(tmp_path), page_limit=10)
+        assert stats.events == 24
+        with open(os.path.join(str(tmp_path), 'checkpoint.json')) as file:
+            checkpoint = json.load(file)
+        assert checkpoint['begin_open']['watermark'] == (
+            '2024-01-02T05:00:00.000Z')
+        assert checkpoint['begin_open']['watermark_ids'] == ['log-22', 'log-23']
+
+    def test_parquet(self, assistant_v1, tmp_path):
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            with pytest.raises(ImportError, match='pyarrow'):
+                LogExporter(assistant_v1.list_all_logs,
+                            str(tmp_path),
+                            format='parquet')
+            return
+        with responses.RequestsMock() as mock:
+            mock.add_callback(responses.GET,
+                              _base_url + '/v1/logs',
+                              callback=LogService())
+            exporter = LogExporter(assistant_v1.list_all_logs,
+                                   str(tmp_path),
+                                   format='parquet',
+                                   filter='language::en',
+                                   page_limit=5,
+                                   rows_per_file=10)
+            exporter.run()
+        files = exporter.files()
+        assert len(files) == 3
+        table = pyarrow.parquet.read_table(files[0])
+        assert table.column('log_id').to_pylist()[:2] == ['log-0', 'log-1']
+        assert json.loads(table.column('request').to_pylist()[0]) == (
+            LOGS[0]['request'])
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for the Assistant pagers
+"""
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+from urllib.parse import parse_qs, urlparse
+import json
+import pytest
+import responses
+from ibm_watson import AssistantV1, AssistantV2
+from ibm_watson.pager import Pager
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+
+def paginated(key, count, rejected_cursors=()):
+    """A callback that pages `count` items by cursor, recording the cursors."""
+    requested = []
+    rejected_cursors = set(rejected_cursors)
+    headers = {'Content-Type': 'application/json'}
+
+    def callback(request):
+        query = parse_qs(urlparse(request.url).query)
+        cursor = query.get('cursor', [None])[0]
+        requested.append(cursor)
+        if cursor in rejected_cursors:
+            # A cursor expires once.
+            rejected_cursors.discard(cursor)
+            return (400, headers, json.dumps({'error': 'Invalid cursor', 'code': 400}))
+        limit = int(query.get('page_limit', ['2'])[0])
+        start = int(cursor or 0)
+        result = {key: [{'n': n} for n in range(start, min(start + limit, count))]}
+        result['pagination'] = {}
+        if start + limit < count:
+            result['pagination']['next_cursor'] = str(start + limit)
+        return (200, headers, json.dumps(result))
+
+    return callback, requested
+
+
+@pytest.fixture
+def assistant_v1():
+    service = AssistantV1(version='2021-11-27',
+                          authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    return service
+
+
+class TestAssistantPager:
+
+    @responses.activate
+    def test_iter_intents(self, assistant_v1):
+        callback, requested = paginated('intents', 7)
+        responses.add_callback(responses.GET,
+                               _base_url + '/v1/workspaces/ws/intents',
+                               callback=callback)
+        pager = assistant_v1.iter_intents('ws', page_limit=3)
+        assert [item['n'] for item in pager] == list(range(7))
+        assert requested == [None, '3', '6']
+        assert [len(page) for page in pager.pages()] == [3, 3, 1]
+
+    @responses.activate
+    def test_restart_on_rejected_cursor(self, assistant_v1):
+        callback, requested = paginated('workspaces', 5, rejected_cursors={'4'})
+        responses.add_callback(responses.GET,
+                               _base_url + '/v1/workspaces',
+                               callback=callback)
+        pager = assistant_v1.iter_workspaces(page_limit=2, prefetch=False)
+        assert [item['n'] for item in pager] == list(range(5))
+        assert pager.restarts == 1
+        assert requested == [None, '2', '4', None, '2', '4']
+
+    @responses.activate
+    def test_restart_on_expired_cursor(self, assistant_v1):
+        callback, requested = paginated('logs', 5)
+        responses.add_callback(responses.GET,
+                               _base_url + '/v1/logs',
+                               callback=callback)
+        pager = assistant_v1.iter_all_logs('language::en',
+                                           page_limit=2,
+                                           prefetch=False,
+                                           cursor_ttl=-1)
+        assert [item['n'] for item in pager] == list(range(5))
+        assert pager.restarts == 2
+        assert requested == [None, None, '2', None, '2', '4']
+
+    @responses.activate
+    def test_errors_are_raised(self, assistant_v1):
+        responses.add(responses.GET,
+                      _base_url + '/v1/workspaces',
+                      status=500,
+                      json={'error': 'Internal error'})
+        with pytest.raises(ApiException):
+            assistant_v1.iter_workspaces().get_all()
+
+    @responses.activate
+    def test_assistant_v2_releases(self):
+        service = AssistantV2(version='2023-06-15',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        callback, _ = paginated('releases', 3)
+        responses.add_callback(responses.GET,
+                               _base_url + '/v2/assistants/a/releases',
+                               callback=callback)
+        pager = service.iter_releases('a', page_limit=2)
+        assert isinstance(pager, Pager)
+        assert len(pager.get_all()) == 3
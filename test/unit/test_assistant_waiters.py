@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for the Assistant waiters
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import asyncio
+import threading
+import time
+import pytest
+import responses
+from ibm_watson import AssistantV1, AssistantV2
+from ibm_watson.assistant_waiters import (Waiter, WaiterCancelledError,
+                                          WaiterError, WaiterTimeoutError,
+                                          wait_all)
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+
+class Response:
+
+    def __init__(self, result):
+        self.result = result
+
+    def get_result(self):
+        return self.result
+
+
+def statuses(*values):
+    values = list(values)
+    return lambda: Response({'status': values.pop(0) if len(values) > 1 else
+                                       values[0]})
+
+
+class TestWaiters:
+
+    @responses.activate
+    def test_workspace_waiter(self):
+        service = AssistantV1(version='2021-11-27',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        url = _base_url + '/v1/workspaces/ws'
+        responses.add(responses.GET, url, json={'status': 'Processing'})
+        responses.add(responses.GET, url, json={'status': 'Training'})
+        responses.add(responses.GET, url, json={'status': 'Available'})
+        waiter = service.workspace_waiter('ws', delay=0.01)
+        assert waiter.wait() == {'status': 'Available'}
+        assert waiter.attempts == 3
+
+    def test_failure(self):
+        poll = lambda: Response({
+            'status': 'Failed',
+            'status_errors': [{
+                'message': 'Invalid intent'
+            }]
+        })
+        with pytest.raises(WaiterError, match='Failed: Invalid intent') as info:
+            Waiter(poll).wait()
+        assert info.value.result['status'] == 'Failed'
+
+    def test_timeout_and_backoff(self):
+        waiter = Waiter(statuses('Processing'),
+                        delay=0.01,
+                        max_delay=0.02,
+                        timeout=0.1)
+        with pytest.raises(WaiterTimeoutError):
+            waiter.wait()
+        # Delays grow to max_delay, with at least half of it between polls.
+        assert 5 <= waiter.attempts <= 12
+
+    def test_cancel(self):
+        waiter = Waiter(statuses('Processing'), delay=10)
+        threading.Timer(0.05, waiter.cancel).start()
+        started = time.monotonic()
+        with pytest.raises(WaiterCancelledError):
+            waiter.wait()
+        assert time.monotonic() - started < 1
+
+    @responses.activate
+    def test_wait_all_deployments(self):
+        service = AssistantV2(version='2023-06-15',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        for index in range(40):
+            url = _base_url + '/v2/assistants/a{0}/environments/e'.format(index)
+            responses.add(responses.GET,
+                          url,
+                          json={'release_reference': {
+                              'release': '1'
+                          }})
+            responses.add(responses.GET,
+                          url,
+                          json={'release_reference': {
+                              'release': '2'
+                          }})
+        waiters = [
+            service.deployment_waiter('a{0}'.format(index), 'e', '2',
+                                      delay=0.01) for index in range(40)
+        ]
+        started = time.monotonic()
+        results = wait_all(waiters, max_concurrency=8)
+        assert time.monotonic() - started < 2
+        assert all(result['release_reference']['release'] == '2'
+                   for result in results)
+        assert all(waiter.attempts == 2 for waiter in waiters)
+
+    def test_wait_all_exceptions(self):
+        waiters = [
+            Waiter(statuses('Processing', 'Completed'), delay=0.01),
+            Waiter(statuses('Failed'))
+        ]
+        results = wait_all(waiters, return_exceptions=True)
+        assert results[0] == {'status': 'Completed'}
+        assert isinstance(results[1], WaiterError)
+
+        waiters = [
+            Waiter(statuses('Processing'), delay=0.01),
+            Waiter(statuses('Failed'))
+        ]
+        with pytest.raises(WaiterError):
+            wait_all(waiters)
+        assert waiters[0].cancelled
+
+    def test_wait_async(self):
+
+        async def deploy():
+            return await asyncio.gather(*[
+                Waiter(statuses('Processing', 'Available'),
+                       delay=0.01).wait_async() for _ in range(10)
+            ])
+
+        assert asyncio.run(deploy()) == [{'status': 'Available'}] * 10
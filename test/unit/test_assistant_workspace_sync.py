@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for the workspace diff
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import copy
+import json
+import random
+import responses
+from ibm_watson import AssistantV1
+from ibm_watson.assistant_workspace_sync import Operation, diff_workspace
+
+_base_url = 'https://api.us-south.assistant.watson.cloud.ibm.com'
+
+WORKSPACE = {
+    'name': 'pizza',
+    'language': 'en',
+    'intents': [{
+        'intent': 'order',
+        'examples': [{
+            'text': 'I want a pizza'
+        }, {
+            'text': 'one large please'
+        }]
+    }, {
+        'intent': 'cancel',
+        'examples': [{
+            'text': 'stop'
+        }]
+    }],
+    'entities': [{
+        'entity': 'size',
+        'values': [{
+            'value': 'large',
+            'type': 'synonyms',
+            'synonyms': ['big', 'huge']
+        }]
+    }],
+    'counterexamples': [{
+        'text': 'pizza tower'
+    }],
+    'dialog_nodes': [{
+        'dialog_node': 'welcome',
+        'conditions': 'welcome',
+        'type': 'standard'
+    }, {
+        'dialog_node': 'order',
+        'conditions': '#order',
+        'previous_sibling': 'welcome'
+    }, {
+        'dialog_node': 'order_size',
+        'parent': 'order',
+        'conditions': '@size'
+    }]
+}
+
+
+def changed():
+    workspace = copy.deepcopy(WORKSPACE)
+    workspace['name'] = 'pizza shop'
+    order = workspace['intents'][0]
+    order['examples'].pop()
+    order['examples'].append({'text': 'deliver a pizza'})
+    workspace['intents'][1]['description'] = 'Cancel an order'
+    workspace['intents'].append({
+        'intent': 'hello',
+        'examples': [{
+            'text': 'hi'
+        }]
+    })
+    workspace['entities'][0]['values'][0]['synonyms'] = ['big', 'family']
+    workspace['entities'][0]['values'].append({'value': 'small'})
+    workspace['dialog_nodes'][2]['conditions'] = '@size:large'
+    workspace['dialog_nodes'].append({
+        'dialog_node': 'order_confirm',
+        'parent': 'order',
+        'previous_sibling': 'order_new'
+    })
+    workspace['dialog_nodes'].append({
+        'dialog_node': 'order_new',
+        'parent': 'order',
+        'previous_sibling': 'order_size'
+    })
+    return workspace
+
+
+def siblings(nodes):
+    """Return the children of each node in order."""
+    following = {(node.get('parent'), node.get('previous_sibling')):
+                 node['dialog_node'] for node in nodes}
+    children = {}
+    parents = [None]
+    while parents:
+        parent = parents.pop()
+        names = children[parent] = []
+        name = following.get((parent, None))
+        while name is not None:
+            names.append(name)
+            parents.append(name)
+            name = following.get((parent, name))
+    return {parent: names for parent, names in children.items() if names}
+
+
+def apply(nodes, plan):
+    """Apply the dialog node calls of a plan the way the service does."""
+    children = siblings(nodes)
+    parents = {
+        name: parent for parent, names in children.items() for name in names
+    }
+
+    def delete(name):
+        parents.pop(name)
+        for child in children.pop(name, []):
+            delete(child)
+
+    for operation in plan.operations:
+        kwargs = operation.kwargs
+        name = kwargs.get('dialog_node')
+        if operation.method == 'create_dialog_node':
+            assert name not in parents
+            parent = kwargs.get('parent')
+            previous = kwargs.get('previous_sibling')
+        elif operation.method == 'update_dialog_node':
+            names = children[parents[name]]
+            position = names.index(name)
+            parent = kwargs.get('new_parent', parents[name])
+            # A node moved to another parent without a previous sibling
+            # becomes its first child.
+            previous = kwargs.get(
+                'new_previous_sibling', None if 'new_parent' in kwargs else
+                names[position - 1] if position else None)
+            # A node cannot become its own ancestor.
+            ancestor = parent
+            while ancestor is not None:
+                assert ancestor != name
+                ancestor = parents[ancestor]
+            names.remove(name)
+        elif operation.method == 'delete_dialog_node':
+            children[parents[name]].remove(name)
+            delete(name)
+            continue
+        else:
+            continue
+        # The parent and previous sibling exist and are in place.
+        assert parent is None or parent in parents
+        names = children.setdefault(parent, [])
+        assert previous is None or previous in names
+        names.insert(names.index(previous) + 1 if previous else 0, name)
+        parents[name] = parent
+    return {parent: names for parent, names in children.items() if names}
+
+
+def random_nodes(rng, names):
+    """Return dialog nodes in a random tree."""
+    rng.shuffle(names)
+    children = {None: []}
+    for position, name in enumerate(names):
+        parent = rng.choice([None] + names[:position])
+        children.setdefault(parent, []).append(name)
+        children[name] = []
+    nodes = []
+    for parent, names in children.items():
+        rng.shuffle(names)
+        for position, name in enumerate(names):
+            node = {'dialog_node': name, 'conditions': rng.choice('ab')}
+            if parent is not None:
+                node['parent'] = parent
+            if position:
+                node['previous_sibling'] = names[position - 1]
+            nodes.append(node)
+    return nodes
+
+
+class TestWorkspaceSync:
+
+    def test_no_changes(self):
+        assert len(diff_workspace(WORKSPACE, copy.deepcopy(WORKSPACE))) == 0
+
+    def test_minimal_operations(self):
+        plan = diff_workspace(WORKSPACE, changed())
+        assert not plan.bulk
+        assert plan.operations == [
+            Operation('update_workspace', {'name': 'pizza shop'}),
+            Operation('create_value', {
+                'entity': 'size',
+                'value': 'small'
+            }),
+            Operation('create_synonym', {
+                'entity': 'size',
+                'value': 'large',
+                'synonym': 'family'
+            }),
+            Operation('delete_synonym', {
+                'entity': 'size',
+                'value': 'large',
+                'synonym': 'huge'
+            }),
+            Operation('update_intent', {
+                'intent': 'cancel',
+                'new_description': 'Cancel an order'
+            }),
+            Operation('create_intent', {
+                'intent': 'hello',
+                'examples': [{
+                    'text': 'hi'
+                }]
+            }),
+            Operation('create_example', {
+                'intent': 'order',
+                'text': 'deliver a pizza'
+            }),
+            Operation('delete_example', {
+                'intent': 'order',
+                'text': 'one large please'
+            }),
+            # New nodes are created after the new nodes they refer to.
+            Operation('create_dialog_node', {
+                'dialog_node': 'order_new',
+                'parent': 'order',
+                'previous_sibling': 'order_size'
+            }),
+            Operation('create_dialog_node', {
+                'dialog_node': 'order_confirm',
+                'parent': 'order',
+                'previous_sibling': 'order_new'
+            }),
+            Operation('update_dialog_node', {
+                'dialog_node': 'order_size',
+                'new_conditions': '@size:large'
+            }),
+        ]
+
+    def test_deletions(self):
+        workspace = copy.deepcopy(WORKSPACE)
+        workspace['intents'].pop()
+        workspace['entities'] = []
+        workspace['dialog_nodes'] = workspace['dialog_nodes'][:1]
+        plan = diff_workspace(WORKSPACE, workspace)
+        # The child node is deleted with its parent.
+        assert plan.operations == [
+            Operation('delete_dialog_node', {'dialog_node': 'order'}),
+            Operation('delete_entity', {'entity': 'size'}),
+            Operation('delete_intent', {'intent': 'cancel'}),
+        ]
+        assert [concurrent for _, concurrent in plan.phases] == [False, True]
+
+    def test_new_first_child(self):
+        workspace = copy.deepcopy(WORKSPACE)
+        welcome, order, _ = workspace['dialog_nodes']
+        del order['previous_sibling']
+        welcome['previous_sibling'] = 'order'
+        plan = diff_workspace(WORKSPACE, workspace)
+        assert not plan.bulk
+        # The old first child is moved after the node.
+        assert plan.operations == [
+            Operation('update_dialog_node', {
+                'dialog_node': 'welcome',
+                'new_previous_sibling': 'order'
+            }),
+        ]
+
+    def test_mixed_dialog_node_changes(self):
+        current = [{
+            'dialog_node': 'a'
+        }, {
+            'dialog_node': 'b',
+            'previous_sibling': 'a'
+        }, {
+            'dialog_node': 'c',
+            'parent': 'a'
+        }, {
+            'dialog_node': 'd',
+            'previous_sibling': 'b'
+        }, {
+            'dialog_node': 'h',
+            'parent': 'd'
+        }]
+        # New nodes refer to moved nodes, and nodes move under new nodes and
+        # out of a deleted node.
+        target = [{
+            'dialog_node': 'b'
+        }, {
+            'dialog_node': 'a',
+            'previous_sibling': 'b'
+        }, {
+            'dialog_node': 'e',
+            'previous_sibling': 'a'
+        }, {
+            'dialog_node': 'g',
+            'parent': 'e'
+        }, {
+            'dialog_node': 'c',
+            'parent': 'e',
+            'previous_sibling': 'g'
+        }, {
+            'dialog_node': 'h',
+            'parent': 'a'
+        }, {
+            'dialog_node': 'f',
+            'parent': 'a',
+            'previous_sibling': 'h'
+        }]
+        plan = diff_workspace({'dialog_nodes': current},
+                              {'dialog_nodes': target})
+        assert not plan.bulk
+        assert apply(current, plan) == siblings(target)
+        assert plan.operations[-1] == Operation('delete_dialog_node',
+                                                {'dialog_node': 'd'})
+
+        # A new node is created after its previous sibling is moved.
+        plan = diff_workspace(
+            {'dialog_nodes': current[:2]}, {
+                'dialog_nodes': [{
+                    'dialog_node': 'a'
+                }, {
+                    'dialog_node': 'b',
+                    'parent': 'a'
+                }, {
+                    'dialog_node': 'c',
+                    'parent': 'a',
+                    'previous_sibling': 'b'
+                }]
+            })
+        assert plan.operations == [
+            Operation('update_dialog_node', {
+                'dialog_node': 'b',
+                'new_parent': 'a'
+            }),
+            Operation('create_dialog_node', {
+                'dialog_node': 'c',
+                'parent': 'a',
+                'previous_sibling': 'b'
+            }),
+        ]
+
+    def test_random_dialog_node_changes(self):
+        rng = random.Random(42)
+        applied = 0
+        for _ in range(500):
+            names = ['n{0}'.format(number) for number in range(12)]
+            current = random_nodes(rng, rng.sample(names, rng.randint(0, 10)))
+            target = random_nodes(rng, rng.sample(names, rng.randint(0, 10)))
+            plan = diff_workspace({'dialog_nodes': current},
+                                  {'dialog_nodes': target})
+            if plan.bulk:
+                continue
+            applied += 1
+            assert apply(current, plan) == siblings(target)
+        assert applied > 200
+
+    def test_move_to_root_level_is_unsupported(self):
+        workspace = copy.deepcopy(WORKSPACE)
+        del workspace['dialog_nodes'][2]['parent']
+        workspace['dialog_nodes'][2]['previous_sibling'] = 'order'
+        plan = diff_workspace(WORKSPACE, workspace)
+        assert plan.bulk
+        assert plan.unsupported == ['dialog node order_size: remove parent']
+
+    def test_bulk_fallback(self):
+        plan = diff_workspace(WORKSPACE, changed(), max_operations=5)
+        assert plan.bulk
+        assert plan.operations[0].method == 'update_workspace'
+        assert plan.operations[0].kwargs['name'] == 'pizza shop'
+        assert len(plan.operations[0].kwargs['dialog_nodes']) == 5
+
+        # Removing a field of a node cannot be done with an update.
+        workspace = copy.deepcopy(WORKSPACE)
+        del workspace['dialog_nodes'][0]['conditions']
+        plan = diff_workspace(WORKSPACE, workspace)
+        assert plan.bulk
+        assert plan.unsupported == ['dialog node welcome: remove conditions']
+
+    @responses.activate
+    def test_sync_workspace(self):
+        service = AssistantV1(version='2021-11-27',
+                              authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        url = _base_url + '/v1/workspaces/ws'
+        responses.add(responses.GET, url, json=WORKSPACE)
+        responses.add(responses.POST, url, json={})
+        responses.add(responses.POST, url + '/intents/cancel', json={})
+        workspace = copy.deepcopy(WORKSPACE)
+        workspace['name'] = 'pizza shop'
+        workspace['intents'][1]['description'] = 'Cancel an order'
+        plan = service.sync_workspace('ws', workspace)
+        assert len(plan) == 2
+        assert 'export=true' in responses.calls[0].request.url
+        assert json.loads(responses.calls[1].request.body) == {
+            'name': 'pizza shop'
+        }
+        assert json.loads(responses.calls[2].request.body) == {
+            'description': 'Cancel an order'
+        }
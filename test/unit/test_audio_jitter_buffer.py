@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for AudioJitterBuffer
+"""
+
+import threading
+from ibm_watson.websocket import AudioJitterBuffer
+
+
+class TestAudioJitterBuffer:
+
+    def test_pre_roll_and_wrap_around(self):
+        buffer = AudioJitterBuffer(8, pre_roll=4, frame_size=2)
+        buffer.write(b'abc')
+        assert buffer.read_views(8, timeout=0.01) == []
+        buffer.write(b'def')
+        views = buffer.read_views(8)
+        assert [bytes(view) for view in views] == [b'abcdef']
+        buffer.consume(6)
+
+        buffer.write(b'ghijk')
+        assert buffer.fill_level == 5
+        views = buffer.read_views(8)
+        # The audio wraps around the end of the buffer; whole frames only.
+        assert [bytes(view) for view in views] == [b'gh', b'ij']
+        assert isinstance(views[0], memoryview)
+        buffer.consume(4)
+        buffer.finish()
+        assert [bytes(view) for view in buffer.read_views(8)] == [b'k']
+        buffer.consume(1)
+        assert buffer.read_views(8) == []
+        assert buffer.end_of_audio
+
+    def test_read_into_counts_underruns(self):
+        buffer = AudioJitterBuffer(16, pre_roll=4)
+        output = bytearray(b'xxxxxx')
+        assert buffer.read_into(output) == 0
+        assert output == bytes(6)
+        assert buffer.underruns == 0
+
+        buffer.write(b'12345')
+        assert buffer.read_into(output) == 5
+        assert output == b'12345\x00'
+        assert buffer.underruns == 1
+        # Playback waits for the pre-roll again after an underrun.
+        buffer.write(b'678')
+        assert buffer.read_into(output) == 0
+        buffer.write(b'9')
+        assert buffer.read_into(output) == 4
+        assert buffer.bytes_read == 9
+
+    def test_writer_waits_for_reader(self):
+        buffer = AudioJitterBuffer(4)
+        assert buffer.write(b'123456', timeout=0.01) == 4
+        writer = threading.Thread(target=buffer.write, args=(b'56789',))
+        writer.start()
+        received = b''
+        while len(received) < 9:
+            views = buffer.read_views(3)
+            received += b''.join(bytes(view) for view in views)
+            buffer.consume(sum(len(view) for view in views))
+        writer.join()
+        assert received == b'123456789'
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 from ibm_watson import get_sdk_headers
+from ibm_watson.common import get_status_code
 import unittest
 
 
@@ -30,3 +31,15 @@ class TestCommon(unittest.TestCase):
             headers.get('X-IBMCloud-SDK-Analytics'),
             'service_name=my_service;service_version=v1;operation_id=my_operation'
         )
+
+    def test_get_status_code(self):
+
+        class OldApiException(Exception):
+            code = 400
+
+        class ApiException(Exception):
+            status_code = 429
+
+        self.assertEqual(get_status_code(OldApiException()), 400)
+        self.assertEqual(get_status_code(ApiException()), 429)
+        self.assertIsNone(get_status_code(ValueError()))
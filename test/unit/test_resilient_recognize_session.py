@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for ResilientRecognizeSession
+"""
+
+import io
+from unittest import mock
+import pytest
+import websocket
+from ibm_watson.websocket import AudioSource, RecognizeCallback, ResilientRecognizeSession
+import struct
+from ibm_watson.websocket.resilient_recognize_session import AudioRingBuffer, get_audio_format, shift_results, trim_results, _ConnectionCallback, _ResumableRecognizeListener
+
+# 1000 bytes per second of audio
+_CONTENT_TYPE = 'audio/l16; rate=500'
+
+
+class RecordingCallback(RecognizeCallback):
+
+    def __init__(self):
+        RecognizeCallback.__init__(self)
+        self.events = []
+        self.data = []
+
+    def on_connected(self):
+        self.events.append('connected')
+
+    def on_listening(self):
+        self.events.append('listening')
+
+    def on_data(self, data):
+        self.data.append(data)
+
+    def on_error(self, error):
+        self.events.append('error')
+
+    def on_close(self):
+        self.events.append('close')
+
+
+class ScriptedSession(ResilientRecognizeSession):
+    """Replaces the websocket connections with scripted ones."""
+
+    def __init__(self, scripts, *args, **kwargs):
+        ResilientRecognizeSession.__init__(self, *args, **kwargs)
+        self.scripts = list(scripts)
+        self.received = []
+
+    def _open_connection(self, connection):
+        self.scripts.pop(0)(self, connection)
+
+
+def final_result(*timestamps):
+    return {
+        'result_index': 0,
+        'results': [{
+            'final': True,
+            'alternatives': [{
+                'transcript': ' '.join(word for word, _, _ in timestamps),
+                'timestamps': [list(timestamp) for timestamp in timestamps]
+            }]
+        }]
+    }
+
+
+def drop_after(size, final_end):
+
+    def script(session, connection):
+        connection.on_connected()
+        audio = b''
+        for chunk in session.audio_chunks(connection):
+            audio += chunk
+            if len(audio) >= size:
+                break
+        session.received.append(audio)
+        if final_end is not None:
+            connection.on_data(final_result(('first', 0.0, final_end)))
+        connection.on_error('dropped')
+
+    return script
+
+
+def complete(*timestamps):
+
+    def script(session, connection):
+        connection.on_listening()
+        session.received.append(b''.join(session.audio_chunks(connection)))
+        connection.on_data(final_result(*timestamps))
+        connection.stop_sent = True
+        connection.completed = True
+
+    return script
+
+
+def drop_after_stop(final_end):
+
+    def script(session, connection):
+        connection.on_listening()
+        session.received.append(b''.join(session.audio_chunks(connection)))
+        connection.stop_sent = True
+        connection.on_data(final_result(('first', 0.0, final_end)))
+        # The connection closes before the service confirms the end.
+        connection.on_close()
+
+    return script
+
+
+def run_session(scripts, audio, content_type=_CONTENT_TYPE, **kwargs):
+    callback = RecordingCallback()
+    session = ScriptedSession(scripts,
+                              AudioSource(io.BytesIO(audio)),
+                              {'content_type': content_type},
+                              callback,
+                              'wss://example/v1/recognize',
+                              dict,
+                              reconnect_delay=0,
+                              **kwargs)
+    session.run()
+    return session, callback
+
+
+class TestResilientRecognizeSession:
+
+    def test_get_audio_format(self):
+        assert get_audio_format('audio/l16;rate=16000;channels=2') == (64000, 4)
+        assert get_audio_format('audio/basic') == (8000, 1)
+        assert get_audio_format('audio/ogg') is None
+
+    def test_requires_bytes_per_second(self):
+        with pytest.raises(ValueError):
+            ResilientRecognizeSession(AudioSource(io.BytesIO(b'')),
+                                      {'content_type': 'audio/ogg'},
+                                      RecognizeCallback(), 'wss://example',
+                                      dict)
+
+    def test_ring_buffer(self):
+        buffer = AudioRingBuffer(5)
+        buffer.append(b'abc')
+        buffer.append(b'defg')
+        assert (buffer.start, buffer.end) == (2, 7)
+        assert buffer.read(2, 10) == b'cdefg'
+        assert buffer.read(4, 2) == b'ef'
+        assert buffer.read(2, 2) == b'cd'
+
+    def test_shift_results(self):
+        data = {
+            'result_index': 1,
+            'results': [{
+                'alternatives': [{'timestamps': [['a', 0.5, 1.0]]}],
+                'keywords_result': {'a': [{'start_time': 0.5, 'end_time': 1.0}]},
+                'word_alternatives': [{'start_time': 0.5, 'end_time': 1.0}]
+            }],
+            'speaker_labels': [{'from': 0.5, 'to': 1.0}]
+        }
+        shifted = shift_results(data, 2.0, 3)
+        assert shifted['result_index'] == 4
+        assert shifted['results'][0]['alternatives'][0]['timestamps'] == [['a', 2.5, 3.0]]
+        assert shifted['results'][0]['keywords_result']['a'][0]['start_time'] == 2.5
+        assert shifted['results'][0]['word_alternatives'][0]['end_time'] == 3.0
+        assert shifted['speaker_labels'][0]['from'] == 2.5
+        assert data['result_index'] == 1
+
+    def test_resumes_after_last_final_result(self):
+        audio = bytes(range(256)) * 8
+        session, callback = run_session(
+            [drop_after(1500, 1.2005),
+             complete(('first', 0.0, 0.001), ('second', 0.25, 0.5))], audio)
+        # The second connection replays from the end of the first final result.
+        assert session.received[1] == audio[1200:]
+        assert callback.events == ['connected', 'listening', 'close']
+        # Words already finalized by the first connection are removed.
+        second = callback.data[1]
+        assert second['result_index'] == 1
+        assert second['results'][0]['alternatives'][0]['timestamps'] == [
+            ['second', 1.45, 1.7]
+        ]
+
+    def test_resumes_after_drop_after_stop(self):
+        audio = bytes(range(256)) * 8
+        session, callback = run_session(
+            [drop_after_stop(0.5),
+             complete(('second', 0.25, 0.5))], audio)
+        # The audio after the last final result is recognized again.
+        assert session.received[0] == audio
+        assert session.received[1] == audio[500:]
+        assert callback.events == ['listening', 'close']
+        assert len(callback.data) == 2
+
+    def test_listening_state_after_stop_completes(self):
+        session = mock.Mock(bytes_per_second=1000)
+        connection = _ConnectionCallback(session, 0, released=True)
+        listener = _ResumableRecognizeListener.__new__(
+            _ResumableRecognizeListener)
+        listener.connection = connection
+        listener.callback = connection
+        listener.options = {}
+        listener.isListening = True
+        ws = mock.Mock()
+        message = '{"state": "listening"}'
+        listener.on_data(ws, message, websocket.ABNF.OPCODE_TEXT, True)
+        assert not connection.completed
+        connection.stop_sent = True
+        listener.on_data(ws, message, websocket.ABNF.OPCODE_TEXT, True)
+        assert connection.completed
+        assert ws.close.called
+
+    def test_gives_up_after_max_reconnects(self):
+        audio = b'\x00' * 4000
+        scripts = [drop_after(100, None)] * 3
+        _, callback = run_session(scripts, audio, max_reconnects=2)
+        assert callback.events[-2:] == ['error', 'close']
+
+    def test_trim_results(self):
+        data = {
+            'result_index': 2,
+            'results': [
+                final_result(('a', 0.0, 0.4))['results'][0],
+                final_result(('b', 0.8, 1.0), ('c', 1.0, 1.2))['results'][0]
+            ]
+        }
+        trimmed, dropped_finals = trim_results(data, 0.95)
+        assert dropped_finals == 3
+        assert trimmed['result_index'] == 3
+        assert trimmed['results'][0]['alternatives'][0] == {
+            'transcript': 'c',
+            'timestamps': [['c', 1.0, 1.2]]
+        }
+        assert trim_results(data, 5.0) == (None, 4)
+
+    def test_rolls_over_at_silence(self):
+        # 8000 samples per second of 16-bit audio: 1 second of speech, half a
+        # second of silence and another second of speech.
+        loud = struct.pack('<h', 8000) * 8000
+        quiet = struct.pack('<h', 0) * 4000
+        audio = loud + quiet + loud
+        session, callback = run_session(
+            [complete(('one', 0.2, 0.6), ('two', 0.9, 1.1)),
+             complete(('two', 0.0, 0.06), ('three', 0.5, 0.9))],
+            audio,
+            content_type='audio/l16; rate=8000',
+            rollover_after=0.5,
+            rollover_overlap=0.1,
+            silence_duration=0.3)
+        # The silence is found in the 21st chunk; the new connection starts 0.1
+        # seconds before the middle of the first 0.3 seconds of silence.
+        assert session.received[0] == audio[:21504]
+        assert session.received[1] == audio[16992:]
+        assert len(callback.data) == 2
+        second = callback.data[1]
+        assert second['result_index'] == 1
+        assert second['results'][0]['alternatives'][0]['transcript'] == 'three'
+        assert second['results'][0]['alternatives'][0]['timestamps'] == [
+            ['three', pytest.approx(1.562),
+             pytest.approx(1.962)]
+        ]
+        assert callback.events == ['listening', 'close']
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for multichannel recognition
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import io
+import json
+import struct
+import wave
+from unittest import mock
+import pytest
+import responses
+from ibm_watson import SpeechToTextV1
+from ibm_watson.speech_to_text_multichannel import split_channels, merge_channel_results, RecognitionError, ResultsCollector
+
+_service = SpeechToTextV1(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.speech-to-text.watson.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+
+def stereo_wav(left, right):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(2)
+        writer.setsampwidth(2)
+        writer.setframerate(8000)
+        writer.writeframes(b''.join(
+            struct.pack('<hh', l, r) for l, r in zip(left, right)))
+    return buffer.getvalue()
+
+
+def mono_samples(audio):
+    with wave.open(io.BytesIO(audio), 'rb') as reader:
+        assert reader.getnchannels() == 1
+        frames = reader.readframes(reader.getnframes())
+    return list(struct.unpack('<{0}h'.format(len(frames) // 2), frames))
+
+
+def recognition(*utterances):
+    return {
+        'result_index': 0,
+        'results': [{
+            'final': True,
+            'alternatives': [{
+                'transcript': ' '.join(w for w, _, _ in timestamps),
+                'confidence': 0.9,
+                'timestamps': timestamps
+            }]
+        } for timestamps in utterances]
+    }
+
+
+class TestSplitChannels:
+
+    def test_split_wav(self):
+        streams = split_channels(stereo_wav([1, 2, 3], [-1, -2, -3]))
+        assert len(streams) == 2
+        assert streams[0][1] == 'audio/wav'
+        assert mono_samples(streams[0][0]) == [1, 2, 3]
+        assert mono_samples(streams[1][0]) == [-1, -2, -3]
+
+    def test_split_l16(self):
+        audio = struct.pack('<6h', 1, 10, 2, 20, 3, 30)
+        streams = split_channels(io.BytesIO(audio),
+                                 'audio/l16; rate=16000; channels=2')
+        assert streams[0] == (struct.pack('<3h', 1, 2, 3),
+                              'audio/l16;rate=16000;channels=1')
+        assert streams[1][0] == struct.pack('<3h', 10, 20, 30)
+        # Other parameters, like the byte order, are kept.
+        streams = split_channels(
+            audio, 'audio/l16;rate=16000;channels=2;endianness=little-endian')
+        assert streams[0][1] == (
+            'audio/l16;rate=16000;channels=1;endianness=little-endian')
+
+    def test_split_unsupported(self):
+        with pytest.raises(ValueError):
+            split_channels(b'audio', 'audio/mp3')
+
+
+class TestMergeChannelResults:
+
+    def test_merge_orders_by_start_time(self):
+        left = recognition([['hello', 0.0, 0.5], ['there', 0.5, 0.9]],
+                           [['bye', 3.0, 3.4]])
+        right = recognition([['hi', 1.0, 1.3]])
+        merged = merge_channel_results([left, right])
+        assert [(w['channel'], w['word']) for w in merged['words']] == [
+            (0, 'hello'), (0, 'there'), (1, 'hi'), (0, 'bye')]
+        assert [r['transcript'] for r in merged['results']] == [
+            'hello there', 'hi', 'bye']
+        assert merged['results'][0]['from'] == 0.0
+        assert merged['results'][0]['to'] == 0.9
+
+    def test_collector_replaces_results_by_index(self):
+        collector = ResultsCollector()
+        first = recognition([['one', 0.0, 0.2]])
+        collector.on_data(first)
+        collector.on_data({'result_index': 0, 'results': [{'final': False}]})
+        collector.on_data(dict(recognition([['two', 1.0, 1.2]]),
+                               result_index=1))
+        assert len(collector.to_dict()['results']) == 2
+
+
+class TestRecognizeMultichannel:
+
+    @responses.activate
+    def test_recognize_multichannel(self):
+
+        def request_callback(request):
+            samples = mono_samples(request.body)
+            if samples[0] > 0:
+                body = recognition([['agent', 0.2, 0.6]])
+            else:
+                body = recognition([['caller', 0.1, 0.4]])
+            assert 'timestamps=true' in request.url
+            return (200, {}, json.dumps(body))
+
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/recognize',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        merged = _service.recognize_multichannel(
+            stereo_wav([5, 5], [-5, -5]), model='en-US_Telephony')
+        assert len(responses.calls) == 2
+        assert [(w['channel'], w['word']) for w in merged['words']] == [
+            (1, 'caller'), (0, 'agent')]
+        assert len(merged['channels']) == 2
+
+    def test_websocket_error(self):
+
+        def recognize_using_websocket(audio, content_type, callback, **kwargs):
+            callback.on_error('Unable to transcode data stream')
+
+        with mock.patch.object(_service, 'recognize_using_websocket',
+                               recognize_using_websocket):
+            with pytest.raises(RecognitionError,
+                               match='Unable to transcode') as error:
+                _service.recognize_multichannel(stereo_wav([5], [-5]),
+                                                use_websocket=True)
+        assert error.value.channel in (0, 1)
+        assert error.value.error == 'Unable to transcode data stream'
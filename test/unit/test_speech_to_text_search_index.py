@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for TranscriptIndex
+"""
+
+import os
+import tempfile
+import pytest
+from ibm_watson.speech_to_text_search_index import TranscriptIndex, normalize_tokens
+
+_call = {
+    'results': [{
+        'final': True,
+        'alternatives': [{
+            'transcript': 'please reset my password',
+            'timestamps': [['please', 0.5, 0.8], ['reset', 0.8, 1.1],
+                           ['my', 1.1, 1.2], ['password', 1.2, 1.75]]
+        }],
+        'word_alternatives': [{
+            'start_time': 0.8,
+            'end_time': 1.1,
+            'alternatives': [{'word': 'reset', 'confidence': 0.7},
+                             {'word': 'recent', 'confidence': 0.2}]
+        }],
+        'keywords_result': {
+            'password reset': [{
+                'normalized_text': 'Password reset',
+                'start_time': 4.0,
+                'end_time': 4.9,
+                'confidence': 0.9
+            }]
+        }
+    }]
+}
+
+_other = {
+    'results': [{
+        'final': True,
+        'alternatives': [{
+            'transcript': 'my password expired',
+            'timestamps': [['my', 2.0, 2.1], ['password', 2.1, 2.5],
+                           ['expired', 2.5, 3.0]]
+        }]
+    }]
+}
+
+
+def build_index():
+    index = TranscriptIndex()
+    index.add('call-1', _call)
+    index.add('call-2', _other)
+    return index
+
+
+class TestTranscriptIndex:
+
+    def test_normalize_tokens(self):
+        assert normalize_tokens("Don't STOP, please!") == ['don\'t', 'stop', 'please']
+
+    def test_search_word(self):
+        assert build_index().search('Password') == [
+            {'transcript_id': 'call-1', 'from': 1200, 'to': 1750},
+            {'transcript_id': 'call-2', 'from': 2100, 'to': 2500},
+        ]
+
+    def test_search_phrase(self):
+        assert build_index().search('reset my password') == [
+            {'transcript_id': 'call-1', 'from': 800, 'to': 1750}]
+        assert build_index().search('my password expired') == [
+            {'transcript_id': 'call-2', 'from': 2000, 'to': 3000}]
+        assert build_index().search('password my') == []
+
+    def test_search_word_alternatives(self):
+        assert build_index().search('recent my') == [
+            {'transcript_id': 'call-1', 'from': 800, 'to': 1200}]
+
+    def test_search_keywords(self):
+        assert build_index().search('password reset') == [
+            {'transcript_id': 'call-1', 'from': 4000, 'to': 4900}]
+
+    def test_save_and_load(self):
+        index = build_index()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'transcripts.idx')
+            index.save(path)
+            with TranscriptIndex.load(path) as loaded:
+                for query in ('password', 'reset my password', 'recent',
+                              'password reset', 'missing'):
+                    assert loaded.search(query) == index.search(query)
+                with pytest.raises(ValueError):
+                    loaded.add('call-3', _other)
+            with pytest.raises(ValueError, match='index is closed'):
+                loaded.search('password')
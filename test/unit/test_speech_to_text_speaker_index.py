@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for SpeakerIndex
+"""
+
+from ibm_watson.speech_to_text_v1 import SpeechRecognitionResults
+from ibm_watson.speech_to_text_speaker_index import SpeakerIndex
+
+_results = {
+    'result_index': 0,
+    'results': [{
+        'final': True,
+        'alternatives': [{
+            'transcript': 'hello how are you',
+            'timestamps': [['hello', 0.0, 0.4], ['how', 0.5, 0.7],
+                           ['are', 0.7, 0.8], ['you', 0.8, 1.0]]
+        }]
+    }, {
+        'final': True,
+        'alternatives': [{
+            'transcript': 'fine',
+            'timestamps': [['fine', 1.6, 2.0]]
+        }]
+    }],
+    'speaker_labels': [
+        {'from': 1.6, 'to': 2.0, 'speaker': 0, 'confidence': 0.6, 'final': True},
+        {'from': 0.0, 'to': 0.4, 'speaker': 0, 'confidence': 0.8, 'final': True},
+        {'from': 0.5, 'to': 0.7, 'speaker': 1, 'confidence': 0.7, 'final': True},
+        {'from': 0.7, 'to': 0.8, 'speaker': 1, 'confidence': 0.7, 'final': True},
+        {'from': 0.8, 'to': 1.0, 'speaker': 1, 'confidence': 0.7, 'final': True},
+    ]
+}
+
+
+class TestSpeakerIndex:
+
+    def test_speaker_at(self):
+        index = SpeakerIndex.from_results(_results)
+        assert len(index) == 5
+        assert index.speaker_at(0.2) == 0
+        assert index.speaker_at(0.6) == 1
+        assert index.speaker_at(1.8) == 0
+        assert index.speaker_at(1.2) is None
+        assert index.speaker_at(-1) is None
+
+    def test_utterances(self):
+        model = SpeechRecognitionResults.from_dict(_results)
+        utterances = SpeakerIndex.from_results(model).utterances(model)
+        assert utterances == [
+            {'speaker': 0, 'from': 0.0, 'to': 0.4, 'transcript': 'hello'},
+            {'speaker': 1, 'from': 0.5, 'to': 1.0, 'transcript': 'how are you'},
+            {'speaker': 0, 'from': 1.6, 'to': 2.0, 'transcript': 'fine'},
+        ]
+
+    def test_speakers_for_words_between_labels(self):
+        index = SpeakerIndex(_results['speaker_labels'])
+        assert index.speakers_for([0.41, 1.3], [0.45, 1.5]).tolist() == [0, 0]
+
+    def test_empty_index(self):
+        index = SpeakerIndex([])
+        assert index.speaker_at(1.0) is None
+        assert index.speakers_for([0.0], [1.0]).tolist() == [-1]
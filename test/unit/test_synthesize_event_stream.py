@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for synthesize_using_websocket_iter
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import asyncio
+import threading
+import time
+import pytest
+from ibm_watson import TextToSpeechV1
+from ibm_watson import text_to_speech_adapter_v1
+from ibm_watson.websocket import (AudioChunk, ContentType,
+                                  SynthesizeEventStream, Timings)
+
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+
+
+class FakeSynthesizeListener:
+    """Plays the messages of a synthesis to the callback."""
+    sent = []
+    error = None
+
+    def __init__(self, options, callback, url, headers, *args):
+        callback.on_connected()
+        callback.on_content_type('audio/ogg;codecs=opus')
+        callback.on_timing_information({'marks': [['here', 0.0]]})
+        for index in range(10):
+            callback.on_audio_stream(bytes([index]))
+            FakeSynthesizeListener.sent.append(index)
+        if FakeSynthesizeListener.error:
+            callback.on_error(FakeSynthesizeListener.error)
+        callback.on_close()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    FakeSynthesizeListener.sent = []
+    FakeSynthesizeListener.error = None
+    monkeypatch.setattr(text_to_speech_adapter_v1, 'SynthesizeListener',
+                        FakeSynthesizeListener)
+    service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    return service
+
+
+class TestSynthesizeEventStream:
+
+    def test_events_with_backpressure(self, service):
+        events = service.synthesize_using_websocket_iter('<mark name="here"/>hi',
+                                                         max_buffered=2)
+        iterator = iter(events)
+        assert next(iterator) == ContentType('audio/ogg;codecs=opus')
+        time.sleep(0.2)
+        # The websocket thread waits while the buffer is full.
+        assert len(FakeSynthesizeListener.sent) <= 3
+        assert next(iterator) == Timings([], [['here', 0.0]])
+        assert [event for event in iterator] == [
+            AudioChunk(bytes([index])) for index in range(10)
+        ]
+
+    def test_async_iteration(self, service):
+
+        async def collect():
+            return [
+                event async for event in service.synthesize_using_websocket_iter(
+                    'hi')
+            ]
+
+        events = asyncio.run(collect())
+        assert events[0] == ContentType('audio/ogg;codecs=opus')
+        assert len(events) == 12
+
+    def test_error_is_raised(self, service):
+        FakeSynthesizeListener.error = 'Voice not found'
+        with pytest.raises(Exception, match='Voice not found'):
+            service.synthesize_using_websocket_iter('hi').read_audio()
+
+    def test_close_ends_iteration(self):
+        stream = SynthesizeEventStream(max_buffered=2)
+        audio = []
+        consumer = threading.Thread(
+            target=lambda: audio.append(stream.read_audio()))
+        consumer.start()
+        time.sleep(0.05)
+        stream.close()
+        # A waiting consumer and later iterations end instead of blocking.
+        consumer.join(timeout=1)
+        assert not consumer.is_alive()
+        assert audio == [b'']
+        assert list(stream) == []
+        assert stream.read_audio() == b''
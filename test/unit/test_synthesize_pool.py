@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for SynthesizePool
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import time
+import pytest
+import websocket
+from ibm_watson import TextToSpeechV1
+from ibm_watson.websocket import SynthesizeCallback
+
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+
+
+class FakeWebSocket:
+
+    def __init__(self, url, header):
+        self.url = url
+        self.header = header
+        self.connected = True
+        self.sent = []
+        self.messages = [
+            (websocket.ABNF.OPCODE_TEXT,
+             b'{"binary_streams": [{"content_type": "audio/wav"}]}'),
+            (websocket.ABNF.OPCODE_BINARY, b'audio'),
+            (websocket.ABNF.OPCODE_CLOSE, b''),
+        ]
+
+    def send(self, payload):
+        self.sent.append(json.loads(payload))
+
+    def recv_data(self):
+        return self.messages.pop(0)
+
+    def close(self):
+        self.connected = False
+
+
+class AudioCallback(SynthesizeCallback):
+
+    def __init__(self):
+        SynthesizeCallback.__init__(self)
+        self.events = []
+
+    def on_connected(self):
+        self.events.append('connected')
+
+    def on_content_type(self, content_type):
+        self.events.append(content_type)
+
+    def on_audio_stream(self, audio_stream):
+        self.events.append(audio_stream)
+
+    def on_close(self):
+        self.events.append('closed')
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestSynthesizePool:
+
+    def test_requests_use_warm_connections(self, monkeypatch):
+        opened = []
+
+        def create_connection(url, header=None, **kwargs):
+            opened.append(FakeWebSocket(url, header))
+            return opened[-1]
+
+        monkeypatch.setattr(websocket, 'create_connection', create_connection)
+        service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+
+        with service.create_synthesize_pool(voice='en-US_AllisonV3Voice',
+                                            size=2) as pool:
+            _wait_for(lambda: len(pool.idle) == 2)
+            assert opened[0].url.endswith(
+                '/v1/synthesize?voice=en-US_AllisonV3Voice')
+
+            callback = AudioCallback()
+            service.synthesize_using_websocket('hello',
+                                               callback,
+                                               accept='audio/wav',
+                                               voice='en-US_AllisonV3Voice')
+            assert callback.events == [
+                'connected', 'audio/wav', b'audio', 'closed'
+            ]
+            assert opened[0].sent == [{'text': 'hello', 'accept': 'audio/wav'}]
+            assert not opened[0].connected
+            # The pool is refilled in the background.
+            _wait_for(lambda: len(opened) == 3 and len(pool.idle) == 2)
+        assert not any(ws.connected for ws in opened)
+
+    def test_idle_connections_are_replaced(self, monkeypatch):
+        opened = []
+
+        def create_connection(url, header=None, **kwargs):
+            opened.append(FakeWebSocket(url, header))
+            return opened[-1]
+
+        monkeypatch.setattr(websocket, 'create_connection', create_connection)
+        service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+
+        with service.create_synthesize_pool(size=1, max_idle=0.05):
+            _wait_for(lambda: len(opened) >= 3)
+        assert not opened[0].connected
+
+    def test_size_zero_opens_connections_on_demand(self, monkeypatch):
+        opened = []
+
+        def create_connection(url, header=None, **kwargs):
+            opened.append(FakeWebSocket(url, header))
+            return opened[-1]
+
+        monkeypatch.setattr(websocket, 'create_connection', create_connection)
+        service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+
+        with service.create_synthesize_pool(size=0) as pool:
+            time.sleep(0.05)
+            assert opened == []
+            callback = AudioCallback()
+            service.synthesize_using_websocket('hello',
+                                               callback,
+                                               accept='audio/wav')
+            assert callback.events == [
+                'connected', 'audio/wav', b'audio', 'closed'
+            ]
+            assert len(opened) == 1
+            assert len(pool.idle) == 0
+        with pytest.raises(ValueError):
+            service.create_synthesize_pool(size=-1)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for SynthesisCache
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import os
+import time
+import responses
+from ibm_watson import TextToSpeechV1
+from ibm_watson.text_to_speech_cache import SynthesisCache
+from ibm_watson.websocket import SynthesizeCallback
+
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+
+
+def _service(cache):
+    service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    service.set_synthesis_cache(cache)
+    return service
+
+
+class AudioCallback(SynthesizeCallback):
+
+    def __init__(self):
+        SynthesizeCallback.__init__(self)
+        self.events = []
+
+    def on_connected(self):
+        self.events.append('connected')
+
+    def on_content_type(self, content_type):
+        self.events.append(content_type)
+
+    def on_audio_stream(self, audio_stream):
+        self.events.append(audio_stream)
+
+    def on_data(self, data):
+        self.events.append(('data', data))
+
+    def on_close(self):
+        self.events.append('closed')
+
+
+class TestSynthesisCache:
+
+    @responses.activate
+    def test_synthesize_hit(self, tmp_path):
+        responses.add(responses.POST,
+                      _base_url + '/v1/synthesize',
+                      body=b'wav audio',
+                      content_type='audio/wav',
+                      status=200)
+        service = _service(SynthesisCache(str(tmp_path)))
+
+        first = service.synthesize('hello', accept='audio/wav').get_result()
+        second = service.synthesize('hello', accept='audio/wav')
+        assert len(responses.calls) == 1
+        assert first.content == b'wav audio'
+        assert second.get_status_code() == 200
+        assert second.get_headers()['Content-Type'] == 'audio/wav'
+        assert isinstance(second.get_result().content, memoryview)
+        assert bytes(second.get_result().content) == b'wav audio'
+
+        service.synthesize('hello', accept='audio/wav', rate_percentage=10)
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_errors_are_not_cached(self, tmp_path):
+        responses.add(responses.POST,
+                      _base_url + '/v1/synthesize',
+                      json={'error': 'busy'},
+                      status=503)
+        cache = SynthesisCache(str(tmp_path))
+        service = _service(cache)
+        for _ in range(2):
+            try:
+                service.synthesize('hello')
+            except Exception:
+                pass
+        assert len(responses.calls) == 2
+        assert cache.size() == 0
+
+    def test_websocket_hit(self, tmp_path):
+        cache = SynthesisCache(str(tmp_path))
+        cache.put(cache.key('hello', voice='en-US_AllisonV3Voice'),
+                  b'ogg audio', 'audio/ogg;codecs=opus')
+        callback = AudioCallback()
+        _service(cache).synthesize_using_websocket(
+            'hello', callback, voice='en-US_AllisonV3Voice')
+        # The same events as from the service, with bytes for the audio.
+        assert callback.events == [
+            'connected', 'audio/ogg;codecs=opus',
+            ('data', json.dumps({
+                'binary_streams': [{
+                    'content_type': 'audio/ogg;codecs=opus'
+                }]
+            })), b'ogg audio', ('data', b'ogg audio'), 'closed'
+        ]
+        assert type(callback.events[3]) is bytes
+
+    def test_lru_eviction(self, tmp_path):
+        cache = SynthesisCache(str(tmp_path), max_bytes=40)
+        cache.put('a', b'x' * 10, 'audio/wav')
+        cache.put('b', b'y' * 10, 'audio/wav')
+        past = time.time() - 60
+        os.utime(os.path.join(str(tmp_path), 'a.audio'), (past, past))
+        os.utime(os.path.join(str(tmp_path), 'b.audio'), (past - 60, past - 60))
+        # Using 'b' makes 'a' the least recently used entry.
+        assert bytes(cache.get('b').content) == b'y' * 10
+        cache.put('c', b'z' * 10, 'audio/wav')
+        assert cache.get('a') is None
+        assert cache.get('b') is not None
+        assert cache.get('c') is not None
+        assert cache.size() <= 40
+        assert not [name for name in os.listdir(str(tmp_path))
+                    if name.endswith('.tmp')]
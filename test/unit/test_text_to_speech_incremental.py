@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for synthesize_incremental
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import asyncio
+import json
+import threading
+import responses
+from ibm_watson import TextToSpeechV1
+from ibm_watson.text_to_speech_incremental import SegmentSplitter
+
+_service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+
+def _echo_audio(request):
+    text = json.loads(request.body)['text']
+    return (200, {'Content-Type': 'audio/l16;rate=22050'},
+            text.strip().encode('utf-8'))
+
+
+class TestSegmentSplitter:
+
+    def test_sentences_are_split_when_complete(self):
+        splitter = SegmentSplitter()
+        assert splitter.feed('Hello the') == []
+        assert splitter.feed('re. How') == ['Hello there. ']
+        assert splitter.feed(' are you?') == []
+        assert splitter.feed(' Fine') == ['How are you? ']
+        assert splitter.flush() == ['Fine']
+
+    def test_long_sentences_are_split_at_clauses(self):
+        splitter = SegmentSplitter(clause_chars=20)
+        assert splitter.feed('When the sun rises, we leave; ') == [
+            'When the sun rises, we leave; '
+        ]
+        assert splitter.feed('and') == []
+
+    def test_segments_fit_max_bytes(self):
+        splitter = SegmentSplitter(max_bytes=10)
+        segments = splitter.feed('aaaa bbbb cccc dddd') + splitter.flush()
+        assert segments == ['aaaa bbbb ', 'cccc dddd']
+
+
+class TestSynthesizeIncremental:
+
+    @responses.activate
+    def test_audio_before_last_fragment(self):
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/synthesize',
+                               callback=_echo_audio)
+        first_audio = threading.Event()
+
+        def fragments():
+            yield 'One. '
+            yield 'Tw'
+            # The stream only continues once the first audio was played.
+            assert first_audio.wait(5)
+            yield 'o. Three'
+
+        synthesis = _service.synthesize_incremental(fragments(),
+                                                    accept='audio/l16;rate=22050')
+        chunks = []
+        for chunk in synthesis:
+            chunks.append(chunk)
+            first_audio.set()
+        assert chunks == [b'One.', b'Two.', b'Three']
+        assert synthesis.segments == ['One. ', 'Two. ', 'Three']
+
+    @responses.activate
+    def test_async_fragments(self):
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/synthesize',
+                               callback=_echo_audio)
+
+        async def fragments():
+            for fragment in ['Hi there', '! How ', 'are you?']:
+                await asyncio.sleep(0)
+                yield fragment
+
+        async def collect():
+            synthesis = _service.synthesize_incremental(
+                fragments(), accept='audio/l16;rate=22050')
+            return [chunk async for chunk in synthesis]
+
+        assert asyncio.run(collect()) == [b'Hi there!', b'How are you?']
+
+    @responses.activate
+    def test_async_iteration_stops_early(self):
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/synthesize',
+                               callback=_echo_audio)
+
+        async def fragments():
+            number = 0
+            while True:
+                number += 1
+                await asyncio.sleep(0)
+                yield 'Sentence {0}. '.format(number)
+
+        async def first_chunk(stop):
+            synthesis = _service.synthesize_incremental(
+                fragments(), accept='audio/l16;rate=22050', max_concurrency=1)
+            chunks = synthesis.__aiter__()
+            chunk = await chunks.__anext__()
+            await stop(synthesis, chunks)
+            return chunk, synthesis
+
+        async def close_generator(_, chunks):
+            # The producer waits for a free slot, and must not block the
+            # generator from closing.
+            await asyncio.sleep(0.05)
+            await chunks.aclose()
+
+        async def close_synthesis(synthesis, chunks):
+            synthesis.close()
+            assert [chunk async for chunk in chunks] == []
+
+        for stop in (close_generator, close_synthesis):
+            chunk, synthesis = asyncio.run(
+                asyncio.wait_for(first_chunk(stop), 5))
+            assert chunk == b'Sentence 1.'
+            assert len(synthesis.segments) <= 3
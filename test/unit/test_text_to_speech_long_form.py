@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for synthesize_long_text
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import io
+import json
+import struct
+import wave
+import pytest
+import responses
+from ibm_watson import TextToSpeechV1
+from ibm_watson.text_to_speech_audio import get_audio_concatenator, ogg_crc
+from ibm_watson.text_to_speech_long_form import split_text
+
+_service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+
+def _wav(frames):
+    audio = io.BytesIO()
+    with wave.open(audio, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(22050)
+        wav.writeframes(frames)
+    return audio.getvalue()
+
+
+def _ogg_page(serial, sequence, payload):
+    header = struct.pack('<4sBBqIII', b'OggS', 0, 0, 0, serial, sequence, 0)
+    page = bytearray(header + bytes([1, len(payload)]) + payload)
+    struct.pack_into('<I', page, 22, ogg_crc(page))
+    return bytes(page)
+
+
+class TestSplitText:
+
+    def test_split_plain_text_at_sentences(self):
+        text = 'One two three. Four five six! Seven eight nine? Ten.'
+        assert split_text(text, 32) == [
+            'One two three. Four five six! ', 'Seven eight nine? Ten.'
+        ]
+
+    def test_split_ssml_reopens_elements(self):
+        text = ('<speak version="1.0"><prosody rate="slow">One two. Three four.'
+                '</prosody> Tail.</speak>')
+        assert split_text(text, 75) == [
+            '<speak version="1.0"><prosody rate="slow">One two. </prosody>'
+            '</speak>',
+            '<speak version="1.0"><prosody rate="slow">Three four.</prosody>'
+            '</speak>',
+            '<speak version="1.0"> Tail.</speak>',
+        ]
+
+    def test_split_never_breaks_say_as(self):
+        text = ('<speak>Call <say-as interpret-as="digits">555. 1234</say-as>'
+                ' now. Thanks.</speak>')
+        chunks = split_text(text, 80)
+        assert chunks[0] == ('<speak>Call <say-as interpret-as="digits">555. '
+                             '1234</say-as> now. </speak>')
+        assert chunks[1] == '<speak>Thanks.</speak>'
+
+    def test_split_long_sentence_at_words(self):
+        chunks = split_text('alpha beta gamma delta epsilon zeta.', 12)
+        assert all(len(chunk) <= 12 for chunk in chunks)
+        assert ''.join(chunks) == 'alpha beta gamma delta epsilon zeta.'
+
+    def test_split_counts_utf8_bytes(self):
+        text = 'Ünïcödé. ' * 4
+        for chunk in split_text(text, 30):
+            assert len(chunk.encode('utf-8')) <= 30
+
+    def test_unsplittable_word(self):
+        with pytest.raises(ValueError):
+            split_text('supercalifragilistic', 10)
+
+
+class TestAudioConcatenators:
+
+    def test_ogg_serials_are_unique(self):
+        concatenator = get_audio_concatenator(None)
+        first = concatenator.append(_ogg_page(7, 0, b'first'))
+        second = concatenator.append(_ogg_page(7, 0, b'second'))
+        assert first == _ogg_page(7, 0, b'first')
+        assert second == _ogg_page(8, 0, b'second')
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError):
+            get_audio_concatenator('audio/webm')
+
+
+class TestSynthesizeLongText:
+
+    @responses.activate
+    def test_wav_is_joined_in_order(self):
+
+        def callback(request):
+            text = json.loads(request.body)['text']
+            return (200, {'Content-Type': 'audio/wav'},
+                    _wav(text.strip().encode('ascii') * 2))
+
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/synthesize',
+                               callback=callback)
+
+        synthesis = _service.synthesize_long_text('Aa. Bbbb. Cc. Dddd. Ee.',
+                                                  accept='audio/wav',
+                                                  max_concurrency=2,
+                                                  max_bytes=6)
+        assert synthesis.segments == ['Aa. ', 'Bbbb. ', 'Cc. ', 'Dddd. ', 'Ee.']
+        audio = synthesis.read_all()
+        assert len(responses.calls) == 5
+        with wave.open(io.BytesIO(audio)) as wav:
+            assert wav.getframerate() == 22050
+            assert wav.readframes(wav.getnframes()) == b'Aa.Aa.Bbbb.Bbbb.Cc.Cc.Dddd.Dddd.Ee.Ee.'
+
+    @responses.activate
+    def test_read_all_after_partial_read(self):
+        responses.add(responses.POST,
+                      _base_url + '/v1/synthesize',
+                      body=_wav(b'\x01\x00' * 10),
+                      content_type='audio/wav',
+                      status=200)
+        synthesis = _service.synthesize_long_text('One. Two. Six.',
+                                                  accept='audio/wav',
+                                                  max_bytes=5)
+        first = next(iter(synthesis))
+        # The remaining audio has no header, so nothing in it is patched.
+        rest = synthesis.read_all()
+        assert rest == b'\x01\x00' * 20
+        audio = bytearray(first + rest)
+        for offset, patch in synthesis.header_patches():
+            audio[offset:offset + len(patch)] = patch
+        with wave.open(io.BytesIO(bytes(audio))) as wav:
+            assert wav.getnframes() == 30
+
+    @responses.activate
+    def test_save_patches_header(self):
+        responses.add(responses.POST,
+                      _base_url + '/v1/synthesize',
+                      body=_wav(b'\x01\x00' * 10),
+                      content_type='audio/wav',
+                      status=200)
+        audio_file = io.BytesIO()
+        with _service.synthesize_long_text('One. Two.',
+                                           accept='audio/wav',
+                                           max_bytes=5) as synthesis:
+            synthesis.save(audio_file)
+        with wave.open(io.BytesIO(audio_file.getvalue())) as wav:
+            assert wav.getnframes() == 20
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for get_pronunciations
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import re
+import urllib
+import responses
+from ibm_watson import TextToSpeechV1
+
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+
+
+def _pronounce(request):
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(request.url).query)
+    text = query['text'][0]
+    return (200, {'Content-Type': 'application/json'},
+            json.dumps({'pronunciation': '.' + text.lower()}))
+
+
+def _service():
+    service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    return service
+
+
+class TestGetPronunciations:
+
+    @responses.activate
+    def test_batch_is_deduplicated_and_cached(self):
+        responses.add_callback(responses.GET,
+                               re.compile(_base_url + '/v1/pronunciation.*'),
+                               callback=_pronounce)
+        service = _service()
+        words = ['Watson', 'IBM', 'Watson', 'Cloud']
+        assert service.get_pronunciations(words, voice='en-US_AllisonV3Voice',
+                                          max_concurrency=2) == {
+            'Watson': '.watson',
+            'IBM': '.ibm',
+            'Cloud': '.cloud'
+        }
+        assert len(responses.calls) == 3
+
+        service.get_pronunciations(['IBM', 'Cloud'],
+                                   voice='en-US_AllisonV3Voice')
+        assert len(responses.calls) == 3
+        service.get_pronunciations(['IBM'], voice='en-US_AllisonV3Voice',
+                                   format='spr')
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_custom_word_changes_invalidate(self):
+        responses.add_callback(responses.GET,
+                               re.compile(_base_url + '/v1/pronunciation.*'),
+                               callback=_pronounce)
+        responses.add(responses.PUT,
+                      _base_url + '/v1/customizations/custom1/words/IBM',
+                      status=200)
+        responses.add(responses.DELETE,
+                      _base_url + '/v1/customizations/custom1/words/IBM',
+                      status=204)
+        service = _service()
+
+        service.get_pronunciations(['IBM'], customization_id='custom1')
+        service.get_pronunciations(['IBM'], customization_id='custom2')
+        service.add_word('custom1', 'IBM', 'eye bee em')
+        service.get_pronunciations(['IBM'], customization_id='custom1')
+        service.get_pronunciations(['IBM'], customization_id='custom2')
+        lookups = [call for call in responses.calls
+                   if call.request.method == 'GET']
+        assert len(lookups) == 3
+
+        service.delete_word('custom1', 'IBM')
+        service.get_pronunciations(['IBM'], customization_id='custom1')
+        lookups = [call for call in responses.calls
+                   if call.request.method == 'GET']
+        assert len(lookups) == 4
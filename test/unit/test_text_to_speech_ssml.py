@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for SSMLTemplate
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import pytest
+import responses
+from ibm_watson import TextToSpeechV1
+from ibm_watson.text_to_speech_cache import SynthesisCache
+from ibm_watson.text_to_speech_ssml import SSMLTemplate
+
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+_template = ('<speak>Dear {first} {last}, your balance is '
+             '<say-as interpret-as="currency">{amount:.2f}</say-as>. '
+             'Thank you for banking with us.</speak>')
+
+
+class TestSSMLTemplate:
+
+    def test_render_escapes_values(self):
+        template = SSMLTemplate(_template)
+        assert template.slots == ('first', 'last', 'amount')
+        assert template.render(first='Tom', last='<O\'Hara & Co>',
+                               amount=12.5) == (
+            '<speak>Dear Tom &lt;O&apos;Hara &amp; Co&gt;, your balance is '
+            '<say-as interpret-as="currency">12.50</say-as>. '
+            'Thank you for banking with us.</speak>')
+
+    def test_render_parts(self):
+        template = SSMLTemplate(
+            '<speak><prosody rate="slow">Hello {name}, welcome back.'
+            '</prosody> Goodbye {name}.</speak>')
+        assert template.render_parts(name='Ann') == [
+            ('<speak><prosody rate="slow">Hello </prosody></speak>', True),
+            ('<speak><prosody rate="slow">Ann</prosody></speak>', False),
+            ('<speak><prosody rate="slow">, welcome back.</prosody> Goodbye '
+             '</speak>', True),
+            ('<speak>Ann.</speak>', False),
+        ]
+
+    def test_invalid_template(self):
+        with pytest.raises(ValueError):
+            SSMLTemplate('<speak><prosody>{name}</speak>')
+
+    def test_size_limit(self):
+        template = SSMLTemplate('<speak>{text}</speak>', max_bytes=20)
+        assert template.render(text='short') == '<speak>short</speak>'
+        with pytest.raises(ValueError):
+            template.render(text='much too long')
+
+    def test_missing_value(self):
+        with pytest.raises(KeyError):
+            SSMLTemplate(_template).render(first='Tom')
+
+
+class TestSynthesizeTemplate:
+
+    @responses.activate
+    def test_static_parts_are_synthesized_once(self, tmp_path):
+
+        def callback(request):
+            text = json.loads(request.body)['text']
+            return (200, {'Content-Type': 'audio/l16;rate=22050'},
+                    text.encode('utf-8'))
+
+        responses.add_callback(responses.POST,
+                               _base_url + '/v1/synthesize',
+                               callback=callback)
+        service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        service.set_synthesis_cache(SynthesisCache(str(tmp_path)))
+        template = SSMLTemplate('<speak>Hello {name}, welcome back.</speak>')
+
+        first = service.synthesize_template(template, {'name': 'Ann'},
+                                            accept='audio/l16;rate=22050',
+                                            splice=True).read_all()
+        second = service.synthesize_template(template, {'name': 'Bob'},
+                                             accept='audio/l16;rate=22050',
+                                             splice=True).read_all()
+        assert first == (b'<speak>Hello </speak><speak>Ann</speak>'
+                         b'<speak>, welcome back.</speak>')
+        assert second == (b'<speak>Hello </speak><speak>Bob</speak>'
+                          b'<speak>, welcome back.</speak>')
+        assert len(responses.calls) == 4
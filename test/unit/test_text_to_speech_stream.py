@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for synthesize_stream
+"""
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import json
+import urllib
+import responses
+from ibm_watson import TextToSpeechV1
+from ibm_watson.text_to_speech_stream import SynthesizeStream
+
+_service = TextToSpeechV1(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.text-to-speech.watson.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+
+class TestSynthesizeStream:
+
+    @responses.activate
+    def test_synthesize_stream(self):
+        audio = bytes(range(256)) * 10
+        responses.add(responses.POST,
+                      _base_url + '/v1/synthesize',
+                      body=audio,
+                      content_type='audio/wav',
+                      status=200)
+
+        stream = _service.synthesize_stream('hello',
+                                            accept='audio/wav',
+                                            voice='en-US_MichaelV3Voice',
+                                            chunk_size=1000)
+        assert isinstance(stream, SynthesizeStream)
+        assert stream.content_type == 'audio/wav'
+        assert stream.time_to_first_byte is None
+
+        chunks = list(stream)
+        assert [len(chunk) for chunk in chunks] == [1000, 1000, 560]
+        assert b''.join(chunks) == audio
+        assert stream.bytes_received == len(audio)
+        assert stream.time_to_first_byte >= stream.time_to_headers
+
+        request = responses.calls[0].request
+        assert request.headers['Accept'] == 'audio/wav'
+        query_string = urllib.parse.unquote_plus(request.url.split('?', 1)[1])
+        assert 'voice=en-US_MichaelV3Voice' in query_string
+        assert json.loads(request.body)['text'] == 'hello'
+
+    @responses.activate
+    def test_read_all(self):
+        responses.add(responses.POST,
+                      _base_url + '/v1/synthesize',
+                      body=b'audio',
+                      content_type='audio/ogg;codecs=opus',
+                      status=200)
+        with _service.synthesize_stream('hello') as stream:
+            assert stream.read_all() == b'audio'
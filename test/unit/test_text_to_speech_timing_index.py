@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit Tests for TimingIndex
+"""
+
+from ibm_watson.text_to_speech_timing_index import TimingIndex
+from ibm_watson.websocket import Timings
+
+_text = 'Hello <mark name="middle"/>brave new world'
+
+
+class TestTimingIndex:
+
+    def _index(self):
+        index = TimingIndex(_text)
+        index.add({'words': [['Hello', 0.0, 0.3]]})
+        index.add(Timings([], [['middle', 0.35]]))
+        index.add({'words': [['brave', 0.4, 0.7], ['new', 0.7, 0.9]]})
+        index.add({'words': [['world', 1.0, 1.4]]})
+        return index
+
+    def test_word_at(self):
+        index = self._index()
+        assert len(index) == 4
+        assert index.word_at(0.1) == 0
+        assert index.word_at(0.8) == 2
+        assert index.word_at(0.95) is None
+        assert index.word_at(2.0) is None
+        assert index.words_at([-1.0, 0.5, 0.95, 1.2]).tolist() == [-1, 1, 2, 3]
+
+    def test_time_of_offset(self):
+        index = self._index()
+        assert index.offset.tolist() == [0, 27, 33, 37]
+        assert index.time_of_offset(0) == 0.0
+        assert index.time_of_offset(_text.index('world') + 2) == 1.0
+        assert index.time_of_offset(10) == 0.0
+        assert index.word(1) == {
+            'word': 'brave',
+            'start': 0.4,
+            'end': 0.7,
+            'offset': 27
+        }
+        assert index.mark_time('middle') == 0.35
+
+    def test_offsets_without_text(self):
+        index = TimingIndex()
+        index.add({'words': [['one', 0.0, 0.2], ['two', 0.2, 0.4]]})
+        assert index.offset.tolist() == [0, 4]
+
+    def test_out_of_order_timings(self):
+        index = TimingIndex()
+        index.add({'words': [['two', 0.5, 0.9]]})
+        assert index.word_at(0.6) == 0
+        index.add({'words': [['one', 0.0, 0.4], ['three', 1.0, 1.2]]})
+        assert index.word_at(0.1) == 0
+        assert index.word(0)['word'] == 'one'
+        assert index.start.tolist() == [0.0, 0.5, 1.0]
+
+    def test_interleaved_adds_and_lookups(self):
+        index = TimingIndex()
+        for number in range(1000):
+            index.add({'words': [['w', number, number + 0.5]]})
+            assert index.word_at(number + 0.25) == number
+        assert index.words_at([999.1]).tolist() == [999]